@@ -0,0 +1,203 @@
+# Copyright 2024 Canonical Ltd.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License version 3 as published by the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Durable writes of configuration files shared by the editors and renderers.
+
+Files can be written in place, or atomically replaced through a temporary file in
+the same directory. Atomic writes made inside `write_batch` are committed together.
+"""
+
+import logging
+import os
+import stat
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from time import perf_counter
+from typing import Any, List, Optional, Tuple
+
+from .instrumentation import _emit, _hooks
+
+_logger = logging.getLogger(__name__)
+_batch: ContextVar[Optional["_WriteBatch"]] = ContextVar("_batch", default=None)
+
+
+class _WriteBatch:
+    """Pending atomic writes that are committed together."""
+
+    def __init__(self, fsync_dir: bool) -> None:
+        self.fsync_dir = fsync_dir
+        # Temporary files, which are already closed, and the files they replace.
+        self.pending: List[Tuple[Path, Path]] = []
+        # Writes to record in a history store once the batch is committed.
+        self.recorded: List[Tuple[Any, Path, str]] = []
+
+    def commit(self) -> None:
+        """Flush pending files to disk, then rename them over their targets."""
+        pending, self.pending = self.pending, []
+        replaced = 0
+        try:
+            # Flush the temporary files concurrently so that the filesystem
+            # can fold them into as few journal commits as possible.
+            with ThreadPoolExecutor(max_workers=min(len(pending), 8) or 1) as pool:
+                list(pool.map(_fsync_file, (tmp for tmp, _ in pending)))
+
+            for tmp, target in pending:
+                os.replace(tmp, target)
+                replaced += 1
+        except BaseException:
+            self.recorded.clear()
+            raise
+        finally:
+            for tmp, _ in pending[replaced:]:
+                tmp.unlink(missing_ok=True)
+
+        if self.fsync_dir:
+            for directory in {target.parent for _, target in pending}:
+                _fsync_dir(directory)
+
+        for store, loc, content in self.recorded:
+            store.record(loc, content)
+
+        self.recorded.clear()
+
+    def discard(self) -> None:
+        """Remove pending files without committing them."""
+        for tmp, _ in self.pending:
+            tmp.unlink(missing_ok=True)
+
+        self.pending.clear()
+        self.recorded.clear()
+
+
+@contextmanager
+def write_batch(*, fsync_dir: bool = True):
+    """Group the atomic writes of several configuration files together.
+
+    All configuration files dumped inside the `with` block are written atomically.
+    The files are written to temporary files which are flushed to disk together
+    and renamed over their targets when the `with` block exits. Each parent directory
+    is only flushed once. If an error occurs inside the `with` block, none of the
+    configuration files are written.
+
+    Args:
+        fsync_dir: Flush the parent directories of the written files to disk
+            after the temporary files have been renamed.
+    """
+    if (batch := _batch.get()) is not None:
+        # Nested batches are committed by the outermost batch.
+        yield
+        return
+
+    batch = _WriteBatch(fsync_dir)
+    token = _batch.set(batch)
+    try:
+        yield
+    except BaseException:
+        batch.discard()
+        raise
+    else:
+        batch.commit()
+    finally:
+        _batch.reset(token)
+
+
+def _fsync_dir(directory: Path) -> None:
+    """Flush a directory to disk."""
+    fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _fsync_file(file: Path) -> None:
+    """Flush a file that has already been closed to disk."""
+    fd = os.open(file, os.O_RDONLY | os.O_CLOEXEC)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _write_atomic(loc: Path, content: str, fsync_dir: bool) -> int:
+    """Atomically replace the contents of a file.
+
+    The new contents are written to a temporary file in the same directory as
+    the target file, flushed to disk, and then renamed over the target file.
+    The permissions and ownership of the target file are preserved.
+    """
+    target = Path(os.path.realpath(loc))
+    try:
+        st = target.stat()
+    except FileNotFoundError:
+        st = None
+
+    data = content.encode("ascii")
+    tmp = target.with_name(f".{target.name}.{os.urandom(4).hex()}.tmp")
+    mode = stat.S_IMODE(st.st_mode) if st else 0o666
+    fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_EXCL | os.O_CLOEXEC, mode)
+    try:
+        if st:
+            os.fchmod(fd, mode)
+            if (st.st_uid, st.st_gid) != (os.geteuid(), os.getegid()):
+                try:
+                    os.fchown(fd, st.st_uid, st.st_gid)
+                except PermissionError:
+                    _logger.warning("Unable to preserve ownership of %s.", target)
+
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view) :]
+
+        batch = _batch.get()
+        if batch is None:
+            os.fsync(fd)
+    except BaseException:
+        os.close(fd)
+        tmp.unlink(missing_ok=True)
+        raise
+
+    os.close(fd)
+    if batch is not None:
+        # Closed now and flushed to disk when the batch is committed, so that large
+        # batches do not hold a file descriptor open for every pending write.
+        batch.pending.append((tmp, target))
+        return len(content)
+
+    try:
+        os.replace(tmp, target)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+
+    if fsync_dir:
+        _fsync_dir(target.parent)
+
+    return len(content)
+
+
+def _write_text(loc: Path, content: str, *, atomic: bool, fsync_dir: bool) -> int:
+    """Write already marshalled configuration into file."""
+    start = perf_counter() if _hooks else None
+    if atomic or _batch.get() is not None:
+        written = _write_atomic(loc, content, fsync_dir)
+    else:
+        written = loc.write_text(content, encoding="ascii")
+
+    if start is not None:
+        _emit("write", start, written, file=str(loc))
+
+    return written
@@ -0,0 +1,64 @@
+# Copyright 2024 Canonical Ltd.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License version 3 as published by the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Path templates of per-user NGINX (PUN) files shared by the PUN renderer and scanner.
+
+Options such as `pun_config_path` in `nginx_stage.yml` are templates with `%{name}`
+placeholders, such as `%{user}`, that `nginx_stage` substitutes for each user.
+"""
+
+__all__ = ["MIN_UID", "PATH_DEFAULTS", "USER_REGEX", "PathTemplate"]
+
+import re
+
+# Defaults applied by `nginx_stage` to path templates that are not set.
+PATH_DEFAULTS = {
+    "pun_config_path": "/var/lib/ondemand-nginx/config/puns/%{user}.conf",
+    "pun_socket_path": "/var/run/ondemand-nginx/%{user}/passenger.sock",
+    "pun_pid_path": "/var/run/ondemand-nginx/%{user}/passenger.pid",
+    "pun_tmp_root": "/var/tmp/ondemand-nginx/%{user}",
+    "pun_access_log_path": "/var/log/ondemand-nginx/%{user}/access.log",
+    "pun_error_log_path": "/var/log/ondemand-nginx/%{user}/error.log",
+    "pun_secret_key_base_path": "/var/lib/ondemand-nginx/config/puns/%{user}.secret_key_base.txt",
+}
+# Defaults applied by `nginx_stage` to the options that restrict which users get a PUN.
+USER_REGEX = r"[\w@\.\-]+"
+MIN_UID = 1000
+
+_PLACEHOLDER = re.compile(r"%\{(\w+)\}")
+
+
+class PathTemplate:
+    """Path template with `%{name}` placeholders, compiled into a format string."""
+
+    __slots__ = ("template", "_format")
+
+    def __init__(self, template: str) -> None:
+        self.template = template
+        parts = _PLACEHOLDER.split(template)
+        self._format = "".join(
+            f"{{{part}}}" if i % 2 else part.replace("{", "{{").replace("}", "}}")
+            for i, part in enumerate(parts)
+        )
+
+    def expand(self, **values: str) -> str:
+        """Substitute placeholders. Placeholders without a value are left as they are."""
+        return self._format.format_map(_Placeholders(values))
+
+
+class _Placeholders(dict):
+    """Values of placeholders that leaves unknown placeholders unexpanded."""
+
+    def __missing__(self, key: str) -> str:
+        return f"%{{{key}}}"
@@ -12,7 +12,63 @@
 # You should have received a copy of the GNU Lesser General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
-"""Editors for Open Ondemand configuration files."""
+"""Editors for Open Ondemand configuration files.
 
-from . import nginx_stage
-from . import ood_portal
+Editors are imported on first use so that importing `ondemandutils.editors`
+stays cheap for short-lived processes.
+"""
+
+__all__ = [
+    "CacheInfo",
+    "cache_clear",
+    "cache_info",
+    "fleet",
+    "history",
+    "nginx_stage",
+    "ood_portal",
+    "set_async_workers",
+    "set_cache_size",
+    "watch",
+    "write_batch",
+]
+
+import importlib
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from . import fleet, history, nginx_stage, ood_portal, watch
+    from ._aio import set_async_workers
+    from .._files import write_batch
+    from ._editor import CacheInfo, cache_clear, cache_info, set_cache_size
+
+# Module and attribute name of each lazily imported object. Submodules have no attribute.
+_lazy = {
+    "fleet": (".fleet", None),
+    "history": (".history", None),
+    "nginx_stage": (".nginx_stage", None),
+    "ood_portal": (".ood_portal", None),
+    "set_async_workers": ("._aio", "set_async_workers"),
+    "CacheInfo": ("._editor", "CacheInfo"),
+    "cache_clear": ("._editor", "cache_clear"),
+    "cache_info": ("._editor", "cache_info"),
+    "set_cache_size": ("._editor", "set_cache_size"),
+    "watch": (".watch", None),
+    "write_batch": (".._files", "write_batch"),
+}
+
+
+def __getattr__(name: str):
+    if name not in _lazy:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    module, attr = _lazy[name]
+    value = importlib.import_module(module, __name__)
+    if attr is not None:
+        value = getattr(value, attr)
+
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(globals().keys() | _lazy.keys())
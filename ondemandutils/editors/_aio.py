@@ -0,0 +1,123 @@
+# Copyright 2024 Canonical Ltd.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License version 3 as published by the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Base asyncio methods for Open Ondemand configuration file editors.
+
+File I/O, parsing, and marshalling are blocking operations, so the asyncio methods
+run their synchronous counterparts in a shared pool of worker threads. The size of
+the pool limits how many configuration files are processed concurrently.
+"""
+
+import contextvars
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from os import PathLike
+from typing import Callable, Optional, Union
+
+from ._editor import EditContext, dump_base, load_base, loads_base
+
+_max_workers = 8
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def set_async_workers(max_workers: int) -> None:
+    """Set how many configuration files asyncio editor methods process concurrently.
+
+    Args:
+        max_workers: Maximum number of worker threads.
+    """
+    global _max_workers, _executor
+
+    if max_workers < 1:
+        raise ValueError(f"Number of workers must be at least 1, not {max_workers}.")
+
+    with _executor_lock:
+        _max_workers = max_workers
+        if _executor is not None:
+            _executor.shutdown(wait=False)
+            _executor = None
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    """Get the shared pool of worker threads, creating it if needed."""
+    global _executor
+
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=_max_workers, thread_name_prefix="ondemandutils"
+            )
+
+        return _executor
+
+
+async def _run(func: Callable, *args, **kwargs):
+    """Run a blocking function in the shared pool of worker threads.
+
+    The current context is propagated so that context variables, such as an
+    active `write_batch`, are visible to the blocking function.
+    """
+    # Imported on first use as `asyncio` is slow to import.
+    import asyncio
+
+    ctx = contextvars.copy_context()
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_executor(), partial(ctx.run, func, *args, **kwargs))
+
+
+async def adump_base(content, file: Union[str, PathLike], marshaller, **kwargs):
+    """Dump configuration into file without blocking the event loop.
+
+    Do not use this function directly.
+    """
+    return await _run(dump_base, content, file, marshaller, **kwargs)
+
+
+async def aload_base(file: Union[str, PathLike], parser, **kwargs):
+    """Load configuration from file without blocking the event loop.
+
+    Do not use this function directly.
+    """
+    return await _run(load_base, file, parser, **kwargs)
+
+
+async def aloads_base(content: str, parser):
+    """Load configuration from Python string without blocking the event loop.
+
+    Do not use this function directly.
+    """
+    return await _run(loads_base, content, parser)
+
+
+class AsyncEditContext:
+    """Asynchronous context manager for editing a configuration file.
+
+    Do not use this class directly.
+    """
+
+    def __init__(self, editor: EditContext) -> None:
+        self._editor = editor
+
+    @property
+    def written(self) -> bool:
+        """True if the configuration file was written to on exit."""
+        return self._editor.written
+
+    async def __aenter__(self):
+        return await _run(self._editor.__enter__)
+
+    async def __aexit__(self, exc_type, exc_value, traceback) -> bool:
+        return await _run(self._editor.__exit__, exc_type, exc_value, traceback)
@@ -14,12 +14,119 @@
 
 """Base methods for Open Ondemand configuration file editors."""
 
+import copy
+import importlib
 import logging
+import os
+import threading
+from collections import OrderedDict
+from contextvars import ContextVar
+from functools import partial
 from os import PathLike
 from pathlib import Path
-from typing import Union
+from time import perf_counter
+from types import ModuleType
+from typing import Any, Callable, Hashable, NamedTuple, Optional, TextIO, Union
+
+from .._files import _batch, _write_text
+from ..instrumentation import _emit, _file, _hooks
 
 _logger = logging.getLogger(__name__)
+# Types of configuration files, each handled by the editor module of the same name.
+KINDS = ("ood_portal", "nginx_stage")
+# History store that records written configuration files. See `editors.history`.
+_history: ContextVar[Optional[Any]] = ContextVar("_history", default=None)
+
+
+class CacheInfo(NamedTuple):
+    """Statistics for the parsed configuration cache."""
+
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+
+
+class _ParseCache:
+    """Bounded LRU cache of parsed configuration files.
+
+    Entries are keyed on the identity of the file that was parsed: its path, inode,
+    modification time, and size. Rewriting a file therefore invalidates its entry.
+    """
+
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Any:
+        """Get an independent copy of a cached configuration, or None on a miss."""
+        with self._lock:
+            try:
+                config = self._entries[key]
+            except KeyError:
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+
+        return copy.deepcopy(config)
+
+    def put(self, key: Hashable, config: Any) -> None:
+        """Cache an independent copy of a parsed configuration."""
+        config = copy.deepcopy(config)
+        with self._lock:
+            self._entries[key] = config
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def resize(self, maxsize: int) -> None:
+        """Change the maximum number of cached configurations."""
+        if maxsize < 0:
+            raise ValueError(f"Cache size must not be negative, not {maxsize}.")
+
+        with self._lock:
+            self.maxsize = maxsize
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Remove all cached configurations and reset statistics."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+    def info(self) -> CacheInfo:
+        """Get cache statistics."""
+        with self._lock:
+            return CacheInfo(self.hits, self.misses, self.maxsize, len(self._entries))
+
+
+_cache = _ParseCache(maxsize=128)
+
+
+def cache_info() -> CacheInfo:
+    """Get hit and miss statistics for the parsed configuration cache."""
+    return _cache.info()
+
+
+def cache_clear() -> None:
+    """Clear the parsed configuration cache and its statistics."""
+    _cache.clear()
+
+
+def set_cache_size(maxsize: int) -> None:
+    """Set the maximum number of configurations held by the parsed configuration cache.
+
+    Args:
+        maxsize: Maximum number of cached configurations. Least recently used
+            configurations are evicted first.
+    """
+    _cache.resize(maxsize)
 
 
 def header(msg: str) -> str:
@@ -31,35 +138,168 @@ def header(msg: str) -> str:
     return "#\n" + "".join(f"# {line}\n" for line in msg.splitlines()) + "#\n"
 
 
-def dump_base(content, file: Union[str, PathLike], marshaller):
+def file_kind(file: Union[str, PathLike]) -> str:
+    """Determine which editor handles a configuration file from its name.
+
+    Args:
+        file: Configuration file. Its name must contain the name of an editor,
+            either `ood_portal` or `nginx_stage`.
+
+    Raises:
+        ValueError: Raised if the type of configuration file is not supported.
+    """
+    name = Path(file).name
+    for kind in KINDS:
+        if kind in name:
+            return kind
+
+    raise ValueError(
+        f"Unable to determine configuration file type of {file}. "
+        + "Supported configuration file types include: "
+        + ", ".join(KINDS)
+    )
+
+
+def editor(kind: str) -> ModuleType:
+    """Get the editor module that handles a type of configuration file.
+
+    Args:
+        kind: Type of configuration file, either `ood_portal` or `nginx_stage`.
+
+    Raises:
+        ValueError: Raised if the type of configuration file is not supported.
+    """
+    if kind not in KINDS:
+        raise ValueError(
+            f"Unsupported configuration file type {kind}. "
+            + "Supported configuration file types include: "
+            + ", ".join(KINDS)
+        )
+
+    return importlib.import_module(f"{__package__}.{kind}")
+
+
+def dump_base(
+    content,
+    file: Union[str, PathLike],
+    marshaller,
+    *,
+    atomic: bool = False,
+    fsync_dir: bool = True,
+    canonical: bool = False,
+):
     """Dump configuration into file using provided marshalling function.
 
     Do not use this function directly.
-    """
-    if (loc := Path(file)).exists():
-        _logger.warning("Overwriting contents of %s file located at %s.", loc.name, loc)
 
+    Args:
+        content: Configuration to dump.
+        file: File to dump configuration into.
+        marshaller: Function for marshalling the configuration.
+        atomic: Atomically replace the file rather than overwriting it in place.
+            Always enabled inside `write_batch`.
+        fsync_dir: Flush the parent directory to disk after an atomic write.
+        canonical: Marshal the configuration in canonical form.
+    """
+    loc = Path(file)
     _logger.debug("Marshalling configuration into %s file located at %s.", loc.name, loc)
-    return loc.write_text(marshaller(content), encoding="ascii")
+    if canonical:
+        marshaller = partial(marshaller, canonical=True)
+
+    text = _marshal(content, marshaller, loc)
+    written = _write_text(loc, text, atomic=atomic, fsync_dir=fsync_dir)
+    _record(loc, text)
+    return written
+
+
+def _record(loc: Path, content: str) -> None:
+    """Record a written configuration file in the active history store, if any."""
+    if (store := _history.get()) is None:
+        return
+
+    if (batch := _batch.get()) is not None:
+        batch.recorded.append((store, loc, content))
+    else:
+        store.record(loc, content)
+
 
+def _marshal(content, marshaller, file: Optional[Path] = None) -> str:
+    """Marshal configuration, reporting how long it takes to instrumentation callbacks."""
+    if not _hooks:
+        return marshaller(content)
 
-def dumps_base(content, marshaller) -> str:
+    start = perf_counter()
+    text = marshaller(content)
+    model = content.__class__.__name__
+    _emit("marshal", start, len(text or ""), model=model, file=str(file) if file else None)
+    return text
+
+
+def dumps_base(content, marshaller, *, canonical: bool = False) -> str:
     """Dump configuration into Python string using provided marshalling function.
 
     Do not use this function directly.
     """
-    return marshaller(content)
+    if canonical:
+        marshaller = partial(marshaller, canonical=True)
+
+    return _marshal(content, marshaller)
+
+
+def _read_text(file: Path, fin: Optional[TextIO] = None) -> str:
+    """Read configuration file, reporting how long it takes to instrumentation callbacks."""
+    start = perf_counter() if _hooks else None
+    if fin is None:
+        content = file.read_text(encoding="ascii")
+    else:
+        content = fin.read()
+
+    if start is not None:
+        _emit("read", start, len(content), file=str(file))
 
+    return content
 
-def load_base(file: Union[str, PathLike], parser):
+
+def _parse(content: str, parser, file: Path):
+    """Parse configuration, attributing instrumentation events to the configuration file."""
+    if not _hooks:
+        return parser(content)
+
+    token = _file.set(str(file))
+    try:
+        return parser(content)
+    finally:
+        _file.reset(token)
+
+
+def load_base(file: Union[str, PathLike], parser, *, cache: bool = False):
     """Load configuration from file using provided parsing function.
 
     Do not use this function directly.
+
+    Args:
+        file: File to load configuration from.
+        parser: Function for parsing the configuration.
+        cache: Reuse the parsed configuration if the file has not changed since
+            it was last loaded. Callers always receive an independent copy.
     """
     if (file := Path(file)).exists():
-        _logger.debug("Parsing contents of %s located at %s.", file.name, file)
-        config = file.read_text(encoding="ascii")
-        return parser(config)
+        if not cache:
+            _logger.debug("Parsing contents of %s located at %s.", file.name, file)
+            return _parse(_read_text(file), parser, file)
+
+        with file.open(encoding="ascii") as fin:
+            st = os.fstat(fin.fileno())
+            key = (parser, os.path.abspath(file), st.st_ino, st.st_mtime_ns, st.st_size)
+            if (config := _cache.get(key)) is not None:
+                _logger.debug("Using cached contents of %s located at %s.", file.name, file)
+                return config
+
+            _logger.debug("Parsing contents of %s located at %s.", file.name, file)
+            config = _parse(_read_text(file, fin), parser, file)
+
+        _cache.put(key, config)
+        return config
     else:
         msg = "Unable to locate file"
         _logger.error(msg + " %s.", file)
@@ -72,3 +312,141 @@ def loads_base(content: str, parser):
     Do not use this function directly.
     """
     return parser(content)
+
+
+# Formats of multi-document configuration streams, keyed by file suffix.
+_STREAM_FORMATS = {".jsonl": "jsonl", ".ndjson": "jsonl"}
+
+
+def iter_load_base(file: Union[str, PathLike, TextIO], model, *, format: Optional[str] = None):
+    """Load configurations one at a time from a multi-document stream using a data model.
+
+    Do not use this function directly.
+
+    Args:
+        file: File, or open file object, to load configurations from.
+        model: Data model to construct from each document.
+        format: Either `yaml` for a multi-document YAML stream or `jsonl` for JSON lines.
+            If not set, determined from the suffix of `file`, defaulting to `yaml`.
+    """
+    if format is None:
+        format = _STREAM_FORMATS.get(Path(getattr(file, "name", file)).suffix, "yaml")
+
+    if format not in ("yaml", "jsonl"):
+        raise ValueError(
+            f"Unsupported stream format {format}. Supported stream formats include: yaml, jsonl"
+        )
+
+    iter_from = model.iter_from_yaml if format == "yaml" else model.iter_from_jsonl
+    if hasattr(file, "read"):
+        return iter_from(file)
+
+    if not (file := Path(file)).exists():
+        msg = "Unable to locate file"
+        _logger.error(msg + " %s.", file)
+        raise FileNotFoundError(msg + f" {file}")
+
+    def _iter():
+        _logger.debug("Streaming contents of %s located at %s.", file.name, file)
+        with file.open(encoding="ascii") as fin:
+            yield from iter_from(fin)
+
+    return _iter()
+
+
+class EditContext:
+    """Context manager for editing a configuration file.
+
+    The configuration file is only written back to if the semantic content of the
+    configuration was changed inside the `with` block, or if the configuration
+    file did not exist before the `with` block was entered.
+
+    In round-trip mode, only the entries of changed configuration options are
+    rewritten, so comments and the layout of the rest of the file are preserved.
+    The file is rewritten in full if it cannot be patched in place.
+
+    Do not use this class directly.
+
+    Attributes:
+        written: True if the configuration file was written to on exit.
+    """
+
+    def __init__(
+        self,
+        file: Union[str, PathLike],
+        *,
+        model: Callable,
+        loader: Callable,
+        dumper: Callable,
+        parser: Optional[Callable] = None,
+        force: bool = False,
+        atomic: bool = False,
+        roundtrip: bool = False,
+        canonical: bool = False,
+    ) -> None:
+        if roundtrip and parser is None:
+            raise ValueError("Round-trip editing requires a parser.")
+
+        self.file = file
+        self.written = False
+        self._model = model
+        self._loader = loader
+        self._dumper = dumper
+        self._parser = parser
+        self._force = force
+        self._atomic = atomic
+        self._roundtrip = roundtrip
+        self._canonical = canonical
+        self._config = None
+        self._exists = False
+        self._text: Optional[str] = None
+
+    def __enter__(self):
+        if os.path.exists(self.file):
+            if self._roundtrip:
+                # The original text is kept so that changes can be patched into it.
+                self._text = _read_text(Path(self.file))
+                self._config = _parse(self._text, self._parser, Path(self.file))
+            else:
+                self._config = self._loader(file=self.file)
+            # Track options changed in place, such as lists that are appended to.
+            self._config.snapshot()
+            self._exists = True
+        else:
+            self._config = self._model()
+
+        return self._config
+
+    def _patch(self) -> Optional[str]:
+        """Patch changes into the original text of the configuration file, if possible."""
+        if self._text is None:
+            return None
+
+        # Imported on first use as it is only needed in round-trip mode.
+        from . import _roundtrip
+
+        return _marshal(self._config, partial(_roundtrip.patch, self._text), Path(self.file))
+
+    def __exit__(self, exc_type, exc_value, traceback) -> bool:
+        if exc_type is not None:
+            return False
+
+        # Data models track changes made to their configuration options,
+        # so untouched configurations are never marshalled.
+        if self._force or not self._exists or self._config.dirty:
+            if (patched := self._patch()) is not None:
+                _logger.debug("Patching changes into %s.", self.file)
+                _write_text(Path(self.file), patched, atomic=self._atomic, fsync_dir=True)
+                _record(Path(self.file), patched)
+            else:
+                self._dumper(
+                    content=self._config,
+                    file=self.file,
+                    atomic=self._atomic,
+                    canonical=self._canonical,
+                )
+            self.written = True
+        else:
+            _logger.debug("Configuration file %s is unchanged. Skipping write.", self.file)
+
+        return False
@@ -0,0 +1,180 @@
+# Copyright 2024 Canonical Ltd.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License version 3 as published by the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Apply configuration changes to the original text of a YAML document.
+
+Only the entries of changed configuration options are rewritten. Comments, key order,
+and formatting of every other entry are preserved byte-for-byte. The position of each
+entry is found using the start and end marks recorded on the nodes of the document's
+representation graph.
+
+Do not use this module directly.
+"""
+
+import logging
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import yaml
+
+from ondemandutils.models import _serializer
+from ondemandutils.models._model import BaseModel
+
+_logger = logging.getLogger(__name__)
+
+# Sentinel for options that are not set.
+_MISSING = object()
+
+# Edits are (start, end, replacement) spans of the original text.
+_Edit = Tuple[int, int, str]
+
+
+def _render(key: str, value: Any, indent: int) -> str:
+    """Render a single mapping entry at the given indentation."""
+    pad = " " * indent
+    return "".join(
+        pad + line if line.strip() else line
+        for line in _serializer.dump({key: value}).splitlines(keepends=True)
+    )
+
+
+def _has_aliases(node: yaml.Node) -> bool:
+    """Check if any node is reachable more than once, i.e. through an alias."""
+    seen = set()
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        if id(node) in seen:
+            return True
+
+        seen.add(id(node))
+        if isinstance(node, yaml.MappingNode):
+            for k, v in node.value:
+                stack += [k, v]
+        elif isinstance(node, yaml.SequenceNode):
+            stack += node.value
+
+    return False
+
+
+def _span(text: str, key: yaml.Node, value: yaml.Node) -> Tuple[int, int]:
+    """Get the span of a block mapping entry.
+
+    The span starts at the beginning of the line holding the key. Entries whose value
+    ends partway through a line extend to the end of that line. Block collections end
+    at the start of the next entry, so trailing blank and comment lines, which usually
+    describe the next entry, are excluded from the span.
+    """
+    start = key.start_mark.index - key.start_mark.column
+    end = value.end_mark.index
+    if value.end_mark.column != 0:
+        newline = text.find("\n", end)
+        return start, len(text) if newline == -1 else newline + 1
+
+    lines = text[start:end].splitlines(keepends=True)
+    while len(lines) > 1 and (not lines[-1].strip() or lines[-1].lstrip().startswith("#")):
+        end -= len(lines.pop())
+
+    return start, end
+
+
+def _patch_mapping(
+    text: str,
+    node: yaml.MappingNode,
+    data: Dict[str, Any],
+    changed: Set[str],
+    edits: List[_Edit],
+) -> None:
+    """Collect edits that apply changed options to a block mapping node."""
+    entries = {k.value: (k, v) for k, v in node.value if isinstance(k, yaml.ScalarNode)}
+    indent = node.value[0][0].start_mark.column
+    insert_at = max(_span(text, k, v)[1] for k, v in node.value)
+    nested: Dict[str, Set[str]] = {}
+    for option in changed:
+        if "." in option:
+            parent, child = option.split(".", 1)
+            nested.setdefault(parent, set()).add(child)
+
+    inserted = []
+    for option in sorted(o for o in changed if "." not in o):
+        value = data.get(option, _MISSING)
+        if option not in entries:
+            if value is not _MISSING:
+                inserted.append(_render(option, value, indent))
+            continue
+
+        k, v = entries[option]
+        start, end = _span(text, k, v)
+        if value is _MISSING:
+            edits.append((start, end, ""))
+        elif (
+            option in nested
+            and isinstance(value, dict)
+            and value
+            and isinstance(v, yaml.MappingNode)
+            and not v.flow_style
+            and v.value
+        ):
+            _patch_mapping(text, v, value, nested[option], edits)
+        else:
+            edits.append((start, end, _render(option, value, indent)))
+
+    if inserted:
+        edits.append((insert_at, insert_at, "".join(inserted)))
+
+
+def patch(text: str, config: BaseModel) -> Optional[str]:
+    """Apply the changed options of a configuration to its original YAML document.
+
+    Args:
+        text: Original YAML document that `config` was loaded from.
+        config: Configuration loaded from `text`, with its changes tracked.
+
+    Returns:
+        Patched YAML document, or None if the document cannot be patched in place
+        and must be rewritten in full.
+    """
+    if not (changed := config.changed):
+        return text
+
+    if not text.endswith("\n"):
+        text += "\n"
+
+    try:
+        root = _serializer.compose(text)
+    except yaml.YAMLError:
+        return None
+
+    if (
+        not isinstance(root, yaml.MappingNode)
+        or root.flow_style
+        or not root.value
+        or ("&" in text and _has_aliases(root))
+    ):
+        _logger.debug("Document cannot be patched in place. Rewriting in full.")
+        return None
+
+    edits: List[_Edit] = []
+    _patch_mapping(text, root, config.data, set(changed), edits)
+
+    # Apply edits from the end of the document so earlier positions stay valid.
+    # Insertions and replacements never overlap as each option is edited once.
+    for start, end, replacement in sorted(edits, key=lambda e: (e[0], e[1]), reverse=True):
+        text = text[:start] + replacement + text[end:]
+
+    # Guard against documents whose layout could not be patched faithfully.
+    if _serializer.load(text) != config.data:
+        _logger.debug("Patched document does not match configuration. Rewriting in full.")
+        return None
+
+    return text
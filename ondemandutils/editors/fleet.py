@@ -0,0 +1,196 @@
+# Copyright 2024 Canonical Ltd.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License version 3 as published by the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Load many Open Ondemand configuration files concurrently."""
+
+__all__ = ["LoadResult", "LoadReport", "iter_load", "load_all"]
+
+import logging
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from contextlib import nullcontext
+from os import PathLike
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, NamedTuple, Optional, Tuple, Union
+
+from ondemandutils.models._compact import CompactModel
+from ondemandutils.models._model import BaseModel
+
+from ._editor import _parse as _parse_text
+from ._editor import _read_text, editor, file_kind
+
+_logger = logging.getLogger(__name__)
+
+
+class LoadResult(NamedTuple):
+    """Result of loading a single configuration file.
+
+    Attributes:
+        path: Path to the configuration file.
+        config: Loaded configuration, or None if the file could not be loaded.
+        error: Error raised while loading the file, or None if it was loaded.
+    """
+
+    path: Path
+    config: Optional[Union[BaseModel, CompactModel]]
+    error: Optional[Exception]
+
+
+class LoadReport(NamedTuple):
+    """Configuration files loaded by `load_all`.
+
+    Attributes:
+        configs: Loaded configurations keyed by file path.
+        errors: Errors raised while loading configuration files keyed by file path.
+    """
+
+    configs: Dict[Path, Union[BaseModel, CompactModel]]
+    errors: Dict[Path, Exception]
+
+
+def _read(path: Path) -> str:
+    """Read a configuration file."""
+    if not path.exists():
+        raise FileNotFoundError(f"Unable to locate file {path}")
+
+    return _read_text(path)
+
+
+def _parse(kind: str, path: Path, content: str) -> BaseModel:
+    """Parse configuration read from `path` using the editor for `kind`.
+
+    Module-level so that it can be sent to worker processes.
+    """
+    return _parse_text(content, editor(kind).loads, path)
+
+
+def _load(kind: str, path: Path) -> BaseModel:
+    """Read and parse a configuration file."""
+    return _parse(kind, path, _read(path))
+
+
+def iter_load(
+    files: Iterable[Union[str, PathLike]],
+    *,
+    kind: Optional[str] = None,
+    io_workers: int = 8,
+    parse_workers: Optional[int] = None,
+    compact: bool = False,
+) -> Iterator[LoadResult]:
+    """Load many configuration files, yielding results as they complete.
+
+    Files are read by a pool of threads. If `parse_workers` is set, files are parsed
+    and validated by a pool of processes, otherwise they are parsed by the thread
+    that read them. Errors are reported per file rather than raised.
+
+    Args:
+        files: Configuration files to load.
+        kind: Type of every configuration file, either `ood_portal` or `nginx_stage`.
+            If not set, the type is determined from the name of each file.
+        io_workers: Number of threads used to read configuration files.
+        parse_workers: Number of processes used to parse configuration files.
+        compact: Yield compact data models, which use less memory when holding
+            many configurations at once. See `ondemandutils.models.CompactModel`.
+
+    Raises:
+        ValueError: Raised if `kind` is not a supported type of configuration file.
+    """
+    if kind is not None:
+        editor(kind)
+
+    return _iter_load(files, kind, io_workers, parse_workers, compact)
+
+
+def _iter_load(
+    files: Iterable[Union[str, PathLike]],
+    kind: Optional[str],
+    io_workers: int,
+    parse_workers: Optional[int],
+    compact: bool,
+) -> Iterator[LoadResult]:
+    """Load many configuration files once the arguments of `iter_load` are validated."""
+    if parse_workers:
+        # Imported on first use as `multiprocessing` is slow to import.
+        from concurrent.futures import ProcessPoolExecutor
+
+        parse_pool = ProcessPoolExecutor(parse_workers)
+    else:
+        parse_pool = nullcontext()
+
+    with ThreadPoolExecutor(io_workers) as io_pool, parse_pool as parse_pool:
+        # Maps each pending future to its file, its type, and whether it still needs parsing.
+        pending: Dict[Future, Tuple[Path, str, bool]] = {}
+        try:
+            for file in files:
+                path = Path(file)
+                try:
+                    k = kind or file_kind(path)
+                except ValueError as e:
+                    yield LoadResult(path, None, e)
+                    continue
+
+                if parse_pool is not None:
+                    pending[io_pool.submit(_read, path)] = (path, k, True)
+                else:
+                    pending[io_pool.submit(_load, k, path)] = (path, k, False)
+
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    path, k, unparsed = pending.pop(future)
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        _logger.debug("Failed to load %s: %s", path, e)
+                        yield LoadResult(path, None, e)
+                        continue
+
+                    if unparsed:
+                        pending[parse_pool.submit(_parse, k, path, result)] = (path, k, False)
+                    else:
+                        # Compacted here rather than by workers so that strings are
+                        # interned by the process that keeps the configurations.
+                        yield LoadResult(path, result.compact() if compact else result, None)
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+def load_all(
+    files: Iterable[Union[str, PathLike]],
+    *,
+    kind: Optional[str] = None,
+    io_workers: int = 8,
+    parse_workers: Optional[int] = None,
+    compact: bool = False,
+) -> LoadReport:
+    """Load many configuration files.
+
+    Args:
+        files: Configuration files to load.
+        kind: Type of every configuration file, either `ood_portal` or `nginx_stage`.
+            If not set, the type is determined from the name of each file.
+        io_workers: Number of threads used to read configuration files.
+        parse_workers: Number of processes used to parse configuration files.
+        compact: Load compact data models. See `iter_load`.
+    """
+    report = LoadReport({}, {})
+    for result in iter_load(
+        files, kind=kind, io_workers=io_workers, parse_workers=parse_workers, compact=compact
+    ):
+        if result.error is None:
+            report.configs[result.path] = result.config
+        else:
+            report.errors[result.path] = result.error
+
+    return report
@@ -0,0 +1,297 @@
+# Copyright 2024 Canonical Ltd.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License version 3 as published by the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Keep a local history of every version of Open Ondemand configuration files.
+
+A `Store` is a directory holding a snapshot of each version of configuration
+files written by the editors. Snapshots are compressed with zlib and stored under
+the SHA-256 digest of their content, so identical versions, whether of one file
+or of many, are only stored once. An append-only index of JSON lines records which
+snapshot each version of each file has. Rolling back reads one snapshot and
+atomically replaces the file with it, without rendering the configuration again.
+
+Layout of a store:
+
+    <root>/index.jsonl
+    <root>/objects/<first two digits of digest>/<rest of digest>
+"""
+
+__all__ = ["Store", "Version"]
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import zlib
+from contextlib import contextmanager
+from os import PathLike
+from pathlib import Path
+from time import time
+from typing import Dict, List, NamedTuple, Union
+
+from ondemandutils.models import ConfigDiff, diff
+
+from .._files import _fsync_dir, _write_text
+from ._editor import _history, _record, editor, file_kind
+
+_logger = logging.getLogger(__name__)
+
+
+class Version(NamedTuple):
+    """Version of a configuration file recorded in a history store.
+
+    Attributes:
+        path: Absolute path to the configuration file.
+        number: Number of the version. The first version of each file is 1.
+        digest: SHA-256 digest of the content of the version.
+        time: Time the version was recorded, in seconds since the epoch.
+    """
+
+    path: Path
+    number: int
+    digest: str
+    time: float
+
+
+class Store:
+    """Local, content-addressed history of configuration files.
+
+    Args:
+        root: Directory of the store. Created if it does not exist.
+
+    Example:
+        store = Store("/var/lib/ondemandutils/history")
+        with store.track():
+            with ood_portal.edit("/etc/ood/config/ood_portal.yml") as config:
+                config.dex.client_name = "HPC"
+
+        store.rollback("/etc/ood/config/ood_portal.yml", -2)
+    """
+
+    def __init__(self, root: Union[str, PathLike]) -> None:
+        self.root = Path(root)
+        self._objects = self.root / "objects"
+        self._index = self.root / "index.jsonl"
+        self._objects.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        # Versions of each file read from the index so far, and how much of it was read.
+        self._versions: Dict[Path, List[Version]] = {}
+        self._offset = 0
+
+    @contextmanager
+    def track(self):
+        """Record every configuration file written by the editors inside the `with` block.
+
+        Files written inside a `write_batch` are recorded when the batch is committed.
+        """
+        token = _history.set(self)
+        try:
+            yield self
+        finally:
+            _history.reset(token)
+
+    def _refresh(self) -> None:
+        """Read versions appended to the index since it was last read."""
+        try:
+            with self._index.open("rb") as fin:
+                fin.seek(self._offset)
+                data = fin.read()
+        except FileNotFoundError:
+            return
+
+        # A line that is still being appended by another process is read next time.
+        end = data.rfind(b"\n") + 1
+        for line in data[:end].splitlines():
+            entry = json.loads(line)
+            path = Path(entry["path"])
+            versions = self._versions.setdefault(path, [])
+            versions.append(Version(path, len(versions) + 1, entry["digest"], entry["time"]))
+
+        self._offset += end
+
+    def _object(self, digest: str) -> Path:
+        """Get the path of the snapshot with a digest."""
+        return self._objects / digest[:2] / digest[2:]
+
+    def _put(self, data: bytes) -> str:
+        """Store a snapshot, returning its digest. Existing snapshots are not stored again.
+
+        The snapshot is flushed to disk, along with the directories that hold it, before
+        returning, so that the index never refers to a snapshot lost on power failure.
+        """
+        digest = hashlib.sha256(data).hexdigest()
+        obj = self._object(digest)
+        if obj.exists():
+            return digest
+
+        directory = obj.parent
+        if not directory.exists():
+            directory.mkdir(exist_ok=True)
+            _fsync_dir(self._objects)
+
+        tmp = obj.with_name(f".{obj.name}.{os.urandom(4).hex()}.tmp")
+        try:
+            with tmp.open("xb") as fout:
+                fout.write(zlib.compress(data))
+                fout.flush()
+                os.fsync(fout.fileno())
+
+            os.replace(tmp, obj)
+        except BaseException:
+            tmp.unlink(missing_ok=True)
+            raise
+
+        _fsync_dir(directory)
+        return digest
+
+    def record(self, file: Union[str, PathLike], content: Union[str, None] = None) -> Version:
+        """Record the current version of a configuration file.
+
+        Nothing is recorded if the content is the same as the latest recorded version.
+
+        Args:
+            file: Configuration file to record.
+            content: Content of the configuration file. Read from `file` if not set.
+
+        Returns:
+            The latest version of the configuration file.
+        """
+        path = Path(os.path.abspath(file))
+        data = (path.read_text(encoding="ascii") if content is None else content).encode("ascii")
+        digest = self._put(data)
+        with self._lock:
+            self._refresh()
+            versions = self._versions.get(path, [])
+            if versions and versions[-1].digest == digest:
+                return versions[-1]
+
+            entry = {"path": str(path), "digest": digest, "time": time()}
+            line = (json.dumps(entry) + "\n").encode()
+            # Each line is appended with a single write so that concurrent
+            # writers never interleave their lines. The line is flushed to disk
+            # before returning, along with the directory if the index is new.
+            created = not self._index.exists()
+            fd = os.open(self._index, os.O_WRONLY | os.O_APPEND | os.O_CREAT | os.O_CLOEXEC, 0o644)
+            try:
+                os.write(fd, line)
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+
+            if created:
+                _fsync_dir(self.root)
+
+            self._refresh()
+            _logger.debug("Recorded version %s of %s.", digest, path)
+            return self._versions[path][-1]
+
+    def versions(self, file: Union[str, PathLike]) -> List[Version]:
+        """Get every recorded version of a configuration file, oldest first.
+
+        Args:
+            file: Configuration file to get the versions of.
+        """
+        with self._lock:
+            self._refresh()
+            return list(self._versions.get(Path(os.path.abspath(file)), []))
+
+    def version(self, file: Union[str, PathLike], number: int) -> Version:
+        """Get a recorded version of a configuration file.
+
+        Args:
+            file: Configuration file to get a version of.
+            number: Number of the version. Negative numbers count back from the latest
+                version, so -1 is the latest version and -2 the one before it.
+
+        Raises:
+            KeyError: Raised if the version does not exist.
+        """
+        versions = self.versions(file)
+        index = number - 1 if number > 0 else len(versions) + number
+        if number == 0 or not 0 <= index < len(versions):
+            raise KeyError(f"Version {number} of {file} does not exist.")
+
+        return versions[index]
+
+    def read(self, file: Union[str, PathLike], number: int) -> str:
+        """Read the content of a recorded version of a configuration file.
+
+        Args:
+            file: Configuration file to read a version of.
+            number: Number of the version. See `version`.
+
+        Raises:
+            KeyError: Raised if the version does not exist.
+        """
+        digest = self.version(file, number).digest
+        return zlib.decompress(self._object(digest).read_bytes()).decode("ascii")
+
+    def load(self, file: Union[str, PathLike], number: int):
+        """Load a recorded version of a configuration file into a data model.
+
+        Args:
+            file: Configuration file to load a version of. Its type is determined
+                from its name.
+            number: Number of the version. See `version`.
+
+        Raises:
+            KeyError: Raised if the version does not exist.
+            ValueError: Raised if the type of configuration file is not supported.
+        """
+        return editor(file_kind(file)).loads(self.read(file, number))
+
+    def diff(self, file: Union[str, PathLike], old: int, new: int) -> ConfigDiff:
+        """Get the differences between two recorded versions of a configuration file.
+
+        Args:
+            file: Configuration file to compare versions of.
+            old: Number of the old version. See `version`.
+            new: Number of the new version. See `version`.
+
+        Raises:
+            KeyError: Raised if either version does not exist.
+        """
+        return diff(self.load(file, old), self.load(file, new))
+
+    def rollback(
+        self, file: Union[str, PathLike], number: int, *, fsync_dir: bool = True
+    ) -> Version:
+        """Atomically replace a configuration file with a recorded version of it.
+
+        The rollback is recorded as a new version of the file, so it can be undone
+        by rolling back to the version before it.
+
+        Args:
+            file: Configuration file to roll back.
+            number: Number of the version to roll back to. See `version`.
+            fsync_dir: Flush the parent directory of `file` to disk after the write.
+
+        Returns:
+            The latest version of the configuration file. Inside a `write_batch`,
+            the file is written and recorded when the batch is committed.
+
+        Raises:
+            KeyError: Raised if the version does not exist.
+        """
+        path = Path(os.path.abspath(file))
+        content = self.read(path, number)
+        _write_text(path, content, atomic=True, fsync_dir=fsync_dir)
+        token = _history.set(self)
+        try:
+            _record(path, content)
+        finally:
+            _history.reset(token)
+
+        return self.version(path, -1)
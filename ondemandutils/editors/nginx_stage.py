@@ -11,25 +11,51 @@
 
 """Edit `nginx_stage.yml` configuration files."""
 
-__all__ = ["dump", "dumps", "load", "loads", "edit"]
+__all__ = [
+    "dump",
+    "dumps",
+    "load",
+    "loads",
+    "iter_load",
+    "edit",
+    "adump",
+    "aload",
+    "aloads",
+    "aedit",
+]
 
 import os
-from contextlib import contextmanager
-from datetime import datetime
 from functools import partial
 from typing import Union
 
 from ondemandutils.models import NginxStageConfig
 
-from ._editor import dump_base, dumps_base, header, load_base, loads_base
+from ._aio import AsyncEditContext, adump_base, aload_base, aloads_base
+from ._editor import (
+    EditContext,
+    dump_base,
+    dumps_base,
+    header,
+    iter_load_base,
+    load_base,
+    loads_base,
+)
 
 
-def _marshaller(config: NginxStageConfig) -> str:
+def _marshaller(config: NginxStageConfig, canonical: bool = False) -> str:
     """Marshall `NginxStageConfig` object into an `nginx_stage.yml` configuration file.
 
     Args:
         config: `NginxStageConfig` object to marshal into configuration file.
+        canonical: Leave the generation time out of the header, and dump the
+            configuration in canonical form. See `NginxStageConfig.yaml`.
     """
+    if canonical:
+        marshalled = header("`nginx_stage.yml` generated by ondemandutils.")
+        return marshalled + "\n" + config.yaml(canonical=True)
+
+    from datetime import datetime
+
     marshalled = header(f"`nginx_stage.yml` generated at {datetime.now()} by ondemandutils.")
     marshalled += "\n" + config.yaml()
     return marshalled
@@ -51,6 +77,11 @@ Serialise an `NginxStageConfig` object into a YAML document file.
 Args:
     obj: `NginxStageConfig` object to serialise into a YAML document.
     file: File to serialise `NginxStageConfig` object into.
+    atomic: Atomically replace `file` rather than overwriting it in place.
+    fsync_dir: Flush the parent directory of `file` to disk after an atomic write.
+    canonical: Write identical bytes for equal configurations. The header does not
+        contain the generation time, keys are sorted, and options set to `null` are
+        left out.
 """
 
 dumps = partial(dumps_base, marshaller=_marshaller)
@@ -59,6 +90,7 @@ Serialise an `NginxStageConfig` object into a YAML document string.
 
 Args:
     obj: `NginxStageConfig` object to serialise into a YAML document.
+    canonical: Return identical strings for equal configurations. See `dump`.
 """
 
 load = partial(load_base, parser=_parser)
@@ -67,6 +99,8 @@ Deserialise a YAML document file into an `NginxStageConfig` object.
 
 Args:
     file: `nginx_stage.yml` file to deserialise into an `NginxStageConfig` object.
+    cache: Reuse the parsed `NginxStageConfig` object if `file` has not changed since
+        it was last loaded. See `ondemandutils.editors.cache_info`.
 """
 
 loads = partial(loads_base, parser=_parser)
@@ -77,19 +111,123 @@ Args:
     content: String content to deserialise into an `NginxStageConfig` object.
 """
 
+iter_load = partial(iter_load_base, model=NginxStageConfig)
+iter_load.__doc__ = """
+Deserialise each document of a multi-document stream into an `NginxStageConfig` object.
+
+Documents are parsed and validated one at a time as the returned generator is
+consumed, so memory use does not grow with the number of documents. Use to read
+inventories that export many sites' `nginx_stage.yml` configurations as one stream.
 
-@contextmanager
-def edit(file: Union[str, os.PathLike]) -> NginxStageConfig:
+Args:
+    file: File, or open file object, to deserialise `NginxStageConfig` objects from.
+    format: Either `yaml` for a multi-document YAML stream or `jsonl` for JSON lines.
+        If not set, `.jsonl` and `.ndjson` files are read as JSON lines, and any
+        other file as YAML.
+"""
+
+
+def edit(
+    file: Union[str, os.PathLike],
+    *,
+    force: bool = False,
+    atomic: bool = False,
+    roundtrip: bool = False,
+    canonical: bool = False,
+) -> EditContext:
     """Edit an `nginx_stage.yml` configuration file.
 
+    `nginx_stage.yml` is only written to if the configuration was changed while editing.
+    Check the `written` attribute of the returned context manager to determine if
+    `nginx_stage.yml` was written to:
+
+        editor = nginx_stage.edit("/etc/ood/config/nginx_stage.yml")
+        with editor as config:
+            ...
+
+        if editor.written:
+            ...
+
     Args:
         file: File path to `nginx_stage.yml`. If `nginx_stage.yml` does not exist
             at the given path, a blank `nginx_stage.yml` will be created.
+        force: Always write `nginx_stage.yml`, even if the configuration was not changed.
+        atomic: Atomically replace `nginx_stage.yml` rather than overwriting it in place.
+        roundtrip: Only rewrite the entries of changed configuration options, preserving
+            comments and the layout of the rest of `nginx_stage.yml`.
+        canonical: Write `nginx_stage.yml` in canonical form. See `dump`.
     """
-    if not os.path.exists(file):
-        config = NginxStageConfig()
-    else:
-        config = load(file=file)
+    return EditContext(
+        file,
+        model=NginxStageConfig,
+        loader=load,
+        dumper=dump,
+        parser=loads,
+        force=force,
+        atomic=atomic,
+        roundtrip=roundtrip,
+        canonical=canonical,
+    )
+
+
+adump = partial(adump_base, marshaller=_marshaller)
+adump.__doc__ = """
+Serialise an `NginxStageConfig` object into a YAML document file without blocking the event loop.
+
+Args:
+    obj: `NginxStageConfig` object to serialise into a YAML document.
+    file: File to serialise `NginxStageConfig` object into.
+    atomic: Atomically replace `file` rather than overwriting it in place.
+    fsync_dir: Flush the parent directory of `file` to disk after an atomic write.
+    canonical: Write identical bytes for equal configurations. The header does not
+        contain the generation time, keys are sorted, and options set to `null` are
+        left out.
+"""
 
-    yield config
-    dump(content=config, file=file)
+aload = partial(aload_base, parser=_parser)
+aload.__doc__ = """
+Deserialise a YAML document file into an `NginxStageConfig` object without blocking the event loop.
+
+Args:
+    file: `nginx_stage.yml` file to deserialise into an `NginxStageConfig` object.
+    cache: Reuse the parsed `NginxStageConfig` object if `file` has not changed since
+        it was last loaded. See `ondemandutils.editors.cache_info`.
+"""
+
+aloads = partial(aloads_base, parser=_parser)
+aloads.__doc__ = """
+Deserialise a YAML document string into an `NginxStageConfig` object without blocking
+the event loop.
+
+Args:
+    content: String content to deserialise into an `NginxStageConfig` object.
+"""
+
+
+def aedit(
+    file: Union[str, os.PathLike],
+    *,
+    force: bool = False,
+    atomic: bool = False,
+    roundtrip: bool = False,
+    canonical: bool = False,
+) -> AsyncEditContext:
+    """Edit an `nginx_stage.yml` configuration file without blocking the event loop.
+
+    Usage:
+
+        async with nginx_stage.aedit("/etc/ood/config/nginx_stage.yml") as config:
+            ...
+
+    Args:
+        file: File path to `nginx_stage.yml`. If `nginx_stage.yml` does not exist
+            at the given path, a blank `nginx_stage.yml` will be created.
+        force: Always write `nginx_stage.yml`, even if the configuration was not changed.
+        atomic: Atomically replace `nginx_stage.yml` rather than overwriting it in place.
+        roundtrip: Only rewrite the entries of changed configuration options, preserving
+            comments and the layout of the rest of `nginx_stage.yml`.
+        canonical: Write `nginx_stage.yml` in canonical form. See `dump`.
+    """
+    return AsyncEditContext(
+        edit(file, force=force, atomic=atomic, roundtrip=roundtrip, canonical=canonical)
+    )
@@ -14,25 +14,51 @@
 
 """Edit `ood_portal.yml` configuration files."""
 
-__all__ = ["dump", "dumps", "load", "loads", "edit"]
+__all__ = [
+    "dump",
+    "dumps",
+    "load",
+    "loads",
+    "iter_load",
+    "edit",
+    "adump",
+    "aload",
+    "aloads",
+    "aedit",
+]
 
 import os
-from contextlib import contextmanager
-from datetime import datetime
 from functools import partial
 from typing import Union
 
 from ondemandutils.models import OODPortalConfig
 
-from ._editor import dump_base, dumps_base, header, load_base, loads_base
+from ._aio import AsyncEditContext, adump_base, aload_base, aloads_base
+from ._editor import (
+    EditContext,
+    dump_base,
+    dumps_base,
+    header,
+    iter_load_base,
+    load_base,
+    loads_base,
+)
 
 
-def _marshaller(config: OODPortalConfig) -> str:
+def _marshaller(config: OODPortalConfig, canonical: bool = False) -> str:
     """Marshall `OODPortalConfig` object into an `ood_portal.yml` configuration file.
 
     Args:
         config: `OODPortalConfig` object to marshal into configuration file.
+        canonical: Leave the generation time out of the header, and dump the
+            configuration in canonical form. See `OODPortalConfig.yaml`.
     """
+    if canonical:
+        marshalled = header("`ood_portal.yml` generated by ondemandutils.")
+        return marshalled + "\n" + config.yaml(canonical=True)
+
+    from datetime import datetime
+
     marshalled = header(f"`ood_portal.yml` generated at {datetime.now()} by ondemandutils.")
     marshalled += "\n" + config.yaml()
     return marshalled
@@ -54,6 +80,11 @@ Serialise an `OODPortalConfig` object into a YAML document file.
 Args:
     obj: `OODPortalConfig` object to serialise into a YAML document.
     file: File to serialise `OODPortalConfig` object into.
+    atomic: Atomically replace `file` rather than overwriting it in place.
+    fsync_dir: Flush the parent directory of `file` to disk after an atomic write.
+    canonical: Write identical bytes for equal configurations. The header does not
+        contain the generation time, keys are sorted, and options set to `null` are
+        left out.
 """
 
 dumps = partial(dumps_base, marshaller=_marshaller)
@@ -62,6 +93,7 @@ Serialise an `OODPortalConfig` object into a YAML document string.
 
 Args:
     obj: `OODPortalConfig` object to serialise into a YAML document.
+    canonical: Return identical strings for equal configurations. See `dump`.
 """
 
 load = partial(load_base, parser=_parser)
@@ -70,6 +102,8 @@ Deserialise a YAML document file into an `OODPortalConfig` object.
 
 Args:
     file: `ood_portal.yml` file to deserialise into an `OODPortalConfig` object.
+    cache: Reuse the parsed `OODPortalConfig` object if `file` has not changed since
+        it was last loaded. See `ondemandutils.editors.cache_info`.
 """
 
 loads = partial(loads_base, parser=_parser)
@@ -80,19 +114,123 @@ Args:
     content: String content to deserialise into an `OODPortalConfig` object.
 """
 
+iter_load = partial(iter_load_base, model=OODPortalConfig)
+iter_load.__doc__ = """
+Deserialise each document of a multi-document stream into an `OODPortalConfig` object.
+
+Documents are parsed and validated one at a time as the returned generator is
+consumed, so memory use does not grow with the number of documents. Use to read
+inventories that export many sites' `ood_portal.yml` configurations as one stream.
 
-@contextmanager
-def edit(file: Union[str, os.PathLike]) -> OODPortalConfig:
+Args:
+    file: File, or open file object, to deserialise `OODPortalConfig` objects from.
+    format: Either `yaml` for a multi-document YAML stream or `jsonl` for JSON lines.
+        If not set, `.jsonl` and `.ndjson` files are read as JSON lines, and any
+        other file as YAML.
+"""
+
+
+def edit(
+    file: Union[str, os.PathLike],
+    *,
+    force: bool = False,
+    atomic: bool = False,
+    roundtrip: bool = False,
+    canonical: bool = False,
+) -> EditContext:
     """Edit an `ood_portal.yml` configuration file.
 
+    `ood_portal.yml` is only written to if the configuration was changed while editing.
+    Check the `written` attribute of the returned context manager to determine if
+    `ood_portal.yml` was written to:
+
+        editor = ood_portal.edit("/etc/ood/config/ood_portal.yml")
+        with editor as config:
+            ...
+
+        if editor.written:
+            ...
+
     Args:
         file: File path to `ood_portal.yml`. If `ood_portal.yml` does not exist
             at the given path, a blank `ood_portal.yml` will be created.
+        force: Always write `ood_portal.yml`, even if the configuration was not changed.
+        atomic: Atomically replace `ood_portal.yml` rather than overwriting it in place.
+        roundtrip: Only rewrite the entries of changed configuration options, preserving
+            comments and the layout of the rest of `ood_portal.yml`.
+        canonical: Write `ood_portal.yml` in canonical form. See `dump`.
     """
-    if not os.path.exists(file):
-        config = OODPortalConfig()
-    else:
-        config = load(file=file)
+    return EditContext(
+        file,
+        model=OODPortalConfig,
+        loader=load,
+        dumper=dump,
+        parser=loads,
+        force=force,
+        atomic=atomic,
+        roundtrip=roundtrip,
+        canonical=canonical,
+    )
+
+
+adump = partial(adump_base, marshaller=_marshaller)
+adump.__doc__ = """
+Serialise an `OODPortalConfig` object into a YAML document file without blocking the event loop.
+
+Args:
+    obj: `OODPortalConfig` object to serialise into a YAML document.
+    file: File to serialise `OODPortalConfig` object into.
+    atomic: Atomically replace `file` rather than overwriting it in place.
+    fsync_dir: Flush the parent directory of `file` to disk after an atomic write.
+    canonical: Write identical bytes for equal configurations. The header does not
+        contain the generation time, keys are sorted, and options set to `null` are
+        left out.
+"""
 
-    yield config
-    dump(content=config, file=file)
+aload = partial(aload_base, parser=_parser)
+aload.__doc__ = """
+Deserialise a YAML document file into an `OODPortalConfig` object without blocking the event loop.
+
+Args:
+    file: `ood_portal.yml` file to deserialise into an `OODPortalConfig` object.
+    cache: Reuse the parsed `OODPortalConfig` object if `file` has not changed since
+        it was last loaded. See `ondemandutils.editors.cache_info`.
+"""
+
+aloads = partial(aloads_base, parser=_parser)
+aloads.__doc__ = """
+Deserialise a YAML document string into an `OODPortalConfig` object without blocking
+the event loop.
+
+Args:
+    content: String content to deserialise into an `OODPortalConfig` object.
+"""
+
+
+def aedit(
+    file: Union[str, os.PathLike],
+    *,
+    force: bool = False,
+    atomic: bool = False,
+    roundtrip: bool = False,
+    canonical: bool = False,
+) -> AsyncEditContext:
+    """Edit an `ood_portal.yml` configuration file without blocking the event loop.
+
+    Usage:
+
+        async with ood_portal.aedit("/etc/ood/config/ood_portal.yml") as config:
+            ...
+
+    Args:
+        file: File path to `ood_portal.yml`. If `ood_portal.yml` does not exist
+            at the given path, a blank `ood_portal.yml` will be created.
+        force: Always write `ood_portal.yml`, even if the configuration was not changed.
+        atomic: Atomically replace `ood_portal.yml` rather than overwriting it in place.
+        roundtrip: Only rewrite the entries of changed configuration options, preserving
+            comments and the layout of the rest of `ood_portal.yml`.
+        canonical: Write `ood_portal.yml` in canonical form. See `dump`.
+    """
+    return AsyncEditContext(
+        edit(file, force=force, atomic=atomic, roundtrip=roundtrip, canonical=canonical)
+    )
@@ -0,0 +1,403 @@
+# Copyright 2024 Canonical Ltd.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License version 3 as published by the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Watch Open Ondemand configuration files for changes.
+
+On Linux, changes are detected with inotify, which is used through `ctypes`. The
+directory of each watched file is watched rather than the file itself, so that files
+replaced by an atomic write are still followed. Elsewhere, or if inotify is not
+available, watched files are polled with `os.stat`.
+
+Only the files that changed are loaded again. Bursts of changes, such as an editor
+writing a file in several steps, are debounced into a single event per file.
+"""
+
+__all__ = ["ChangeEvent", "Watcher"]
+
+import ctypes
+import ctypes.util
+import errno
+import logging
+import os
+import select
+import struct
+import sys
+from os import PathLike
+from pathlib import Path
+from time import monotonic, sleep
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+)
+
+from ondemandutils.models import ConfigDiff, diff
+
+from ._editor import editor, file_kind
+
+_logger = logging.getLogger(__name__)
+_BACKENDS = ("inotify", "poll")
+
+# Flags from <sys/inotify.h>.
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_NONBLOCK = os.O_NONBLOCK
+_IN_CLOEXEC = os.O_CLOEXEC
+_IN_MASK = _IN_CLOSE_WRITE | _IN_MOVED_FROM | _IN_MOVED_TO | _IN_CREATE | _IN_DELETE
+_EVENT = struct.Struct("iIII")
+
+
+class ChangeEvent(NamedTuple):
+    """Change to a watched configuration file.
+
+    Attributes:
+        path: Path to the configuration file.
+        old: Configuration before the change, or None if the file was created.
+        new: Configuration after the change, or None if the file was removed or
+            could not be loaded.
+        diff: Differences between the old and new configuration, or None if either
+            is None.
+        error: Error raised while loading the file, or None if it was loaded.
+    """
+
+    path: Path
+    old: Any
+    new: Any
+    diff: Optional[ConfigDiff]
+    error: Optional[Exception]
+
+
+def _stat(path: Path) -> Optional[Tuple[int, int, int]]:
+    """Get the identity of the content of a file, or None if it does not exist."""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+
+    return st.st_ino, st.st_mtime_ns, st.st_size
+
+
+class _Inotify:
+    """Detect changes to files with inotify."""
+
+    def __init__(self) -> None:
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self._fd = self._libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+        if self._fd < 0:
+            e = ctypes.get_errno()
+            raise OSError(e, os.strerror(e))
+
+        # `select.select` cannot wait on descriptors above `FD_SETSIZE`, which
+        # long-running processes with many open files can reach.
+        self._poll = select.poll()
+        self._poll.register(self._fd, select.POLLIN)
+        # Watched directories keyed by watch descriptor, and the reverse.
+        self._dirs: Dict[int, Path] = {}
+        self._wds: Dict[Path, int] = {}
+        self._files: Set[Path] = set()
+
+    def add(self, path: Path) -> None:
+        """Start detecting changes to a file."""
+        directory = path.parent
+        if directory not in self._wds:
+            wd = self._libc.inotify_add_watch(self._fd, os.fsencode(directory), _IN_MASK)
+            if wd < 0:
+                e = ctypes.get_errno()
+                raise OSError(e, os.strerror(e), str(directory))
+
+            self._dirs[wd] = directory
+            self._wds[directory] = wd
+
+        self._files.add(path)
+
+    def remove(self, path: Path) -> None:
+        """Stop detecting changes to a file."""
+        self._files.discard(path)
+        directory = path.parent
+        if directory in self._wds and all(f.parent != directory for f in self._files):
+            wd = self._wds.pop(directory)
+            del self._dirs[wd]
+            self._libc.inotify_rm_watch(self._fd, wd)
+
+    def wait(self, timeout: Optional[float]) -> Set[Path]:
+        """Wait for changes to watched files, returning the files that may have changed."""
+        ready = self._poll.poll(None if timeout is None else timeout * 1000)
+        if not ready:
+            return set()
+
+        changed = set()
+        try:
+            buffer = os.read(self._fd, 65536)
+        except BlockingIOError:
+            return changed
+
+        offset = 0
+        while offset < len(buffer):
+            wd, _, _, length = _EVENT.unpack_from(buffer, offset)
+            offset += _EVENT.size
+            name = buffer[offset : offset + length].rstrip(b"\0")
+            offset += length
+            directory = self._dirs.get(wd)
+            if directory is not None and name:
+                path = directory / os.fsdecode(name)
+                if path in self._files:
+                    changed.add(path)
+
+        return changed
+
+    def close(self) -> None:
+        """Stop detecting changes."""
+        if self._fd >= 0:
+            self._poll.unregister(self._fd)
+            os.close(self._fd)
+            self._fd = -1
+
+
+class _Poll:
+    """Detect changes to files by polling them with `os.stat`."""
+
+    def __init__(self, interval: float) -> None:
+        self._interval = interval
+        self._stats: Dict[Path, Optional[Tuple[int, int, int]]] = {}
+
+    def add(self, path: Path) -> None:
+        """Start detecting changes to a file."""
+        self._stats[path] = _stat(path)
+
+    def remove(self, path: Path) -> None:
+        """Stop detecting changes to a file."""
+        self._stats.pop(path, None)
+
+    def wait(self, timeout: Optional[float]) -> Set[Path]:
+        """Wait for changes to watched files, returning the files that changed."""
+        deadline = None if timeout is None else monotonic() + timeout
+        while True:
+            changed = set()
+            for path, before in self._stats.items():
+                if (after := _stat(path)) != before:
+                    self._stats[path] = after
+                    changed.add(path)
+
+            if changed:
+                return changed
+
+            remaining = self._interval if deadline is None else deadline - monotonic()
+            if remaining <= 0:
+                return changed
+
+            sleep(min(self._interval, remaining))
+
+    def close(self) -> None:
+        """Stop detecting changes."""
+        self._stats.clear()
+
+
+def _loader(path: Path) -> Callable[[Path], Any]:
+    """Get the `load` function of the editor that handles a configuration file."""
+    return editor(file_kind(path)).load
+
+
+class Watcher:
+    """Watch configuration files, loading them again when they change.
+
+    Args:
+        files: Configuration files to watch. Their type is determined from their name.
+            More files can be watched with `add`.
+        debounce: Seconds without further changes to a file before it is loaded again.
+        poll_interval: Seconds between checks for changes when polling files.
+        backend: Either `inotify` or `poll`. If not set, inotify is used if it is
+            available, otherwise files are polled.
+
+    Raises:
+        ValueError: Raised if `backend` is not supported.
+        OSError: Raised if `backend` is `inotify` and inotify is not available.
+
+    Example:
+        with Watcher(["/etc/ood/config/ood_portal.yml"]) as watcher:
+            for event in watcher:
+                if event.diff and Impact.APACHE_RELOAD in event.diff.impact:
+                    ...  # Regenerate ood_portal.conf and reload Apache.
+    """
+
+    def __init__(
+        self,
+        files: Iterable[Union[str, PathLike]] = (),
+        *,
+        debounce: float = 0.2,
+        poll_interval: float = 2.0,
+        backend: Optional[str] = None,
+    ) -> None:
+        if backend is not None and backend not in _BACKENDS:
+            raise ValueError(
+                f"Unsupported backend {backend}. Supported backends include: "
+                + ", ".join(_BACKENDS)
+            )
+
+        self.debounce = debounce
+        self._backend: Union[_Inotify, _Poll]
+        if backend == "poll" or (backend is None and not sys.platform.startswith("linux")):
+            self._backend = _Poll(poll_interval)
+        else:
+            try:
+                self._backend = _Inotify()
+            except (OSError, AttributeError) as e:
+                if backend == "inotify":
+                    raise OSError(errno.ENOSYS, f"inotify is not available: {e}") from e
+
+                _logger.debug("inotify is not available, polling files instead: %s", e)
+                self._backend = _Poll(poll_interval)
+
+        # Loading function, loaded configuration, and identity of the loaded
+        # content of each watched file.
+        self._files: Dict[Path, Tuple[Callable[[Path], Any], Any, Any]] = {}
+        for file in files:
+            self.add(file)
+
+    @property
+    def backend(self) -> str:
+        """Get the name of the backend used to detect changes."""
+        return "inotify" if isinstance(self._backend, _Inotify) else "poll"
+
+    def add(
+        self, file: Union[str, PathLike], loader: Optional[Callable[[Path], Any]] = None
+    ) -> None:
+        """Start watching a configuration file.
+
+        The file is loaded straight away if it exists, so that its first change
+        can be compared with its current configuration.
+
+        Args:
+            file: Configuration file to watch. The directory of the file must exist.
+            loader: Function that loads the file. If not set, the `load` function
+                of the editor for the type of file, determined from its name, is used.
+
+        Raises:
+            ValueError: Raised if `loader` is not set and the type of file is not supported.
+        """
+        path = Path(file).absolute()
+        loader = loader or _loader(path)
+        self._backend.add(path)
+        stat = _stat(path)
+        config = None
+        if stat is not None:
+            try:
+                config = loader(path)
+            except Exception as e:
+                _logger.debug("Failed to load %s: %s", path, e)
+
+        self._files[path] = (loader, config, stat)
+
+    def remove(self, file: Union[str, PathLike]) -> None:
+        """Stop watching a configuration file.
+
+        Args:
+            file: Configuration file to stop watching.
+        """
+        path = Path(file).absolute()
+        if self._files.pop(path, None) is not None:
+            self._backend.remove(path)
+
+    def config(self, file: Union[str, PathLike]) -> Any:
+        """Get the last loaded configuration of a watched file.
+
+        Args:
+            file: Watched configuration file.
+
+        Raises:
+            KeyError: Raised if the file is not watched.
+        """
+        return self._files[Path(file).absolute()][1]
+
+    def _reload(self, path: Path) -> Optional[ChangeEvent]:
+        """Load a changed file again, returning the change if its configuration changed."""
+        loader, old, before = self._files[path]
+        stat = _stat(path)
+        if stat == before:
+            return None
+
+        new, changes, error = None, None, None
+        if stat is not None:
+            try:
+                new = loader(path)
+            except Exception as e:
+                _logger.debug("Failed to load %s: %s", path, e)
+                error = e
+
+        if error is None:
+            self._files[path] = (loader, new, stat)
+
+        if old is not None and new is not None:
+            changes = diff(old, new)
+            if not changes:
+                return None
+
+        return ChangeEvent(path, old, new, changes, error)
+
+    def poll(self, timeout: Optional[float] = None) -> List[ChangeEvent]:
+        """Wait for watched configuration files to change.
+
+        Once a file changes, further changes are collected until no file has changed
+        for `debounce` seconds. Each changed file is then loaded again and compared with
+        its previous configuration. Changes that leave a configuration the same are
+        not reported.
+
+        Args:
+            timeout: Seconds to wait for a change. If not set, wait until a
+                configuration changes.
+
+        Returns:
+            Changes to watched configuration files, or an empty list if no
+            configuration changed before the timeout.
+        """
+        deadline = None if timeout is None else monotonic() + timeout
+        while True:
+            remaining = None if deadline is None else max(deadline - monotonic(), 0)
+            changed = self._backend.wait(remaining)
+            if changed:
+                while more := self._backend.wait(self.debounce):
+                    changed |= more
+
+                events = [self._reload(path) for path in sorted(changed)]
+                if events := [event for event in events if event is not None]:
+                    return events
+
+            if deadline is not None and monotonic() >= deadline:
+                return []
+
+    def __iter__(self) -> Iterator[ChangeEvent]:
+        while True:
+            yield from self.poll()
+
+    def close(self) -> None:
+        """Stop watching every configuration file."""
+        self._backend.close()
+        self._files.clear()
+
+    def __enter__(self) -> "Watcher":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> bool:
+        self.close()
+        return False
@@ -0,0 +1,148 @@
+# Copyright 2024 Canonical Ltd.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License version 3 as published by the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Timing events for loading, validating, and writing configuration.
+
+Editors and data models report how long each stage of processing a configuration
+takes to registered callbacks:
+
+* `read`: Reading a configuration file. Size is the number of characters read.
+* `parse`: Parsing a YAML or JSON document. Size is the length of the document.
+* `validate`: Validating configuration options. Size is the number of options.
+* `marshal`: Marshalling a configuration. Size is the length of the output.
+* `write`: Writing a configuration file. Size is the number of characters written.
+
+Events are only created while a callback is registered, so instrumentation
+costs nothing otherwise. Callbacks are called from whichever thread did the
+work, so they must be thread-safe.
+
+Example:
+    from ondemandutils import instrumentation
+    from ondemandutils.editors import ood_portal
+
+    with instrumentation.collect() as collector:
+        with ood_portal.edit("/etc/ood/config/ood_portal.yml") as config:
+            config.servername = "ondemand.example.com"
+
+    for stage, seconds in collector.totals().items():
+        print(stage, seconds)
+"""
+
+__all__ = ["Collector", "Event", "collect", "register", "unregister"]
+
+import logging
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from time import perf_counter
+from typing import Callable, Dict, Iterator, List, NamedTuple, Optional
+
+_logger = logging.getLogger(__name__)
+
+
+class Event(NamedTuple):
+    """Timing of a stage of processing a configuration.
+
+    Attributes:
+        stage: `read`, `parse`, `validate`, `marshal`, or `write`.
+        file: Configuration file being processed, if any.
+        model: Name of the data model class being processed, if known.
+        duration: Time taken in seconds.
+        size: Size of the input or output of the stage.
+    """
+
+    stage: str
+    file: Optional[str]
+    model: Optional[str]
+    duration: float
+    size: int
+
+
+# Registered callbacks. Hot paths check this list before doing any timing.
+_hooks: List[Callable[[Event], None]] = []
+# Configuration file being processed by the current editor call.
+_file: ContextVar[Optional[str]] = ContextVar("_file", default=None)
+
+
+def register(callback: Callable[[Event], None]) -> None:
+    """Register a callback to receive timing events.
+
+    Args:
+        callback: Function called with each `Event`.
+    """
+    _hooks.append(callback)
+
+
+def unregister(callback: Callable[[Event], None]) -> None:
+    """Stop sending timing events to a registered callback.
+
+    Raises:
+        ValueError: Raised if the callback is not registered.
+    """
+    _hooks.remove(callback)
+
+
+def _emit(
+    stage: str,
+    start: float,
+    size: int,
+    *,
+    model: Optional[str] = None,
+    file: Optional[str] = None,
+) -> None:
+    """Send a timing event that started at `start` to registered callbacks."""
+    event = Event(stage, file or _file.get(), model, perf_counter() - start, size)
+    for hook in tuple(_hooks):
+        try:
+            hook(event)
+        except Exception:
+            _logger.warning("Instrumentation callback %r failed.", hook, exc_info=True)
+
+
+class Collector:
+    """Callback that collects timing events.
+
+    Attributes:
+        events: Collected events, in the order they were received.
+    """
+
+    def __init__(self) -> None:
+        self.events: List[Event] = []
+
+    def __call__(self, event: Event) -> None:
+        """Collect a timing event."""
+        self.events.append(event)
+
+    def totals(self, by: str = "stage") -> Dict[Optional[str], float]:
+        """Get the total duration of collected events.
+
+        Args:
+            by: Event attribute to group events by: `stage`, `file`, or `model`.
+        """
+        totals: Dict[Optional[str], float] = defaultdict(float)
+        for event in self.events:
+            totals[getattr(event, by)] += event.duration
+
+        return dict(totals)
+
+
+@contextmanager
+def collect() -> Iterator[Collector]:
+    """Collect timing events sent while inside the `with` block."""
+    collector = Collector()
+    register(collector)
+    try:
+        yield collector
+    finally:
+        unregister(collector)
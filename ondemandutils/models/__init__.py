@@ -12,7 +12,80 @@
 # You should have received a copy of the GNU Lesser General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
-"""Data models for common Open OnDemand objects."""
+"""Data models for common Open OnDemand objects.
 
-from .nginx_stage import NginxStageConfig
-from .ood_portal import DexConfig, OODPortalConfig
+Data models are imported on first use so that importing `ondemandutils.models`
+stays cheap for short-lived processes.
+"""
+
+__all__ = [
+    "Change",
+    "CompactDexConfig",
+    "CompactModel",
+    "CompactNginxStageConfig",
+    "CompactOODPortalConfig",
+    "ComposeInfo",
+    "Composer",
+    "ConfigDiff",
+    "DexConfig",
+    "FrozenMapping",
+    "FrozenSequence",
+    "Impact",
+    "Layer",
+    "Merge",
+    "NginxStageConfig",
+    "OODPortalConfig",
+    "ValidationError",
+    "diff",
+    "yaml_backend",
+]
+
+import importlib
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from ._compact import CompactModel
+    from ._compose import ComposeInfo, Composer, Layer, Merge
+    from ._diff import Change, ConfigDiff, diff
+    from ._model import FrozenMapping, FrozenSequence, ValidationError
+    from ._options import Impact
+    from ._serializer import backend as yaml_backend
+    from .nginx_stage import CompactNginxStageConfig, NginxStageConfig
+    from .ood_portal import CompactDexConfig, CompactOODPortalConfig, DexConfig, OODPortalConfig
+
+# Module and attribute name of each lazily imported object.
+_lazy = {
+    "Change": ("._diff", "Change"),
+    "ConfigDiff": ("._diff", "ConfigDiff"),
+    "CompactModel": ("._compact", "CompactModel"),
+    "ComposeInfo": ("._compose", "ComposeInfo"),
+    "Composer": ("._compose", "Composer"),
+    "Layer": ("._compose", "Layer"),
+    "Merge": ("._compose", "Merge"),
+    "diff": ("._diff", "diff"),
+    "FrozenMapping": ("._model", "FrozenMapping"),
+    "FrozenSequence": ("._model", "FrozenSequence"),
+    "ValidationError": ("._model", "ValidationError"),
+    "Impact": ("._options", "Impact"),
+    "yaml_backend": ("._serializer", "backend"),
+    "NginxStageConfig": (".nginx_stage", "NginxStageConfig"),
+    "CompactNginxStageConfig": (".nginx_stage", "CompactNginxStageConfig"),
+    "DexConfig": (".ood_portal", "DexConfig"),
+    "OODPortalConfig": (".ood_portal", "OODPortalConfig"),
+    "CompactDexConfig": (".ood_portal", "CompactDexConfig"),
+    "CompactOODPortalConfig": (".ood_portal", "CompactOODPortalConfig"),
+}
+
+
+def __getattr__(name: str):
+    if name not in _lazy:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    module, attr = _lazy[name]
+    value = getattr(importlib.import_module(module, __name__), attr)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(globals().keys() | _lazy.keys())
@@ -0,0 +1,420 @@
+# Copyright 2024 Canonical Ltd.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License version 3 as published by the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Compact representation of Open Ondemand data models for large fleets.
+
+Full data models keep their configuration options in a dictionary, and every
+instance also carries an instance dictionary for its own attributes. Compact
+data models have neither: options are stored in a list with one slot per option,
+laid out in the order options are defined by the schema's enum, so option names
+are shared by the class rather than stored by every instance. Strings are
+interned so that values shared across a fleet, such as paths, are stored once.
+"""
+
+import copy
+import sys
+from collections.abc import Mapping, MutableMapping
+from functools import partial
+from time import perf_counter
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple, Type
+
+from ..instrumentation import _emit, _hooks
+from ._model import BaseModel, Schema, ValidationError, _changed, _LazyAccessor, _ModelMixin
+
+
+class _Unset:
+    """Marker for options that are not set."""
+
+    __slots__ = ()
+
+    def __repr__(self) -> str:
+        return "<unset>"
+
+    def __reduce__(self) -> str:
+        # Unpickle as the module-level marker so that identity checks still work.
+        return "_UNSET"
+
+
+_UNSET = _Unset()
+
+
+def _intern(value):
+    """Intern strings inside a value, copying lists and dictionaries."""
+    cls = value.__class__
+    if cls is str:
+        return sys.intern(value)
+    if cls is list:
+        return [_intern(v) for v in value]
+    if cls is dict:
+        return {_intern(k): _intern(v) for k, v in value.items()}
+
+    return value
+
+
+# Accessors are generated from these templates, like the accessors of full data models.
+_GETTER_TEMPLATE = """
+def getter(self):
+    value = self._values[{index}]
+    return None if value is UNSET else value
+"""
+
+_MUTATOR_TEMPLATE = """
+def setter(self, value):
+    self._set({index}, value)
+
+def deleter(self):
+    self._delete({index})
+"""
+
+_accessors: Dict[Tuple[int, str], property] = {}
+
+
+def _compile_accessor(index: int, option: str) -> property:
+    """Generate a property that reads and writes a slot of the value array."""
+    if (prop := _accessors.get((index, option))) is None:
+        namespace = {"UNSET": _UNSET}
+        source = (_GETTER_TEMPLATE + _MUTATOR_TEMPLATE).format(index=index)
+        exec(compile(source, f"<compact accessors of {option}>", "exec"), namespace)
+        prop = _accessors[(index, option)] = property(
+            namespace["getter"],
+            namespace["setter"],
+            namespace["deleter"],
+            f"`{option}` configuration option.",
+        )
+
+    return prop
+
+
+def _nested_accessor(option: str, nested: Type["CompactModel"]) -> property:
+    """Get a property for an option holding nested configuration, such as `dex`."""
+
+    def getter(self):
+        return self[option]
+
+    def setter(self, value):
+        if not isinstance(value, (nested, nested.model)):
+            raise TypeError(f"{value} is not {nested.model}.")
+
+        self[option] = value
+
+    def deleter(self):
+        self[option] = {}
+
+    return property(getter, setter, deleter, f"`{option}` configuration option.")
+
+
+class CompactModel(_ModelMixin, MutableMapping):
+    """Base class for compact Open Ondemand data models.
+
+    Compact data models have the same interface as the full data model they are
+    created for, but use less memory. Nested configuration, such as `dex`, is
+    stored as a compact data model too. Unlike full data models, compact data models
+    only accept the options in their schema. Values are copied when the data
+    model is constructed. Serialisation, merging, and loading methods are shared
+    with full data models.
+
+    Subclasses must define `__slots__ = ()` and name the full data model they represent:
+
+        class CompactNginxStageConfig(CompactModel, model=NginxStageConfig):
+            __slots__ = ()
+    """
+
+    __slots__ = ("_values", "_originals", "_attach")
+
+    model: Type[BaseModel]
+    schema: Schema
+    # Option names in slot order, and the slot of each option.
+    _names: Tuple[str, ...]
+    _index: Dict[str, int]
+    # Compact data models of options that hold nested configuration, keyed by slot.
+    _nested: Dict[int, Type["CompactModel"]]
+
+    def __init_subclass__(
+        cls,
+        *,
+        model: Type[BaseModel],
+        nested: Optional[Dict[str, Type["CompactModel"]]] = None,
+        **kwargs,
+    ) -> None:
+        super().__init_subclass__(**kwargs)
+        if "__slots__" not in cls.__dict__:
+            raise TypeError(f"`{cls.__name__}` must define `__slots__`.")
+
+        cls.model = model
+        cls.schema = schema = model.schema
+        cls._names = schema.names
+        cls._index = {name: i for i, name in enumerate(schema.names)}
+        cls._nested = {cls._index[k]: v for k, v in (nested or {}).items()}
+        model._compact = cls
+        for i, option in enumerate(cls._names):
+            if option in cls.__dict__:
+                continue
+
+            if i in cls._nested:
+                setattr(cls, option, _nested_accessor(option, cls._nested[i]))
+            else:
+                factory = partial(_compile_accessor, i, option)
+                setattr(cls, option, _LazyAccessor(cls, option, factory))
+
+    def __init__(self, obj: Dict[str, Any] = None, /, **kwargs) -> None:
+        start = perf_counter() if _hooks else None
+        self.schema.validate(obj, kwargs)
+        if start is not None:
+            size = len(obj or ()) + len(kwargs)
+            _emit("validate", start, size, model=self.__class__.__name__)
+
+        self._values, self._originals = self._layout((obj, kwargs)), None
+        self._attach = None
+
+    @classmethod
+    def _layout(cls, options) -> List[Any]:
+        """Lay out mappings of validated configuration options in a value array."""
+        values: List[Any] = [_UNSET] * len(cls._names)
+        index = cls._index
+        nested = cls._nested
+        for mapping in options:
+            if not mapping:
+                continue
+
+            for k, v in mapping.items():
+                i = index[k]
+                if isinstance(v, (BaseModel, CompactModel)):
+                    v = v.data
+
+                if i in nested and v is not None:
+                    v = nested[i]._load(v)
+                else:
+                    v = _intern(v)
+
+                values[i] = v
+
+        return values
+
+    @classmethod
+    def _load(cls, options: Mapping):
+        """Construct compact data model object from validated configuration options."""
+        obj = cls.__new__(cls)
+        obj._values = cls._layout((options,))
+        obj._originals = None
+        obj._attach = None
+        return obj
+
+    @classmethod
+    def _parsed(cls, data: Dict[str, Any]):
+        """Construct data model object from configuration that was just parsed."""
+        return cls(**data)
+
+    @classmethod
+    def from_model(cls, model: BaseModel):
+        """Construct compact data model object from a full data model object."""
+        if not isinstance(model, cls.model):
+            raise TypeError(f"Expected `{cls.model.__name__}`, not {type(model)}.")
+
+        return cls._load(model.data)
+
+    def expand(self) -> BaseModel:
+        """Get the configuration as a full data model object."""
+        return self.model(self.dict())
+
+    def _track(self, index: int, original) -> None:
+        """Record the original value of a slot if it is not already recorded."""
+        originals = self._originals
+        if originals is None:
+            originals = self._originals = {}
+
+        if index not in originals:
+            if index in self._nested and isinstance(original, CompactModel):
+                original = original.dict()
+            elif original.__class__ is dict or original.__class__ is list:
+                original = copy.deepcopy(original)
+
+            originals[index] = original
+
+    def _set(self, index: int, value) -> None:
+        """Set the value of a slot, recording its original value."""
+        if self._attach is not None:
+            self._install_view()
+
+        if index in self._nested:
+            value = self._nest(index, value)
+        elif isinstance(value, (BaseModel, CompactModel)):
+            value = _intern(value.data)
+        elif value.__class__ is str:
+            value = sys.intern(value)
+
+        self._track(index, self._values[index])
+        self._values[index] = value
+
+    def _nest(self, index: int, value) -> "CompactModel":
+        """Convert a value to the compact data model of a nested configuration option."""
+        nested = self._nested[index]
+        if isinstance(value, (nested, nested.model)):
+            return nested._load(value.data)
+
+        option = self._names[index]
+        value = value or {}
+        if not isinstance(value, Mapping):
+            raise TypeError(
+                f"Expected `{nested.model.__name__}` for key '{option}', not {type(value)}."
+            )
+
+        try:
+            nested.schema.validate(value)
+        except ValidationError as e:
+            raise TypeError(
+                f"Expected `{nested.model.__name__}` for key '{option}', not {type(value)}. {e}"
+            )
+
+        return nested._load(value)
+
+    def _delete(self, index: int) -> None:
+        """Unset a slot, recording its original value."""
+        if self._attach is not None:
+            self._install_view()
+
+        if self._values[index] is _UNSET:
+            raise KeyError(self._names[index])
+
+        self._track(index, self._values[index])
+        self._values[index] = _UNSET
+
+    def __getitem__(self, key):
+        i = self._index[key]
+        value = self._values[i]
+        if (value is _UNSET or value is None) and i in self._nested:
+            # Nested configuration is not set. Installing an empty data model would
+            # enable it, like `OODPortalConfig.dex`, so the view is only installed
+            # into the value array once it is changed.
+            view = self._nested[i]._load({})
+            view._attach = partial(self._attach_nested, i, view)
+            return view
+
+        if value is _UNSET:
+            raise KeyError(key)
+
+        return value
+
+    def _attach_nested(self, index: int, view: "CompactModel") -> None:
+        """Install a detached view of nested configuration into the value array."""
+        value = self._values[index]
+        if isinstance(value, CompactModel):
+            # Another view was installed first. Share its value array
+            # so that changes made through either view are kept.
+            view._values = value._values
+        else:
+            self._track(index, value)
+            self._values[index] = view
+
+    def __setitem__(self, key, value) -> None:
+        if (i := self._index.get(key)) is None:
+            raise ValidationError(
+                [f"Unrecognised configuration option {key}={value}."], self.schema.keys
+            )
+
+        self._set(i, value)
+
+    def __delitem__(self, key) -> None:
+        self._delete(self._index[key])
+
+    def __iter__(self):
+        names = self._names
+        return (names[i] for i, v in enumerate(self._values) if v is not _UNSET)
+
+    def __len__(self) -> int:
+        return len(self._values) - self._values.count(_UNSET)
+
+    def __contains__(self, key) -> bool:
+        i = self._index.get(key)
+        return i is not None and self._values[i] is not _UNSET
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (BaseModel, CompactModel)):
+            other = other.data
+        elif not isinstance(other, Mapping):
+            return NotImplemented
+
+        return self.data == other
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return repr(self.data)
+
+    def __copy__(self):
+        inst = self.__class__.__new__(self.__class__)
+        inst._values = [v.copy() if isinstance(v, CompactModel) else v for v in self._values]
+        inst._originals = None if self._originals is None else dict(self._originals)
+        inst._attach = None
+        return inst
+
+    @property
+    def data(self) -> Dict[str, Any]:
+        """Get the configuration options as a dictionary.
+
+        The dictionary is created on each access. Lists and dictionaries inside it
+        are shared with the data model, so use `dict` to get an independent copy.
+        """
+        names = self._names
+        return {
+            names[i]: v.data if isinstance(v, CompactModel) else v
+            for i, v in enumerate(self._values)
+            if v is not _UNSET
+        }
+
+    @property
+    def changed(self) -> FrozenSet[str]:
+        """Get the configuration options that were changed.
+
+        Options are compared against their values when the data model was constructed,
+        or when `mark_clean` was last called. Changed options inside nested
+        configuration, such as `dex`, are also reported as `<option>.<nested option>`.
+        """
+        names = self._names
+        values = self._values
+        originals = self._originals or {}
+        tracked = []
+        for i, original in originals.items():
+            value = values[i]
+            if isinstance(value, CompactModel):
+                value = value.data
+
+            tracked.append((names[i], original, value))
+
+        changed = _changed(tracked, self.schema.nested)
+
+        # Nested configuration that was changed in place rather than replaced.
+        for i in self._nested.keys() - originals.keys():
+            if isinstance(values[i], CompactModel) and (nested := values[i].changed):
+                changed.add(names[i])
+                changed.update(f"{names[i]}.{n}" for n in nested)
+
+        return frozenset(changed)
+
+    def mark_clean(self) -> None:
+        """Treat the current configuration options as unchanged."""
+        self._originals = None
+        for i in self._nested:
+            if isinstance(self._values[i], CompactModel):
+                self._values[i].mark_clean()
+
+    def snapshot(self) -> None:
+        """Track lists and dictionaries that are changed in place from now on.
+
+        See `BaseModel.snapshot`.
+        """
+        for i, value in enumerate(self._values):
+            if value.__class__ is dict or value.__class__ is list:
+                self._track(i, value)
+            elif isinstance(value, CompactModel):
+                value.snapshot()
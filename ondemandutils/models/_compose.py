@@ -0,0 +1,289 @@
+# Copyright 2024 Canonical Ltd.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License version 3 as published by the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Compose Open Ondemand configurations from ordered layers of configuration options.
+
+A fleet is usually configured in layers, such as global defaults, then a layer
+per cluster, then a layer per site, then a layer per node. Each layer only sets
+the options it overrides. Layers are deep-merged in order: nested mappings, such
+as `dex`, are merged option by option, and lists are merged using the strategy
+configured for each option.
+
+Merged layers are memoized, so recomposing a fleet after one layer changes only
+merges the stacks of layers that include it:
+
+    composer = Composer(OODPortalConfig, {"server_aliases": Merge.UNIQUE})
+    defaults = Layer("global", OODPortalConfig(port=443, dex={"http_port": 5556}))
+    cluster = Layer("cluster-a", OODPortalConfig(dex={"client_name": "Cluster A"}))
+    site = Layer("site-1", OODPortalConfig(servername="site-1.example.com"))
+    config = composer.compose(defaults, cluster, site)
+"""
+
+__all__ = ["ComposeInfo", "Composer", "Layer", "Merge"]
+
+import copy
+import threading
+from collections.abc import Mapping
+from contextlib import contextmanager
+from enum import Enum
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Tuple, Type, Union
+
+from ._model import BaseModel, FrozenMapping, Schema
+
+
+class Merge(Enum):
+    """Strategies for merging a list option with the same option in a lower layer.
+
+    Attributes:
+        REPLACE: Use the list in the higher layer.
+        APPEND: Append the list in the higher layer to the list in the lower layer.
+        UNIQUE: Append items in the higher layer that are not in the lower layer.
+    """
+
+    REPLACE = "replace"
+    APPEND = "append"
+    UNIQUE = "unique"
+
+
+class Layer:
+    """Named layer of configuration options.
+
+    Layers hold their own copy of the configuration options. Each change made
+    through `update` or `edit` increments `version`, which is how `Composer` knows
+    that stacks including the layer must be merged again.
+
+    Args:
+        name: Name of the layer, such as the name of a cluster or site.
+        config: Configuration options set by the layer.
+
+    Attributes:
+        name: Name of the layer.
+        model: Data model of the configuration options set by the layer.
+        version: Number of times the layer has been changed.
+    """
+
+    __slots__ = ("name", "model", "version", "_data")
+
+    def __init__(self, name: str, config: BaseModel) -> None:
+        if not isinstance(config, BaseModel):
+            raise TypeError(f"Expected data model for layer {name}, not {type(config)}.")
+
+        self.name = name
+        self.model: Type[BaseModel] = type(config)
+        self.version = 0
+        self._data: Dict[str, Any] = config.dict()
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self.name!r}, version={self.version})"
+
+    @property
+    def data(self) -> FrozenMapping:
+        """Get a read-only view of the configuration options set by the layer."""
+        return FrozenMapping(self._data)
+
+    @property
+    def config(self) -> BaseModel:
+        """Get a copy of the configuration options set by the layer."""
+        return self.model._bind(copy.deepcopy(self._data))
+
+    def update(self, config: BaseModel) -> bool:
+        """Replace the configuration options set by the layer.
+
+        Args:
+            config: New configuration options. Must use the same data model as the layer.
+
+        Returns:
+            True if the configuration options were changed.
+        """
+        if not isinstance(config, self.model):
+            raise TypeError(f"Expected `{self.model.__name__}`, not {type(config)}.")
+
+        data = config.dict()
+        if data == self._data:
+            return False
+
+        self._data = data
+        self.version += 1
+        return True
+
+    @contextmanager
+    def edit(self) -> Iterator[BaseModel]:
+        """Edit the configuration options set by the layer.
+
+        Changes are applied when the `with` block exits without an error:
+
+            with layer.edit() as config:
+                config.dex.client_name = "Cluster A"
+        """
+        config = self.config
+        yield config
+        self.update(config)
+
+
+class ComposeInfo(NamedTuple):
+    """Statistics for the memoized layers of a `Composer`.
+
+    Attributes:
+        hits: Compositions whose every layer was already merged.
+        misses: Compositions that needed at least one layer merged.
+        merges: Layers merged in total.
+        currsize: Stacks of layers currently memoized.
+    """
+
+    hits: int
+    misses: int
+    merges: int
+    currsize: int
+
+
+def _unique(old: List[Any], new: List[Any]) -> List[Any]:
+    """Append the items of `new` that are not in `old`."""
+    try:
+        seen = set(old)
+        return old + [i for i in new if i not in seen and not seen.add(i)]
+    except TypeError:
+        # Lists of mappings, such as Dex connectors, hold unhashable items.
+        merged = list(old)
+        for i in new:
+            if i not in merged:
+                merged.append(i)
+
+        return merged
+
+
+def _merge(
+    base: Dict[str, Any], layer: Dict[str, Any], strategies: Dict[str, Merge], prefix: str
+) -> Dict[str, Any]:
+    """Deep-merge a layer into a base mapping without changing either.
+
+    Values that are not changed by the merge are shared with `base` and `layer`
+    rather than copied, so neither may be changed after they are merged.
+    """
+    merged = dict(base)
+    for k, v in layer.items():
+        old = merged.get(k)
+        if isinstance(v, Mapping) and isinstance(old, Mapping):
+            merged[k] = _merge(old, v, strategies, f"{prefix}{k}.")
+        elif isinstance(v, list) and isinstance(old, list):
+            strategy = strategies.get(f"{prefix}{k}", Merge.REPLACE)
+            if strategy is Merge.APPEND:
+                merged[k] = old + v
+            elif strategy is Merge.UNIQUE:
+                merged[k] = _unique(old, v)
+            else:
+                merged[k] = v
+        else:
+            merged[k] = v
+
+    return merged
+
+
+class Composer:
+    """Compose configurations of a data model from ordered layers.
+
+    Every prefix of every stack of layers that is composed is memoized on the
+    identity and version of its layers. Stacks that share lower layers, such as
+    every site in a cluster, also share the merge of those layers. The composer
+    holds references to the layers it has composed until `cache_clear` is called.
+
+    Args:
+        model: Data model of the composed configurations.
+        strategies: Strategy for merging each list option. Options inside nested
+            configuration are named `<option>.<nested option>`, such as `dex.connectors`.
+            Lists are replaced by default.
+    """
+
+    def __init__(
+        self, model: Type[BaseModel], strategies: Optional[Dict[str, Merge]] = None
+    ) -> None:
+        strategies = strategies or {}
+        for option, strategy in strategies.items():
+            if not isinstance(strategy, Merge):
+                raise TypeError(f"Expected `Merge` for option {option}, not {type(strategy)}.")
+
+            schema: Union[Schema, Any] = model.schema
+            for part in option.split("."):
+                if not isinstance(schema, Schema) or part not in schema.keys:
+                    raise ValueError(f"Unrecognised configuration option {option}.")
+
+                schema = schema.types.get(part)
+
+        self.model = model
+        self.strategies = dict(strategies)
+        self._memo: Dict[Tuple[Layer, ...], Tuple[Tuple[int, ...], Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+        self._hits = self._misses = self._merges = 0
+
+    def _compose(self, layers: Tuple[Layer, ...]) -> Dict[str, Any]:
+        """Merge a stack of layers, reusing the longest prefix that is still memoized."""
+        for layer in layers:
+            if layer.model is not self.model:
+                raise TypeError(
+                    f"Cannot compose `{layer.model.__name__}` layer {layer.name} "
+                    + f"into `{self.model.__name__}`."
+                )
+
+        versions = tuple(layer.version for layer in layers)
+        memo = self._memo
+        with self._lock:
+            # Find the longest prefix of the stack whose layers have not changed.
+            depth, merged = 0, {}
+            for n in range(len(layers), 0, -1):
+                entry = memo.get(layers[:n])
+                if entry is not None and entry[0] == versions[:n]:
+                    depth, merged = n, entry[1]
+                    break
+
+            if depth == len(layers):
+                self._hits += 1
+                return merged
+
+            self._misses += 1
+
+        for n in range(depth, len(layers)):
+            merged = _merge(merged, layers[n]._data, self.strategies, "")
+            with self._lock:
+                memo[layers[: n + 1]] = (versions[: n + 1], merged)
+                self._merges += 1
+
+        return merged
+
+    def compose(self, *layers: Layer, frozen: bool = False) -> Union[BaseModel, FrozenMapping]:
+        """Compose a configuration from layers, lowest first.
+
+        Args:
+            layers: Layers to merge, from the layer with the lowest precedence,
+                such as global defaults, to the layer with the highest precedence.
+            frozen: Return a read-only view of the memoized configuration options instead
+                of a data model. The view is not copied, so it is cheap to create.
+
+        Raises:
+            TypeError: Raised if a layer uses a different data model from the composer.
+        """
+        merged = self._compose(layers)
+        if frozen:
+            return FrozenMapping(merged)
+
+        return self.model._bind(copy.deepcopy(merged))
+
+    def cache_info(self) -> ComposeInfo:
+        """Get statistics for the memoized layers."""
+        with self._lock:
+            return ComposeInfo(self._hits, self._misses, self._merges, len(self._memo))
+
+    def cache_clear(self) -> None:
+        """Forget every memoized stack of layers and reset statistics."""
+        with self._lock:
+            self._memo.clear()
+            self._hits = self._misses = self._merges = 0
@@ -0,0 +1,134 @@
+# Copyright 2024 Canonical Ltd.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License version 3 as published by the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Compare Open Ondemand data models and classify the impact of their differences."""
+
+__all__ = ["Change", "ConfigDiff", "diff"]
+
+from collections.abc import Mapping
+from functools import reduce
+from operator import or_
+from typing import Any, List, NamedTuple, Optional, Tuple
+
+from ._model import BaseModel, Schema, _freeze
+from ._options import Impact
+
+
+class Change(NamedTuple):
+    """Change made to a configuration option.
+
+    Attributes:
+        option: Name of the configuration option. Options inside nested
+            configuration, such as `dex`, are named `<option>.<nested option>`.
+        old: Previous value of the option, or None if the option was added.
+        new: New value of the option, or None if the option was removed.
+        impact: Actions needed for the change to take effect.
+    """
+
+    option: str
+    old: Any
+    new: Any
+    impact: Impact
+
+
+class ConfigDiff(NamedTuple):
+    """Differences between two configurations.
+
+    Options that are set to `null` are treated the same as options that are not set,
+    since Open OnDemand uses its default value for both.
+
+    Attributes:
+        added: Options that are only set in the new configuration.
+        removed: Options that are only set in the old configuration.
+        changed: Options whose value is different in the new configuration.
+    """
+
+    added: Tuple[Change, ...]
+    removed: Tuple[Change, ...]
+    changed: Tuple[Change, ...]
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed or self.changed)
+
+    @property
+    def changes(self) -> Tuple[Change, ...]:
+        """Get every change, ordered by option name."""
+        return tuple(sorted(self.added + self.removed + self.changed))
+
+    @property
+    def impact(self) -> Impact:
+        """Get the actions needed for every change to take effect."""
+        return reduce(or_, (c.impact for c in self.changes), Impact.NONE)
+
+
+def _diff(
+    old: Mapping,
+    new: Mapping,
+    schema: Optional[Schema],
+    prefix: str,
+    added: List[Change],
+    removed: List[Change],
+    changed: List[Change],
+) -> None:
+    """Collect the differences between two mappings of configuration options."""
+    types = schema.types if schema else {}
+    impacts = schema.impacts if schema else {}
+    for option in sorted(old.keys() | new.keys()):
+        before = old.get(option)
+        after = new.get(option)
+        if before == after:
+            continue
+
+        nested = types.get(option)
+        if isinstance(nested, Schema) and all(isinstance(v, Mapping) for v in (before, after)):
+            _diff(before, after, nested, f"{prefix}{option}.", added, removed, changed)
+            continue
+
+        change = Change(
+            f"{prefix}{option}",
+            _freeze(before),
+            _freeze(after),
+            impacts.get(option, Impact.NONE),
+        )
+        if before is None:
+            added.append(change)
+        elif after is None:
+            removed.append(change)
+        else:
+            changed.append(change)
+
+
+def diff(old: BaseModel, new: BaseModel) -> ConfigDiff:
+    """Get the differences between two configurations of the same kind.
+
+    Changes to nested configuration, such as `dex`, are reported per nested option.
+    Old and new values are read-only views of the configurations, not copies.
+
+    Args:
+        old: Previous configuration.
+        new: New configuration.
+
+    Raises:
+        TypeError: Raised if the configurations are not of the same kind.
+    """
+    if type(old) is not type(new):
+        raise TypeError(
+            f"Cannot compare `{old.__class__.__name__}` with `{new.__class__.__name__}`."
+        )
+
+    added: List[Change] = []
+    removed: List[Change] = []
+    changed: List[Change] = []
+    _diff(old.data, new.data, new.schema, "", added, removed, changed)
+    return ConfigDiff(tuple(added), tuple(removed), tuple(changed))
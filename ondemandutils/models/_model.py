@@ -15,24 +15,49 @@
 """Macros and base methods for Open Ondemand data models."""
 
 import copy
-import inspect
-import json
 from collections import UserDict
-from functools import wraps
-from typing import Any, Callable, Dict
-
-import yaml
+from collections.abc import Mapping, Sequence
+from enum import Enum
+from functools import partial, wraps
+from time import perf_counter
+from typing import (
+    IO,
+    Any,
+    Callable,
+    Dict,
+    FrozenSet,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Type,
+    Union,
+)
+
+from ..instrumentation import _emit, _hooks
+from . import _serializer
+from ._options import Impact
 
 
 def assert_type(*typed_args, **typed_kwargs):
     """Check the type of args and kwargs passed to a function/method."""
 
     def decorator(func: Callable):
-        sig = inspect.signature(func)
-        bound_types = sig.bind_partial(*typed_args, **typed_kwargs).arguments
+        sig = bound_types = None
 
         @wraps(func)
         def wrapper(*args, **kwargs):
+            nonlocal sig, bound_types
+            if sig is None:
+                # Deferred to the first call so that `inspect` is not imported
+                # when data models are defined.
+                import inspect
+
+                sig = inspect.signature(func)
+                bound_types = sig.bind_partial(*typed_args, **typed_kwargs).arguments
+
             bound_values = sig.bind(*args, **kwargs).arguments
             for name in bound_types.keys() & bound_values.keys():
                 if not isinstance(bound_values[name], bound_types[name]):
@@ -45,65 +70,437 @@ def assert_type(*typed_args, **typed_kwargs):
     return decorator
 
 
+class ValidationError(AttributeError, TypeError):
+    """Raised when a data model is given invalid configuration options.
+
+    Subclasses both `AttributeError`, raised for unrecognised configuration
+    options, and `TypeError`, raised for values of the wrong type.
+
+    Attributes:
+        errors: Every problem found with the configuration options.
+    """
+
+    def __init__(self, errors: List[str], supported: Optional[FrozenSet[str]] = None) -> None:
+        self.errors = errors
+        msg = "Invalid configuration. " + " ".join(errors)
+        if supported:
+            msg += " Supported configurations include: " + ", ".join(sorted(supported))
+
+        super().__init__(msg)
+
+
+class Schema:
+    """Compiled schema of the configuration options supported by a data model.
+
+    Schemas are compiled once when a data model is defined so that validating
+    a configuration is a single pass over its options.
+
+    Args:
+        options: Enum of supported configuration options.
+        types: Expected value types of configuration options. A nested `Schema`
+            validates options whose values are mappings of further options.
+        impacts: Actions needed for changes to configuration options to take effect.
+    """
+
+    __slots__ = ("names", "keys", "types", "impacts", "strict_int", "nested")
+
+    def __init__(
+        self,
+        options: Type[Enum],
+        types: Optional[Dict[Enum, Union[Tuple[type, ...], "Schema"]]] = None,
+        impacts: Optional[Dict[Enum, Impact]] = None,
+    ) -> None:
+        types = types or {}
+        impacts = impacts or {}
+        # Option names in the order they are defined by `options`.
+        self.names: Tuple[str, ...] = tuple(e.name.lower() for e in options)
+        self.keys: FrozenSet[str] = frozenset(self.names)
+        self.types = {e.name.lower(): t for e, t in types.items()}
+        self.impacts = {e.name.lower(): i for e, i in impacts.items()}
+        # Options that expect an `int` but must reject `bool` values.
+        self.strict_int = frozenset(
+            k for k, t in self.types.items() if isinstance(t, tuple) and int in t and bool not in t
+        )
+        # Options whose values are mappings of further options.
+        self.nested = frozenset(k for k, t in self.types.items() if isinstance(t, Schema))
+
+    def errors(self, options: Mapping, prefix: str = "") -> List[str]:
+        """Get every problem with a mapping of configuration options.
+
+        Args:
+            options: Mapping of configuration options to check.
+            prefix: Prefix for option names in error messages.
+        """
+        errors = []
+        keys = self.keys
+        types = self.types
+        for k, v in options.items():
+            if k not in keys:
+                errors.append(f"Unrecognised configuration option {prefix}{k}={v}.")
+            elif v is None or (expected := types.get(k)) is None:
+                continue
+            elif isinstance(expected, Schema):
+                if isinstance(v, Mapping):
+                    errors.extend(expected.errors(v, prefix=f"{prefix}{k}."))
+                else:
+                    errors.append(
+                        f"Expected mapping for configuration option {prefix}{k}, "
+                        + f"not {type(v).__name__}."
+                    )
+            elif not isinstance(v, expected) or (type(v) is bool and k in self.strict_int):
+                errors.append(
+                    f"Expected {' or '.join(t.__name__ for t in expected)} for "
+                    + f"configuration option {prefix}{k}, not {type(v).__name__}."
+                )
+
+        return errors
+
+    def validate(self, *options: Mapping) -> None:
+        """Validate mappings of configuration options.
+
+        Raises:
+            ValidationError: Raised if any configuration option is invalid. Every
+                problem found is reported in the same exception.
+        """
+        errors = []
+        for mapping in options:
+            if mapping:
+                errors.extend(self.errors(mapping))
+
+        if errors:
+            unknown = any(e.startswith("Unrecognised") for e in errors)
+            raise ValidationError(errors, self.keys if unknown else None)
+
+
+_schemas: Dict[Type[Enum], Schema] = {}
+
+
+def _freeze(value):
+    """Wrap mutable containers in read-only views."""
+    if isinstance(value, dict):
+        return FrozenMapping(value)
+    if isinstance(value, list):
+        return FrozenSequence(value)
+
+    return value
+
+
+def _canonical(value):
+    """Normalise configuration into a canonical form for deterministic output.
+
+    Mappings are sorted by key, and options set to `null` are dropped since Open
+    OnDemand treats them the same as options that are not set.
+    """
+    if isinstance(value, Mapping):
+        return {k: _canonical(value[k]) for k in sorted(value) if value[k] is not None}
+    if isinstance(value, Sequence) and not isinstance(value, str):
+        return [_canonical(v) for v in value]
+
+    return value
+
+
+def _json(data: Mapping, canonical: bool) -> str:
+    """Dump configuration into a JSON object."""
+    import json
+
+    if canonical:
+        return json.dumps(_canonical(data), separators=(",", ":"))
+
+    return json.dumps(data)
+
+
+def _yaml(data: Mapping, canonical: bool) -> str:
+    """Dump configuration into a YAML document."""
+    if canonical:
+        return _serializer.dump(_canonical(data), canonical=True)
+
+    return _serializer.dump(data)
+
+
+def _fingerprint(data: Mapping) -> str:
+    """Hash the canonical form of configuration."""
+    import hashlib
+
+    return hashlib.sha256(_json(data, canonical=True).encode()).hexdigest()
+
+
+class FrozenMapping(Mapping):
+    """Read-only view of a data model's internal register.
+
+    Nested dictionaries and lists are wrapped in read-only views as they are
+    accessed, so creating a view never copies the register. The view reflects
+    later changes made to the data model. Use `copy.deepcopy` to get a mutable copy.
+    """
+
+    __slots__ = ("_data",)
+
+    def __init__(self, data: Dict[str, Any]) -> None:
+        self._data = data
+
+    def __getitem__(self, key):
+        return _freeze(self._data[key])
+
+    def __iter__(self):
+        return iter(self._data)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __eq__(self, other) -> bool:
+        return self._data == (other._data if isinstance(other, FrozenMapping) else other)
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self._data!r})"
+
+    def __deepcopy__(self, memo):
+        return copy.deepcopy(self._data, memo)
+
+
+class FrozenSequence(Sequence):
+    """Read-only view of a list inside a data model's internal register."""
+
+    __slots__ = ("_data",)
+
+    def __init__(self, data: List[Any]) -> None:
+        self._data = data
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return FrozenSequence(self._data[index])
+
+        return _freeze(self._data[index])
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __eq__(self, other) -> bool:
+        return self._data == (other._data if isinstance(other, FrozenSequence) else other)
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self._data!r})"
+
+    def __deepcopy__(self, memo):
+        return copy.deepcopy(self._data, memo)
+
+
+_MISSING = object()
+# Types of values that are stored as-is. Checking `isinstance(value, BaseModel)`
+# is comparatively slow as `BaseModel` is an abstract base class.
+_PLAIN = frozenset({str, int, float, bool, list, dict, type(None)})
+
+# Accessors are generated from these templates. Setters and deleters record
+# the original value, like `BaseModel.__setitem__`.
+_GETTER_TEMPLATE = """
+def getter(self):
+    return self.data.get({option!r})
+"""
+
+_MUTATOR_TEMPLATE = """
+def setter(self, value):
+    if self._attach is not None:
+        self._install_view()
+    originals = self._originals
+    if {option!r} not in originals:
+        originals[{option!r}] = self.data.get({option!r}, MISSING)
+    if value.__class__ not in PLAIN and isinstance(value, BaseModel):
+        value = value.dict()
+    self.data[{option!r}] = value
+
+def deleter(self):
+    if self._attach is not None:
+        self._install_view()
+    originals = self._originals
+    if {option!r} not in originals:
+        originals[{option!r}] = self.data.get({option!r}, MISSING)
+    del self.data[{option!r}]
+"""
+
+_accessors: Dict[str, property] = {}
+
+
+def _compile_accessor(option: str) -> property:
+    """Generate a property that reads and writes an option in the internal register."""
+    if (prop := _accessors.get(option)) is None:
+        namespace = {"BaseModel": BaseModel, "MISSING": _MISSING, "PLAIN": _PLAIN}
+        source = (_GETTER_TEMPLATE + _MUTATOR_TEMPLATE).format(option=option)
+        exec(compile(source, f"<accessors of {option}>", "exec"), namespace)
+        prop = _accessors[option] = property(
+            namespace["getter"],
+            namespace["setter"],
+            namespace["deleter"],
+            f"`{option}` configuration option.",
+        )
+
+    return prop
+
+
+class _LazyAccessor:
+    """Descriptor that generates the accessor of a configuration option when first used.
+
+    Generating accessors on first use keeps the cost of compiling them out of import
+    time. Once generated, the accessor replaces this descriptor on the class.
+    """
+
+    __slots__ = ("owner", "option", "factory")
+
+    def __init__(self, owner: type, option: str, factory: Callable[[], property]) -> None:
+        self.owner = owner
+        self.option = option
+        self.factory = factory
+
+    def _install(self) -> property:
+        prop = self.factory()
+        setattr(self.owner, self.option, prop)
+        return prop
+
+    def __get__(self, obj, objtype=None):
+        return self._install().__get__(obj, objtype)
+
+    def __set__(self, obj, value) -> None:
+        self._install().__set__(obj, value)
+
+    def __delete__(self, obj) -> None:
+        self._install().__delete__(obj)
+
+
 # Generate descriptors for Open OnDemand configuration options.
 # These descriptors are used for retrieving configuration values and
 # provide an interface for CRUDing configuration options.
-# The descriptors use an internal _register dictionary object to
-# manage the parsed configuration options from Open OnDemand.
-def base_descriptors(option: str):
-    """Generate descriptors for accessing configuration option values.
+# The descriptors read and write the data model's internal register directly.
+def generate_descriptors(cls: Type["BaseModel"]) -> None:
+    """Generate descriptors for accessing the configuration options of a data model.
+
+    Options that already have a descriptor defined on the data model are skipped.
+    Accessors read and write the internal register directly rather than through
+    `__getitem__` and `__setitem__`, so options that need custom handling must be
+    given their own descriptor.
 
     Args:
-        option: Configuration option to generate descriptors for.
+        cls: Data model to generate descriptors for. Must have a `schema`.
     """
+    for option in sorted(cls.schema.keys):
+        if option in cls.__dict__:
+            continue
 
-    def getter(self):
-        return self.get(option, None)
+        factory = partial(_compile_accessor, option)
+        setattr(cls, option, _LazyAccessor(cls, option, factory))
 
-    def setter(self, value):
-        self[option] = value
 
-    def deleter(self):
-        del self[option]
+def _iter_yaml(stream: Union[str, IO[str]], model: str) -> Iterator[Dict[str, Any]]:
+    """Parse each document in a YAML stream, skipping empty documents.
 
-    return getter, setter, deleter
+    Args:
+        stream: YAML stream to parse. Either a string or a file object.
+        model: Name of the data model the documents are parsed for.
+    """
+    file = getattr(stream, "name", None)
+    documents = _serializer.load_all(stream)
+    while True:
+        start = perf_counter() if _hooks else None
+        try:
+            data, size = next(documents)
+        except StopIteration:
+            return
 
+        if start is not None:
+            _emit("parse", start, size, model=model, file=file)
 
-class BaseModel(UserDict):
-    """Base class for Open Ondemand-related data models."""
+        if data is not None:
+            yield data
 
-    def __init__(self, obj: Dict[str, Any] = None, /, *, validator, **kwargs) -> None:
-        obj = obj or {}
-        for k, v in {**obj, **kwargs}.items():
-            if not hasattr(validator, k.upper()):
-                raise AttributeError(
-                    f"Unrecognised configuration option {k}={v}. "
-                    + "Supported configurations include: "
-                    + ", ".join(e.name.lower() for e in validator)
-                )
 
-        super().__init__(obj, **kwargs)
+def _iter_jsonl(stream: Iterable[str], model: str) -> Iterator[Dict[str, Any]]:
+    """Parse each line of a JSON lines stream, skipping blank lines.
 
-    def __setitem__(self, key, value):
-        super().__setitem__(key, value.dict() if isinstance(value, BaseModel) else value)
+    Args:
+        stream: File object, or any other iterable of lines.
+        model: Name of the data model the lines are parsed for.
+    """
+    import json
 
-    def __or__(self, other):
-        if not isinstance(other, type(self)):
-            raise TypeError(f"Expected `{self.__class__.__name__}`, not {type(other)}.")
+    file = getattr(stream, "name", None)
+    for line in stream:
+        if not line.strip():
+            continue
 
-        return super().__or__(other)
+        start = perf_counter() if _hooks else None
+        data = json.loads(line)
+        if start is not None:
+            _emit("parse", start, len(line), model=model, file=file)
 
-    def __ror__(self, other):
+        yield data
+
+
+def _changed(options: Iterable[Tuple[str, Any, Any]], nested: FrozenSet[str]) -> Set[str]:
+    """Get the names of changed configuration options.
+
+    Args:
+        options: Name, original value, and current value of each tracked option.
+        nested: Options whose values are mappings of further options. Changed options
+            inside them are also reported as `<option>.<nested option>`.
+    """
+    changed = set()
+    for k, original, value in options:
+        if value == original:
+            continue
+
+        changed.add(k)
+        if k in nested and isinstance(original, dict) and isinstance(value, dict):
+            changed.update(
+                f"{k}.{n}"
+                for n in original.keys() | value.keys()
+                if original.get(n, _MISSING) != value.get(n, _MISSING)
+            )
+
+    return changed
+
+
+class _ModelMixin:
+    """Methods shared by full and compact data models.
+
+    Subclasses provide `data`, the configuration options as a dictionary, `changed`,
+    `_attach`, which is called before the first change to a view of nested configuration,
+    and `_parsed`, which constructs a data model from configuration that was just parsed.
+    """
+
+    __slots__ = ()
+
+    def _install_view(self) -> None:
+        """Notify the parent data model of a view before the view is first changed."""
+        attach, self._attach = self._attach, None
+        attach()
+
+    def copy(self):
+        """Get a shallow copy of the data model."""
+        return self.__copy__()
+
+    def _check(self, other) -> None:
         if not isinstance(other, type(self)):
             raise TypeError(f"Expected `{self.__class__.__name__}`, not {type(other)}.")
 
-        return super().__ror__(other)
+    def __or__(self, other):
+        self._check(other)
+        return self.__class__({**self.data, **other.data})
+
+    def __ror__(self, other):
+        self._check(other)
+        return self.__class__({**other.data, **self.data})
 
     def __ior__(self, other):
-        if not isinstance(other, type(self)):
-            raise TypeError(f"Expected `{self.__class__.__name__}`, not {type(other)}.")
+        self._check(other)
+        for k, v in other.data.items():
+            self[k] = v
+
+        return self
 
-        return super().__ior__(other)
+    @property
+    def dirty(self) -> bool:
+        """True if any configuration option was changed."""
+        return bool(self.changed)
 
     @classmethod
     def from_dict(cls, dict_obj: Dict[str, Any]):
@@ -113,29 +510,274 @@ class BaseModel(UserDict):
     @classmethod
     def from_json(cls, json_obj: str):
         """Construct data model object using a JSON object."""
+        import json
+
+        start = perf_counter() if _hooks else None
         data = json.loads(json_obj)
-        return cls(**data)
+        if start is not None:
+            _emit("parse", start, len(json_obj), model=cls.__name__)
+
+        return cls._parsed(data)
 
     @classmethod
     def from_yaml(cls, yaml_doc: str):
         """Construct data model object using a YAML document."""
-        data = yaml.safe_load(yaml_doc)
-        return cls(**data)
+        start = perf_counter() if _hooks else None
+        data = _serializer.load(yaml_doc)
+        if start is not None:
+            _emit("parse", start, len(yaml_doc), model=cls.__name__)
+
+        return cls._parsed(data)
 
-    def dict(self) -> Dict[str, Any]:
+    @classmethod
+    def iter_from_yaml(cls, stream: Union[str, IO[str]]):
+        """Construct a data model object from each document in a YAML stream.
+
+        Documents are parsed and validated one at a time as the generator is
+        consumed, so memory use does not grow with the length of the stream.
+        Empty documents are skipped.
+
+        Args:
+            stream: Multi-document YAML stream. Either a string or a file object.
+        """
+        for data in _iter_yaml(stream, cls.__name__):
+            yield cls._parsed(data)
+
+    @classmethod
+    def iter_from_jsonl(cls, stream: Iterable[str]):
+        """Construct a data model object from each line of a JSON lines stream.
+
+        Lines are parsed and validated one at a time as the generator is
+        consumed, so memory use does not grow with the length of the stream.
+        Blank lines are skipped.
+
+        Args:
+            stream: File object, or any other iterable of JSON objects, one per line.
+        """
+        for data in _iter_jsonl(stream, cls.__name__):
+            yield cls._parsed(data)
+
+    def dict(self, *, frozen: bool = False) -> Union[Dict[str, Any], FrozenMapping]:
         """Get model in dictionary form.
 
         Returns a deep copy of model's internal register. The deep copy is needed
         because assigned variables all point to the same dictionary in memory. Without the
         deep copy, operations performed on the returned dictionary could cause unintended
         mutations in the internal register.
+
+        Args:
+            frozen: Return a read-only view of the internal register instead of a deep
+                copy. The view is not copied, so it is cheap to create. Views of full
+                data models reflect later changes made to the model, while views of
+                compact data models do not reflect options set or deleted later.
         """
+        if frozen:
+            return FrozenMapping(self.data)
+
         return copy.deepcopy(self.data)
 
-    def json(self) -> str:
-        """Get model as JSON object."""
-        return json.dumps(self.data)
+    def json(self, *, canonical: bool = False) -> str:
+        """Get model as JSON object.
+
+        Args:
+            canonical: Sort keys, leave out options set to `null`, and leave out
+                insignificant whitespace, so that equal configurations produce
+                identical output.
+        """
+        return _json(self.data, canonical)
+
+    def yaml(self, *, canonical: bool = False) -> str:
+        """Get model as YAML document.
+
+        Args:
+            canonical: Sort keys, leave out options set to `null`, and use the same
+                dumper settings with every YAML backend, so that equal configurations
+                produce identical output.
+        """
+        return _yaml(self.data, canonical)
+
+    def fingerprint(self) -> str:
+        """Get a stable hash of the configuration.
+
+        The hash is the SHA-256 digest of the canonical JSON form of the configuration,
+        so it does not depend on key order, options set to `null`, the YAML backend,
+        or whether the configuration is held in a compact data model.
+        """
+        return _fingerprint(self.data)
+
+
+class BaseModel(_ModelMixin, UserDict):
+    """Base class for Open Ondemand-related data models.
+
+    Data models track which configuration options are changed after they are
+    constructed. Original values are recorded the first time an option is set or
+    deleted, so tracking only costs in proportion to the options that are changed,
+    and reading options never copies them. Lists and dictionaries changed in place
+    are tracked once `snapshot` is called.
+    """
+
+    schema: Optional[Schema] = None
+    # Compact representation of the data model. Set when one is defined.
+    _compact: Optional[type] = None
+    # Called before the first change to a view of nested configuration.
+    _attach: Optional[Callable[[], None]] = None
+
+    def __init__(
+        self,
+        obj: Dict[str, Any] = None,
+        /,
+        *,
+        validator: Union[Schema, Type[Enum]],
+        **kwargs,
+    ) -> None:
+        if not isinstance(validator, Schema):
+            if (schema := _schemas.get(validator)) is None:
+                schema = _schemas[validator] = Schema(validator)
+            validator = schema
+
+        self._validate(validator, obj, kwargs)
+        # Options have already been validated, so the internal register is populated
+        # directly rather than through `__setitem__`. Nested configuration is copied
+        # so that changes made through its view are not written to the caller's mapping.
+        nested = validator.nested
+        self.data = data = {}
+        for options in (obj, kwargs):
+            if options:
+                for k, v in options.items():
+                    if isinstance(v, BaseModel):
+                        v = v.dict()
+                    elif k in nested and isinstance(v, Mapping):
+                        v = copy.deepcopy(dict(v))
+
+                    data[k] = v
+
+        self._originals: Dict[str, Any] = {}
+
+    @classmethod
+    def _validate(cls, schema: Schema, *options: Optional[Mapping]) -> None:
+        """Validate configuration options, reporting how long it takes to callbacks."""
+        start = perf_counter() if _hooks else None
+        schema.validate(*options)
+        if start is not None:
+            size = sum(len(o or ()) for o in options)
+            _emit("validate", start, size, model=cls.__name__)
+
+    @classmethod
+    def _parsed(cls, data: Dict[str, Any]):
+        """Construct data model object from configuration that was just parsed.
+
+        Nothing else refers to parsed configuration, so it is validated and used as
+        the internal register rather than copied like the constructor's arguments.
+        """
+        if data.__class__ is not dict:
+            # Let the constructor reject documents that are not mappings.
+            return cls(**data)
+
+        cls._validate(cls.schema, data)
+        return cls._bind(data)
+
+    @classmethod
+    def _bind(cls, data: Dict[str, Any], attach: Optional[Callable[[], None]] = None):
+        """Construct data model object that uses `data` as its internal register.
+
+        `data` is neither validated nor copied, so changes made to the data model
+        are written through to `data`. Used to expose nested configuration.
+
+        Args:
+            data: Internal register of the data model.
+            attach: Called before the first change to the data model. Used to record
+                the original value of the nested configuration in a parent data model,
+                or to install `data` into a parent that does not have it yet.
+        """
+        obj = cls.__new__(cls)
+        obj.data = data
+        obj._originals = {}
+        if attach is not None:
+            obj._attach = attach
+
+        return obj
+
+    def __setitem__(self, key, value):
+        if self._attach is not None:
+            self._install_view()
+
+        if key not in self._originals:
+            self._originals[key] = self.data.get(key, _MISSING)
+
+        self.data[key] = value.dict() if isinstance(value, BaseModel) else value
+
+    def __delitem__(self, key):
+        if self._attach is not None:
+            self._install_view()
+
+        if key not in self._originals:
+            self._originals[key] = self.data.get(key, _MISSING)
+
+        del self.data[key]
+
+    def __copy__(self):
+        inst = super().__copy__()
+        inst._originals = dict(self._originals)
+        # Nested configuration is changed in place through views,
+        # so copies must not share it with this data model.
+        if self.schema is not None:
+            data = inst.data
+            for k in self.schema.nested & data.keys():
+                data[k] = copy.deepcopy(data[k])
+
+        return inst
+
+    @property
+    def changed(self) -> FrozenSet[str]:
+        """Get the configuration options that were changed.
+
+        Options are compared against their values when the data model was constructed,
+        or when `mark_clean` was last called. Changed options inside nested
+        configuration, such as `dex`, are also reported as `<option>.<nested option>`.
+        Lists and dictionaries changed in place are only reported once snapshotted.
+        """
+        nested = self.schema.nested if self.schema else frozenset()
+        data = self.data
+        return frozenset(
+            _changed(
+                ((k, original, data.get(k, _MISSING)) for k, original in self._originals.items()),
+                nested,
+            )
+        )
+
+    @property
+    def dirty(self) -> bool:
+        """True if any configuration option was changed."""
+        data = self.data
+        return any(data.get(k, _MISSING) != v for k, v in self._originals.items())
+
+    def mark_clean(self) -> None:
+        """Treat the current configuration options as unchanged."""
+        self._originals = {}
+
+    def snapshot(self) -> None:
+        """Track lists and dictionaries that are changed in place from now on.
+
+        Setting, deleting, and merging options is always tracked, but tracking
+        changes made in place needs a copy of every list and dictionary, so it
+        only starts once this method is called. Editors snapshot the configuration
+        they yield from `edit`.
+        """
+        originals = self._originals
+        for k, v in self.data.items():
+            if k not in originals and isinstance(v, (dict, list)):
+                originals[k] = copy.deepcopy(v)
+
+    def compact(self):
+        """Get the configuration as a compact data model object.
+
+        Compact data models have the same interface but use less memory, which
+        matters when holding many configurations at once, such as a whole fleet.
+
+        Raises:
+            TypeError: Raised if the data model has no compact representation.
+        """
+        if self._compact is None:
+            raise TypeError(f"`{self.__class__.__name__}` has no compact representation.")
 
-    def yaml(self) -> str:
-        """Get model as YAML document."""
-        return yaml.dump(self.data)
+        return self._compact.from_model(self)
@@ -14,7 +14,7 @@
 
 """Validate configuration options for Open Ondemand data models."""
 
-from enum import Enum, auto
+from enum import Enum, Flag, auto
 
 
 class OODPortalOptions(Enum):
@@ -154,3 +154,175 @@ class NginxStageOptions(Enum):
     MIN_UID = auto()
     DISABLED_SHELL = auto()
     DISABLE_BUNDLE_USER_CONFIG = auto()
+
+
+# Expected value types of configuration options. Options that are not listed
+# accept values of any type, and `None` is accepted for every option. `int`
+# does not match `bool` values even though `bool` is a subclass of `int`.
+
+OOD_PORTAL_OPTION_TYPES = {
+    OODPortalOptions.LISTEN_ADDR_PORT: (int, str, list),
+    OODPortalOptions.SERVERNAME: (str,),
+    OODPortalOptions.SERVER_ALIASES: (list,),
+    OODPortalOptions.PROXY_SERVER: (str,),
+    OODPortalOptions.PORT: (int,),
+    OODPortalOptions.SSL: (list,),
+    OODPortalOptions.DISABLE_LOGS: (bool,),
+    OODPortalOptions.LOGROOT: (str,),
+    OODPortalOptions.ERRORLOG: (str,),
+    OODPortalOptions.ACCESSLOG: (str,),
+    OODPortalOptions.LOGFORMAT: (str,),
+    OODPortalOptions.USE_REWRITES: (bool,),
+    OODPortalOptions.USE_MAINTENANCE: (bool,),
+    OODPortalOptions.MAINTENANCE_IP_ALLOWLIST: (list,),
+    OODPortalOptions.SECURITY_CSP_FRAME_ANCESTORS: (str,),
+    OODPortalOptions.SECURITY_STRICT_TRANSPORT: (bool,),
+    OODPortalOptions.LUA_ROOT: (str,),
+    OODPortalOptions.LUA_LOG_LEVEL: (str,),
+    OODPortalOptions.USER_MAP_CMD: (str,),
+    OODPortalOptions.USER_MAP_MATCH: (str,),
+    OODPortalOptions.MAP_FAIL_URI: (str,),
+    OODPortalOptions.PUN_STAGE_CMD: (str,),
+    OODPortalOptions.AUTH: (list,),
+    OODPortalOptions.CUSTOM_VHOST_DIRECTIVES: (list,),
+    OODPortalOptions.CUSTOM_LOCATION_DIRECTIVES: (list,),
+    OODPortalOptions.ROOT_URI: (str,),
+    OODPortalOptions.ANALYTICS: (dict,),
+    OODPortalOptions.PUBLIC_URI: (str,),
+    OODPortalOptions.PUBLIC_ROOT: (str,),
+    OODPortalOptions.LOGOUT_URI: (str,),
+    OODPortalOptions.LOGOUT_REDIRECT: (str,),
+    OODPortalOptions.HOST_REGEX: (str,),
+    OODPortalOptions.NODE_URI: (str,),
+    OODPortalOptions.RNODE_URI: (str,),
+    OODPortalOptions.NGINX_URI: (str,),
+    OODPortalOptions.PUN_URI: (str,),
+    OODPortalOptions.PUN_SOCKET_ROOT: (str,),
+    OODPortalOptions.PUN_MAX_RETRIES: (int,),
+    OODPortalOptions.PUN_PRE_HOOK_ROOT_CMD: (str,),
+    OODPortalOptions.PUN_PRE_HOOK_EXPORTS: (str,),
+    OODPortalOptions.OIDC_URI: (str,),
+    OODPortalOptions.OIDC_DISCOVER_URI: (str,),
+    OODPortalOptions.OIDC_DISCOVER_ROOT: (str,),
+    OODPortalOptions.REGISTER_URI: (str,),
+    OODPortalOptions.REGISTER_ROOT: (str,),
+    OODPortalOptions.OIDC_PROVIDER_METADATA_URL: (str,),
+    OODPortalOptions.OIDC_CLIENT_ID: (str,),
+    OODPortalOptions.OIDC_CLIENT_SECRET: (str,),
+    OODPortalOptions.OIDC_REMOTE_USER_CLAIM: (str,),
+    OODPortalOptions.OIDC_SCOPE: (str,),
+    OODPortalOptions.OIDC_SESSION_INACTIVITY_TIMEOUT: (int,),
+    OODPortalOptions.OIDC_SESSION_MAX_DURATION: (int,),
+    OODPortalOptions.OIDC_STATE_MAX_NUMBER_OF_COOKIES: (str,),
+    # YAML 1.1 parses an unquoted `On` or `Off` as a boolean.
+    OODPortalOptions.OIDC_COOKIE_SAME_SITE: (str, bool),
+    OODPortalOptions.OIDC_SETTINGS: (dict,),
+    # `dex_uri: false` disables the Dex reverse proxy.
+    OODPortalOptions.DEX_URI: (str, bool),
+}
+
+DEX_OPTION_TYPES = {
+    DexOptions.SSL: (bool,),
+    DexOptions.HTTP_PORT: (int,),
+    DexOptions.HTTPS_PORT: (int,),
+    DexOptions.TLS_CERT: (str,),
+    DexOptions.TLS_KEY: (str,),
+    DexOptions.STORAGE_FILE: (str,),
+    DexOptions.CLIENT_ID: (str,),
+    DexOptions.CLIENT_SECRET: (str,),
+    DexOptions.CLIENT_REDIRECT_URIS: (list,),
+    DexOptions.CLIENT_NAME: (str,),
+    DexOptions.CONNECTORS: (list,),
+    DexOptions.FRONTEND: (dict,),
+    DexOptions.GRPC: (dict,),
+    DexOptions.EXPIRY: (dict,),
+}
+
+NGINX_STAGE_OPTION_TYPES = {
+    NginxStageOptions.ONDEMAND_VERSION_PATH: (str,),
+    NginxStageOptions.ONDEMAND_PORTAL: (str,),
+    NginxStageOptions.ONDEMAND_TITLE: (str,),
+    NginxStageOptions.PUN_CUSTOM_ENV: (dict,),
+    NginxStageOptions.PUN_CUSTOM_ENV_DECLARATIONS: (list,),
+    NginxStageOptions.TEMPLATE_ROOT: (str,),
+    NginxStageOptions.PROXY_USER: (str,),
+    NginxStageOptions.NGINX_BIN: (str,),
+    NginxStageOptions.NGINX_SIGNALS: (list,),
+    NginxStageOptions.MIME_TYPES_PATH: (str,),
+    NginxStageOptions.PASSENGER_ROOT: (str,),
+    NginxStageOptions.PASSENGER_RUBY: (str,),
+    NginxStageOptions.PASSENGER_NODEJS: (str,),
+    NginxStageOptions.PASSENGER_PYTHON: (str,),
+    NginxStageOptions.PASSENGER_POOL_IDLE_TIME: (int,),
+    NginxStageOptions.PASSENGER_LOG_FILE: (str,),
+    NginxStageOptions.PASSENGER_OPTIONS: (dict,),
+    NginxStageOptions.NGINX_FILE_UPLOAD_MAX: (int, str),
+    NginxStageOptions.PUN_CONFIG_PATH: (str,),
+    NginxStageOptions.PUN_TMP_ROOT: (str,),
+    NginxStageOptions.PUN_ACCESS_LOG_PATH: (str,),
+    NginxStageOptions.PUN_ERROR_LOG_PATH: (str,),
+    NginxStageOptions.PUN_SECRET_KEY_BASE_PATH: (str,),
+    NginxStageOptions.PUN_LOG_FORMAT: (str,),
+    NginxStageOptions.PUN_PID_PATH: (str,),
+    NginxStageOptions.PUN_SOCKET_PATH: (str,),
+    NginxStageOptions.PUN_SENDFILE_ROOT: (str,),
+    NginxStageOptions.PUN_SENDFILE_URI: (str,),
+    NginxStageOptions.PUN_APP_CONFIGS: (list,),
+    NginxStageOptions.APP_CONFIG_PATH: (dict,),
+    NginxStageOptions.APP_ROOT: (dict,),
+    NginxStageOptions.APP_REQUEST_URI: (dict,),
+    NginxStageOptions.APP_REQUEST_REGEX: (dict,),
+    NginxStageOptions.APP_TOKEN: (dict,),
+    NginxStageOptions.APP_PASSENGER_ENV: (dict,),
+    NginxStageOptions.USER_REGEX: (str,),
+    NginxStageOptions.MIN_UID: (int,),
+    NginxStageOptions.DISABLED_SHELL: (str,),
+    NginxStageOptions.DISABLE_BUNDLE_USER_CONFIG: (bool,),
+}
+
+
+class Impact(Flag):
+    """Actions that must be taken for a configuration change to take effect."""
+
+    NONE = 0
+    # Regenerate `ood_portal.conf` and gracefully reload Apache.
+    APACHE_RELOAD = auto()
+    # Regenerate the Dex configuration and restart Dex.
+    DEX_RESTART = auto()
+    # Rebuild and restart every user's per-user NGINX (PUN).
+    PUN_REBUILD = auto()
+
+
+# Impact of changing each configuration option. Options that are not listed
+# have no impact on running services.
+
+OOD_PORTAL_OPTION_IMPACTS = {
+    **dict.fromkeys(OODPortalOptions, Impact.APACHE_RELOAD),
+    # The Dex issuer and redirect URIs are derived from the portal's public address.
+    OODPortalOptions.SERVERNAME: Impact.APACHE_RELOAD | Impact.DEX_RESTART,
+    OODPortalOptions.PROXY_SERVER: Impact.APACHE_RELOAD | Impact.DEX_RESTART,
+    OODPortalOptions.PORT: Impact.APACHE_RELOAD | Impact.DEX_RESTART,
+    OODPortalOptions.SSL: Impact.APACHE_RELOAD | Impact.DEX_RESTART,
+    OODPortalOptions.DEX_URI: Impact.APACHE_RELOAD | Impact.DEX_RESTART,
+    # Enabling or disabling Dex changes the authentication directives in `ood_portal.conf`.
+    OODPortalOptions.DEX: Impact.APACHE_RELOAD | Impact.DEX_RESTART,
+}
+
+DEX_OPTION_IMPACTS = {
+    **dict.fromkeys(DexOptions, Impact.DEX_RESTART),
+    # Apache authenticates against Dex using its address and client credentials.
+    DexOptions.SSL: Impact.APACHE_RELOAD | Impact.DEX_RESTART,
+    DexOptions.HTTP_PORT: Impact.APACHE_RELOAD | Impact.DEX_RESTART,
+    DexOptions.HTTPS_PORT: Impact.APACHE_RELOAD | Impact.DEX_RESTART,
+    DexOptions.CLIENT_ID: Impact.APACHE_RELOAD | Impact.DEX_RESTART,
+    DexOptions.CLIENT_SECRET: Impact.APACHE_RELOAD | Impact.DEX_RESTART,
+}
+
+NGINX_STAGE_OPTION_IMPACTS = {
+    **dict.fromkeys(NginxStageOptions, Impact.PUN_REBUILD),
+    # Only checked by `nginx_stage` when a PUN is started or cleaned up.
+    NginxStageOptions.NGINX_SIGNALS: Impact.NONE,
+    NginxStageOptions.USER_REGEX: Impact.NONE,
+    NginxStageOptions.MIN_UID: Impact.NONE,
+    NginxStageOptions.DISABLED_SHELL: Impact.NONE,
+}
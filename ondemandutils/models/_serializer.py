@@ -0,0 +1,181 @@
+# Copyright 2024 Canonical Ltd.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License version 3 as published by the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""YAML serializer backends for Open Ondemand data models.
+
+PyYAML ships with two implementations of its loaders and dumpers: a pure-Python
+implementation, and bindings to the libyaml C library. The libyaml bindings are
+significantly faster, but are only available if PyYAML was built against libyaml.
+This module selects the fastest available backend, and falls back to the pure-Python
+implementation if the libyaml bindings are not available.
+
+The backend can be forced by setting the `ONDEMANDUTILS_YAML_BACKEND` environment
+variable to either `libyaml` or `python` before the first YAML document is processed.
+PyYAML is not imported until then.
+"""
+
+__all__ = ["backend", "backends", "compose", "dump", "load", "load_all", "set_backend"]
+
+import logging
+import os
+from typing import IO, Any, Dict, Iterator, Optional, Tuple, Union
+
+_logger = logging.getLogger(__name__)
+
+LIBYAML = "libyaml"
+PYTHON = "python"
+
+_yaml = None
+_backend: Optional[str] = None
+_loader = None
+_dumper = None
+
+
+def _backends() -> Dict[str, Tuple[type, type]]:
+    """Get the loader and dumper of each available backend, importing PyYAML."""
+    import yaml
+
+    backends = {PYTHON: (yaml.SafeLoader, yaml.SafeDumper)}
+    if getattr(yaml, "__with_libyaml__", False):
+        backends[LIBYAML] = (yaml.CSafeLoader, yaml.CSafeDumper)
+
+    return backends
+
+
+def _init() -> None:
+    """Select the default backend."""
+    available = _backends()
+    set_backend(
+        os.getenv("ONDEMANDUTILS_YAML_BACKEND", LIBYAML if LIBYAML in available else PYTHON)
+    )
+
+
+def backends() -> Tuple[str, ...]:
+    """Get the names of the available YAML backends."""
+    return tuple(_backends())
+
+
+def set_backend(name: str) -> None:
+    """Set the backend used for loading and dumping YAML documents.
+
+    Args:
+        name: Name of the backend to use. Either `libyaml` or `python`.
+
+    Raises:
+        ValueError: Raised if the requested backend is not available.
+    """
+    global _yaml, _backend, _loader, _dumper
+
+    available = _backends()
+    if name not in available:
+        raise ValueError(
+            f"YAML backend {name} is not available. "
+            + "Available backends include: "
+            + ", ".join(available)
+        )
+
+    import yaml
+
+    _logger.debug("Using %s backend for YAML serialization.", name)
+    _yaml = yaml
+    _backend = name
+    _loader, _dumper = available[name]
+
+
+def backend() -> str:
+    """Get the name of the active YAML backend."""
+    if _backend is None:
+        _init()
+
+    return _backend
+
+
+def load(yaml_doc: str) -> Any:
+    """Load a YAML document using the active backend.
+
+    Args:
+        yaml_doc: YAML document to load.
+    """
+    if _loader is None:
+        _init()
+
+    return _yaml.load(yaml_doc, Loader=_loader)
+
+
+def load_all(stream: Union[str, IO[str]]) -> Iterator[Tuple[Any, int]]:
+    """Load each document in a YAML stream using the active backend.
+
+    Documents are read, composed, and constructed one at a time, so only
+    the document being loaded is held in memory.
+
+    Args:
+        stream: YAML stream to load. Either a string or a file object.
+
+    Yields:
+        Each document, and its length in characters.
+    """
+    if _loader is None:
+        _init()
+
+    loader = _loader(stream)
+    try:
+        while loader.check_node():
+            node = loader.get_node()
+            yield loader.construct_document(node), node.end_mark.index - node.start_mark.index
+    finally:
+        loader.dispose()
+
+
+def compose(yaml_doc: str) -> Any:
+    """Compose a YAML document into a representation graph using the active backend.
+
+    Nodes in the graph record their start and end positions in `yaml_doc`.
+
+    Args:
+        yaml_doc: YAML document to compose.
+    """
+    if _loader is None:
+        _init()
+
+    return _yaml.compose(yaml_doc, Loader=_loader)
+
+
+# Dumper settings that make the libyaml and pure-Python backends produce identical
+# output. Lines are never folded, as the backends fold long scalars differently.
+_STYLE = {
+    "default_flow_style": False,
+    "indent": 2,
+    "width": 2**31 - 1,
+    "allow_unicode": False,
+    "line_break": "\n",
+    "explicit_start": False,
+    "explicit_end": False,
+}
+_CANONICAL = {**_STYLE, "sort_keys": True}
+
+
+def dump(data: Any, *, canonical: bool = False) -> str:
+    """Dump data into a YAML document using the active backend.
+
+    Every backend produces the same document for the same data.
+
+    Args:
+        data: Data to dump into a YAML document.
+        canonical: Sort keys explicitly rather than relying on the default of
+            the installed PyYAML version.
+    """
+    if _dumper is None:
+        _init()
+
+    return _yaml.dump(data, Dumper=_dumper, **(_CANONICAL if canonical else _STYLE))
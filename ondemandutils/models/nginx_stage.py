@@ -16,18 +16,25 @@
 
 from typing import Any, Dict
 
-from ._model import BaseModel, base_descriptors
-from ._options import NginxStageOptions
+from ._compact import CompactModel
+from ._model import BaseModel, Schema, generate_descriptors
+from ._options import NGINX_STAGE_OPTION_IMPACTS, NGINX_STAGE_OPTION_TYPES, NginxStageOptions
 
 
 class NginxStageConfig(BaseModel):
     """Data model representing the `nginx_stage.yml` configuration file."""
 
+    schema = Schema(NginxStageOptions, NGINX_STAGE_OPTION_TYPES, NGINX_STAGE_OPTION_IMPACTS)
+
     def __init__(self, obj: Dict[str, Any] = None, /, **kwargs) -> None:
-        super().__init__(obj, **kwargs, validator=NginxStageOptions)
+        super().__init__(obj, **kwargs, validator=self.schema)
 
 
 # Generate descriptors for accessing `nginx_stage.yml` configuration options.
-for e in NginxStageOptions:
-    attr_name = e.name.lower()
-    setattr(NginxStageConfig, attr_name, property(*base_descriptors(attr_name)))
+generate_descriptors(NginxStageConfig)
+
+
+class CompactNginxStageConfig(CompactModel, model=NginxStageConfig):
+    """Compact data model representing the `nginx_stage.yml` configuration file."""
+
+    __slots__ = ()
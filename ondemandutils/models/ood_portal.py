@@ -14,60 +14,138 @@
 
 """Data models for the `ood_portal.yml` configuration file."""
 
+import copy
+from collections.abc import Mapping
+from functools import partial
 from typing import Any, Dict
 
-from ._model import BaseModel, assert_type, base_descriptors
-from ._options import DexOptions, OODPortalOptions
+from ._compact import CompactModel
+from ._model import BaseModel, Schema, ValidationError, assert_type, generate_descriptors
+from ._options import (
+    DEX_OPTION_IMPACTS,
+    DEX_OPTION_TYPES,
+    OOD_PORTAL_OPTION_IMPACTS,
+    OOD_PORTAL_OPTION_TYPES,
+    DexOptions,
+    OODPortalOptions,
+)
 
 
 class DexConfig(BaseModel):
     """Data model representing Dex configuration inside `ood_portal.yml`."""
 
+    schema = Schema(DexOptions, DEX_OPTION_TYPES, DEX_OPTION_IMPACTS)
+
     def __init__(self, obj: Dict[str, Any] = None, /, **kwargs) -> None:
-        super().__init__(obj, **kwargs, validator=DexOptions)
+        super().__init__(obj, **kwargs, validator=self.schema)
 
 
 # Generate descriptors for accessing Dex configuration options.
-for e in DexOptions:
-    attr_name = e.name.lower()
-    setattr(DexConfig, attr_name, property(*base_descriptors(attr_name)))
+generate_descriptors(DexConfig)
 
 
 class OODPortalConfig(BaseModel):
     """Data model representing the `ood_portal.yml` configuration file."""
 
+    schema = Schema(
+        OODPortalOptions,
+        {**OOD_PORTAL_OPTION_TYPES, OODPortalOptions.DEX: DexConfig.schema},
+        OOD_PORTAL_OPTION_IMPACTS,
+    )
+
     def __init__(self, obj: Dict[str, Any] = None, /, **kwargs) -> None:
-        super().__init__(obj, **kwargs, validator=OODPortalOptions)
+        super().__init__(obj, **kwargs, validator=self.schema)
 
     def __getitem__(self, key):
-        value = super().__getitem__(key)
-        if key == "dex":
-            return DexConfig(**value)
+        if key != "dex":
+            return super().__getitem__(key)
+
+        view = self.__dict__.get("_dex")
+        if self.data.get("dex") is None:
+            # Dex is not configured. Installing an empty mapping would enable Dex, so the
+            # view is only installed into the internal register once it is changed.
+            if view is None or view._attach is None:
+                data = {}
+                view = self.__dict__["_dex"] = DexConfig._bind(
+                    data, attach=partial(self._attach_dex, data)
+                )
+
+            return view
+
+        # Cache a view of the Dex configuration bound to the internal register
+        # so that repeated access is free and changes are written through.
+        value = self.data["dex"]
+        if view is None or view.data is not value:
+            view = self.__dict__["_dex"] = DexConfig._bind(value, attach=self._track_dex)
 
-        return value
+        return view
+
+    def _attach_dex(self, data: Dict[str, Any]) -> None:
+        """Install the internal register of a detached Dex configuration view."""
+        if self.data.get("dex") is None:
+            BaseModel.__setitem__(self, "dex", data)
+
+    def _track_dex(self) -> None:
+        """Record the original Dex configuration before it is changed through its view."""
+        if "dex" not in self._originals:
+            self._originals["dex"] = copy.deepcopy(self.data["dex"])
 
     def __setitem__(self, key, value):
         if key == "dex" and not isinstance(value, DexConfig):
-            try:
-                v = value or {}
-                value = DexConfig(**v)
-            except AttributeError:
+            value = value or {}
+            if not isinstance(value, Mapping):
                 raise TypeError(
                     f"Expected `{DexConfig.__name__}` for key '{key}', not {type(value)}."
                 )
 
+            try:
+                DexConfig.schema.validate(value)
+            except ValidationError as e:
+                raise TypeError(
+                    f"Expected `{DexConfig.__name__}` for key '{key}', not {type(value)}. {e}"
+                )
+
+            value = copy.deepcopy(value)
+
         super().__setitem__(key, value)
 
+    def __copy__(self):
+        inst = super().__copy__()
+        # The cached Dex configuration view is bound to this data model.
+        inst.__dict__.pop("_dex", None)
+        return inst
+
+    def mark_clean(self) -> None:
+        """Treat the current configuration options as unchanged."""
+        super().mark_clean()
+        # Rebind the Dex configuration so that it starts tracking changes afresh.
+        self.__dict__.pop("_dex", None)
+
+    def snapshot(self) -> None:
+        """Track lists and dictionaries that are changed in place from now on."""
+        super().snapshot()
+        # The Dex configuration view tracks changes against the same snapshot,
+        # which is never changed, so it is shared rather than copied again.
+        if isinstance(original := self._originals.get("dex"), dict):
+            originals = self["dex"]._originals
+            for k, v in original.items():
+                originals.setdefault(k, v)
+
     @property
     def dex(self) -> DexConfig:
-        """Get Dex IDP service configuration."""
+        """Get Dex IDP service configuration.
+
+        Changes made to the returned `DexConfig` object are written through to
+        this `OODPortalConfig` object. If Dex is not configured, an empty
+        `DexConfig` object is returned, and Dex is configured once it is changed.
+        """
         return self["dex"]
 
     @dex.setter
     @assert_type(value=DexConfig)
     def dex(self, value: DexConfig) -> None:
         """Set new Dex IDP service configuration."""
-        self["dex"] = value.dict()
+        self["dex"] = value
 
     @dex.deleter
     def dex(self) -> None:
@@ -76,10 +154,19 @@ class OODPortalConfig(BaseModel):
 
 
 # Generate descriptors for accessing `ood_portal.yml` configuration options.
-for e in OODPortalOptions:
-    attr_name = e.name.lower()
-    # `Dex` section of document is assigned a custom descriptor.
-    if attr_name == "dex":
-        continue
+# `Dex` section of document is assigned a custom descriptor, so it is skipped.
+generate_descriptors(OODPortalConfig)
+
+
+class CompactDexConfig(CompactModel, model=DexConfig):
+    """Compact data model representing Dex configuration inside `ood_portal.yml`."""
+
+    __slots__ = ()
+
+
+class CompactOODPortalConfig(
+    CompactModel, model=OODPortalConfig, nested={"dex": CompactDexConfig}
+):
+    """Compact data model representing the `ood_portal.yml` configuration file."""
 
-    setattr(OODPortalConfig, attr_name, property(*base_descriptors(attr_name)))
+    __slots__ = ()
@@ -0,0 +1,223 @@
+# Copyright 2024 Canonical Ltd.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License version 3 as published by the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Inspect the per-user NGINX (PUN) of every user on a node.
+
+PUNs are enumerated from the `pun_config_path`, `pun_pid_path`, and `pun_socket_path`
+templates of a `NginxStageConfig` object. The directory above the first `%{user}`
+placeholder of each template is listed once with `os.scandir`, and directories below it,
+such as the per-user directory holding both the pid file and the socket, are listed once
+each, so a node is scanned with one directory listing per directory rather than a
+lookup per user and file. Running processes are listed from `/proc` in a single pass.
+"""
+
+__all__ = ["PunState", "ScanReport", "scan"]
+
+import logging
+import os
+import re
+from collections import defaultdict
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set
+
+from ondemandutils._pun_paths import PATH_DEFAULTS, USER_REGEX, PathTemplate
+from ondemandutils.models import NginxStageConfig
+
+_logger = logging.getLogger(__name__)
+
+
+class PunState(NamedTuple):
+    """State of a user's per-user NGINX (PUN).
+
+    Attributes:
+        user: Name of the user.
+        config: Path of the PUN's configuration file, or None if it does not exist.
+        pid_file: Path of the PUN's pid file, or None if it does not exist.
+        socket: Path of the PUN's Unix socket, or None if it does not exist.
+        pid: Process id read from the pid file, or None if it could not be read.
+        running: Whether the process in the pid file is running.
+    """
+
+    user: str
+    config: Optional[str]
+    pid_file: Optional[str]
+    socket: Optional[str]
+    pid: Optional[int]
+    running: bool
+
+
+class ScanReport(NamedTuple):
+    """PUNs found by `scan`.
+
+    Attributes:
+        puns: State of every PUN found keyed by user name.
+        stale_sockets: Sockets of PUNs that are not running.
+        dead_pids: Pid files of PUNs that are not running.
+        orphaned_configs: Configuration files of PUNs that are not running.
+    """
+
+    puns: Dict[str, PunState]
+    stale_sockets: List[str]
+    dead_pids: List[str]
+    orphaned_configs: List[str]
+
+
+class _Listing:
+    """Directory listings, each made at most once per scan."""
+
+    def __init__(self) -> None:
+        self._names: Dict[str, Set[str]] = {}
+
+    def names(self, directory: str) -> Set[str]:
+        """List the names of the entries in a directory."""
+        names = self._names.get(directory)
+        if names is None:
+            try:
+                with os.scandir(directory) as entries:
+                    names = {entry.name for entry in entries}
+            except (FileNotFoundError, NotADirectoryError):
+                names = set()
+            except PermissionError as e:
+                _logger.debug("Unable to list %s: %s", directory, e)
+                names = set()
+
+            self._names[directory] = names
+
+        return names
+
+
+def _find(template: str, user_regex: str, listing: _Listing) -> Dict[str, str]:
+    """Find existing files matching a path template, keyed by user name.
+
+    Raises:
+        ValueError: Raised if the template does not contain a `%{user}` placeholder.
+    """
+    head, sep, tail = template.partition("%{user}")
+    if not sep:
+        raise ValueError(f"Path template {template} does not contain %{{user}}.")
+
+    # Split the template into the directory above the first `%{user}`, the
+    # entry in that directory naming the user, and the path below that entry.
+    root, slash, prefix = head.rpartition("/")
+    root = (root or "/") if slash else "."
+    base = root.rstrip("/") + "/"
+    suffix, slash, rest = tail.partition("/")
+    pattern = re.compile(f"{re.escape(prefix)}(?P<user>{user_regex}){re.escape(suffix)}")
+    below = PathTemplate(rest) if slash else None
+
+    found = {}
+    for name in listing.names(root):
+        match = pattern.fullmatch(name)
+        if match is None:
+            continue
+
+        user = match["user"]
+        path = base + name
+        if below is not None:
+            path = f"{path}/{below.expand(user=user)}"
+            directory, _, file = path.rpartition("/")
+            if file not in listing.names(directory):
+                continue
+
+        found[user] = path
+
+    return found
+
+
+def _running() -> Optional[Set[int]]:
+    """List the ids of running processes, or None if `/proc` is not available."""
+    try:
+        with os.scandir("/proc") as entries:
+            return {int(entry.name) for entry in entries if entry.name.isdigit()}
+    except FileNotFoundError:
+        return None
+
+
+def _alive(pid: int, running: Optional[Set[int]]) -> bool:
+    """Determine whether a process is running."""
+    if running is not None:
+        return pid in running
+
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+
+    return True
+
+
+def _read_pid(file: str) -> Optional[int]:
+    """Read the process id in a pid file."""
+    try:
+        with open(file, "rb") as fin:
+            return int(fin.read(32).split()[0])
+    except (OSError, ValueError, IndexError) as e:
+        _logger.debug("Unable to read pid file %s: %s", file, e)
+        return None
+
+
+def scan(config: NginxStageConfig, users: Optional[Iterable[str]] = None) -> ScanReport:
+    """Find the per-user NGINX (PUN) of every user on the node.
+
+    A PUN is found if its configuration file, pid file, or socket exists. A PUN
+    is running if its pid file holds the id of a running process.
+
+    Args:
+        config: `NginxStageConfig` object with the path templates of PUNs.
+        users: Only report the PUNs of these users.
+
+    Raises:
+        ValueError: Raised if a path template does not contain a `%{user}` placeholder.
+    """
+    options = config.data
+    user_regex = options.get("user_regex") or USER_REGEX
+    listing = _Listing()
+    found = {}
+    for kind, option in (
+        ("config", "pun_config_path"),
+        ("pid_file", "pun_pid_path"),
+        ("socket", "pun_socket_path"),
+    ):
+        found[kind] = _find(options.get(option) or PATH_DEFAULTS[option], user_regex, listing)
+
+    names = set().union(*found.values())
+    if users is not None:
+        names.intersection_update(users)
+
+    running = _running()
+    report = ScanReport({}, [], [], [])
+    states: Dict[str, Dict[str, Optional[str]]] = defaultdict(dict)
+    for kind, paths in found.items():
+        for user, path in paths.items():
+            states[user][kind] = path
+
+    for user in sorted(names):
+        paths = states[user]
+        pid_file = paths.get("pid_file")
+        pid = _read_pid(pid_file) if pid_file else None
+        alive = pid is not None and _alive(pid, running)
+        state = PunState(user, paths.get("config"), pid_file, paths.get("socket"), pid, alive)
+        report.puns[user] = state
+        if alive:
+            continue
+
+        if state.socket:
+            report.stale_sockets.append(state.socket)
+        if state.pid_file:
+            report.dead_pids.append(state.pid_file)
+        if state.config:
+            report.orphaned_configs.append(state.config)
+
+    return report
@@ -0,0 +1,96 @@
+# Copyright 2024 Canonical Ltd.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License version 3 as published by the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Line-based templates compiled to Python functions.
+
+Templates are compiled once into a function that appends each rendered line to
+a list, so rendering a template costs no more than the string operations it needs.
+Lines that start with `%`, ignoring indentation, are Python statements: `% if ...:`,
+`% elif ...:`, `% else:`, and `% for ...:` open a block, and `% end` closes it.
+Every other line is output, with `{{ expression }}` replaced by the value of the
+expression. Expressions and statements can use every name in the template's view.
+"""
+
+import re
+from typing import Any, Callable, Dict, Iterable, List
+
+_EXPRESSION = re.compile(r"\{\{(.+?)\}\}")
+_OPENERS = ("if ", "for ", "elif ", "else:")
+
+
+class TemplateError(SyntaxError):
+    """Raised when a template cannot be compiled."""
+
+
+def _line(text: str) -> str:
+    """Generate an expression that renders a line of output."""
+    parts: List[str] = []
+    for i, part in enumerate(_EXPRESSION.split(text)):
+        if i % 2:
+            parts.append(f"_str({part.strip()})")
+        elif part:
+            parts.append(repr(part))
+
+    return " + ".join(parts) if parts else "''"
+
+
+def compile_template(
+    source: str, names: Iterable[str], name: str = "<template>"
+) -> Callable[[Dict[str, Any]], str]:
+    """Compile a template into a function that renders it from a view.
+
+    Args:
+        source: Template to compile.
+        names: Names that the view passed to the compiled function provides.
+        name: Name of the template used in error messages and tracebacks.
+
+    Raises:
+        TemplateError: Raised if the template has unbalanced blocks or invalid Python.
+    """
+    code = ["def render(_view):"]
+    code.extend(f"    {n} = _view[{n!r}]" for n in names)
+    code.extend(["    _lines = []", "    _emit = _lines.append"])
+    depth = 1
+    for number, raw in enumerate(source.splitlines(), start=1):
+        stripped = raw.strip()
+        if not stripped.startswith("%"):
+            code.append("    " * depth + f"_emit({_line(raw)})")
+            continue
+
+        statement = stripped[1:].strip()
+        if statement == "end":
+            depth -= 1
+            if depth < 1:
+                raise TemplateError(f"Unexpected `% end` at line {number} of {name}.")
+        elif statement.startswith(("elif ", "else:")):
+            if depth < 2:
+                raise TemplateError(f"Unexpected `% {statement}` at line {number} of {name}.")
+
+            code.append("    " * (depth - 1) + statement)
+        else:
+            code.append("    " * depth + statement)
+            if statement.startswith(_OPENERS):
+                depth += 1
+
+    if depth != 1:
+        raise TemplateError(f"Missing `% end` in {name}.")
+
+    code.append("    return '\\n'.join(_lines) + '\\n'")
+    namespace: Dict[str, Any] = {"_str": str}
+    try:
+        exec(compile("\n".join(code), name, "exec"), namespace)
+    except SyntaxError as e:
+        raise TemplateError(f"Invalid template {name}: {e.msg}.") from e
+
+    return namespace["render"]
@@ -0,0 +1,550 @@
+# Copyright 2024 Canonical Ltd.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License version 3 as published by the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Render the Apache `ood_portal.conf` virtual host from an `OODPortalConfig` object.
+
+The rendered configuration follows the template used by Open OnDemand's
+`update_ood_portal` generator, and applies the same defaults to options that are
+not set, without needing Ruby on the node. The template is compiled once per
+process when it is first rendered.
+"""
+
+__all__ = ["dump", "render"]
+
+import hashlib
+import os
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Union
+
+from ondemandutils._files import _write_text
+from ondemandutils.models import OODPortalConfig
+
+from ._template import compile_template
+
+_TEMPLATE = r"""#
+# Open OnDemand Portal
+#
+# Generated from `ood_portal.yml` by ondemandutils.
+# Do not edit this file directly. Changes are lost when it is generated again.
+#
+% if listen_addr_port:
+
+% for addr_port in listen_addr_port:
+Listen {{ addr_port }}
+% end
+% end
+% if ssl and servername:
+
+# Redirect HTTP to HTTPS.
+<VirtualHost *:80>
+  ServerName {{ servername }}
+% for alias in server_aliases:
+  ServerAlias {{ alias }}
+% end
+
+  RewriteEngine On
+  RewriteCond %{HTTPS} off
+  RewriteRule ^(.*) https://%{HTTP_HOST}:{{ port }}$1 [R=301,NE,L]
+</VirtualHost>
+% end
+
+<VirtualHost *:{{ port }}>
+% if servername:
+  ServerName {{ servername }}
+% end
+% for alias in server_aliases:
+  ServerAlias {{ alias }}
+% end
+  ServerSignature Off
+% if security_csp_frame_ancestors:
+  Header always set Content-Security-Policy "frame-ancestors {{ security_csp_frame_ancestors }};"
+% end
+% if security_strict_transport:
+  Header always set Strict-Transport-Security "max-age=63072000; includeSubDomains; preload"
+% end
+% for directive in custom_vhost_directives:
+  {{ directive }}
+% end
+% if not disable_logs:
+
+  ErrorLog  "{{ logroot }}/{{ errorlog }}"
+  CustomLog "{{ logroot }}/{{ accesslog }}" {{ logformat }}
+% end
+% if ssl:
+
+  SSLEngine On
+% for directive in ssl:
+  {{ directive }}
+% end
+% end
+% if use_rewrites and proxy_server:
+
+  # Redirect requests for other host names to the canonical host name.
+  RewriteEngine On
+  RewriteCond %{HTTP_HOST} !^({{ proxy_server }}(:{{ port }})?)?$ [NC]
+  RewriteRule ^(.*) {{ protocol }}{{ proxy_server }}:{{ port }}$1 [R,L]
+% end
+% if use_maintenance:
+
+  # Serve the maintenance page while /etc/ood/maintenance.enable exists.
+  RewriteEngine On
+  RewriteCond /etc/ood/maintenance.enable -f
+% for ip in maintenance_ip_allowlist:
+  RewriteCond %{REMOTE_ADDR} !^{{ ip }}$
+% end
+  RewriteCond %{REQUEST_URI} !{{ public_uri }}/maintenance/.*$
+  RewriteRule ^.*$ {{ public_uri }}/maintenance/index.html [R=302,L]
+% end
+
+  # Lua configuration.
+  LuaRoot "{{ lua_root }}"
+% if lua_log_level:
+  LogLevel lua_module:{{ lua_log_level }}
+% end
+  LuaHookLog logger.lua logger
+
+  # Authenticated user to system user mapping.
+% if user_map_cmd:
+  SetEnv OOD_USER_MAP_CMD "{{ user_map_cmd }}"
+% else:
+  SetEnv OOD_USER_MAP_MATCH "{{ user_map_match }}"
+% end
+% if user_env:
+  SetEnv OOD_USER_ENV "{{ user_env }}"
+% end
+% if map_fail_uri:
+  SetEnv OOD_MAP_FAIL_URI "{{ map_fail_uri }}"
+% end
+% if public_uri and public_root:
+
+  # Public assets that do not need authentication.
+  Alias "{{ public_uri }}" "{{ public_root }}"
+  <Directory "{{ public_root }}">
+    Options FollowSymLinks
+    AllowOverride None
+    Require all granted
+  </Directory>
+% end
+% if logout_uri:
+
+  # Log out of the portal.
+  <Location "{{ logout_uri }}">
+    Require all granted
+  </Location>
+  Redirect "{{ logout_uri }}" "{{ logout_redirect }}"
+% end
+% if node_uri:
+
+  # Reverse proxy to web servers on compute nodes, keeping the request path.
+  <LocationMatch "^{{ node_uri }}/(?<host>{{ host_regex }})/(?<port>\d+)">
+% for directive in auth:
+    {{ directive }}
+% end
+% for directive in custom_location_directives:
+    {{ directive }}
+% end
+    # ProxyPassReverse implementation.
+    Header edit Location "^[^/]+//[^/]+" ""
+    # ProxyPassReverseCookieDomain implementation.
+    Header edit* Set-Cookie ";\s*(?i)Domain[^;]*" ""
+    # ProxyPassReverseCookiePath implementation.
+    Header edit* Set-Cookie ";\s*(?i)Path[^;]*" ""
+    Header edit  Set-Cookie "^([^;]+)" "$1; Path={{ node_uri }}/%{MATCH_HOST}e/%{MATCH_PORT}e"
+    LuaHookFixups node_proxy.lua node_proxy_handler
+  </LocationMatch>
+% end
+% if rnode_uri:
+
+  # Reverse proxy to web servers on compute nodes, stripping the request path.
+  <LocationMatch "^{{ rnode_uri }}/(?<host>{{ host_regex }})/(?<port>\d+)(?<uri>/.*|)">
+% for directive in auth:
+    {{ directive }}
+% end
+% for directive in custom_location_directives:
+    {{ directive }}
+% end
+    # ProxyPassReverse implementation.
+    Header edit Location "^([^/]+//[^/]+)|(?={{ rnode_uri }}/)|^([^/]*)" "{{ rnode_uri }}/%{MATCH_HOST}e/%{MATCH_PORT}e/$3"
+    # ProxyPassReverseCookieDomain implementation.
+    Header edit* Set-Cookie ";\s*(?i)Domain[^;]*" ""
+    # ProxyPassReverseCookiePath implementation.
+    Header edit* Set-Cookie ";\s*(?i)Path[^;]*" ""
+    Header edit  Set-Cookie "^([^;]+)" "$1; Path={{ rnode_uri }}/%{MATCH_HOST}e/%{MATCH_PORT}e"
+    LuaHookFixups node_proxy.lua node_proxy_handler
+  </LocationMatch>
+% end
+% if nginx_uri:
+
+  # Control the per-user NGINX (PUN) of the authenticated user.
+  <Location "{{ nginx_uri }}">
+% for directive in auth:
+    {{ directive }}
+% end
+% for directive in custom_location_directives:
+    {{ directive }}
+% end
+    SetEnv OOD_PUN_STAGE_CMD "{{ pun_stage_cmd }}"
+% if pun_pre_hook_root_cmd:
+    SetEnv OOD_PUN_PRE_HOOK_ROOT_CMD "{{ pun_pre_hook_root_cmd }}"
+% end
+% if pun_pre_hook_exports:
+    SetEnv OOD_PUN_PRE_HOOK_EXPORTS "{{ pun_pre_hook_exports }}"
+% end
+    SetEnv OOD_PUN_URI "{{ pun_uri }}"
+    LuaHookFixups nginx.lua nginx_handler
+  </Location>
+% end
+% if pun_uri:
+
+  # Reverse proxy to the per-user NGINX (PUN) of the authenticated user.
+  <Location "{{ pun_uri }}">
+% for directive in auth:
+    {{ directive }}
+% end
+% for directive in custom_location_directives:
+    {{ directive }}
+% end
+    ProxyPassReverse "http://localhost{{ pun_uri }}"
+    # ProxyPassReverseCookieDomain implementation.
+    Header edit* Set-Cookie ";\s*(?i)Domain[^;]*" ""
+    # ProxyPassReverseCookiePath implementation.
+    Header edit* Set-Cookie ";\s*(?i)Path[^;]*" ""
+    Header edit  Set-Cookie "^([^;]+)" "$1; Path=/"
+    SetEnv OOD_PUN_URI "{{ pun_uri }}"
+    SetEnv OOD_PUN_SOCKET_ROOT "{{ pun_socket_root }}"
+    SetEnv OOD_PUN_MAX_RETRIES "{{ pun_max_retries }}"
+    SetEnv OOD_NGINX_URI "{{ nginx_uri }}"
+% if analytics:
+    SetEnv OOD_ANALYTICS_TRACKING_URL "{{ analytics.get('url', '') }}"
+    SetEnv OOD_ANALYTICS_TRACKING_ID "{{ analytics.get('id', '') }}"
+    LuaHookLog analytics.lua analytics_handler
+% end
+    LuaHookFixups pun_proxy.lua pun_proxy_handler
+  </Location>
+% end
+% if root_uri:
+
+  # Redirect the root of the portal to the dashboard.
+  RedirectMatch ^/$ "{{ root_uri }}"
+% end
+% if oidc_uri:
+
+  # OpenID Connect authentication.
+% for key, value in oidc_settings.items():
+  {{ key }} {{ value }}
+% end
+
+  <Location "{{ oidc_uri }}">
+    AuthType openid-connect
+    Require valid-user
+  </Location>
+% end
+% if oidc_discover_uri and oidc_discover_root:
+
+  # OpenID Connect discovery page.
+  Alias "{{ oidc_discover_uri }}" "{{ oidc_discover_root }}"
+  <Directory "{{ oidc_discover_root }}">
+    Options Indexes FollowSymLinks
+    AllowOverride None
+    Require all granted
+  </Directory>
+% end
+% if register_uri and register_root:
+
+  # Registration page for users without a system user.
+  Alias "{{ register_uri }}" "{{ register_root }}"
+  <Directory "{{ register_root }}">
+% for directive in auth:
+    {{ directive }}
+% end
+    Options Indexes FollowSymLinks
+    AllowOverride None
+  </Directory>
+% end
+% if dex_uri:
+
+  # Reverse proxy to the Dex identity provider.
+  <Location "{{ dex_uri }}">
+    ProxyPreserveHost On
+    ProxyPass "{{ dex_url }}"
+    ProxyPassReverse "{{ dex_url }}"
+  </Location>
+% end
+</VirtualHost>"""
+
+_DEFAULT_AUTH = [
+    "AuthType Basic",
+    'AuthName "Private"',
+    'AuthUserFile "/opt/rh/httpd24/root/etc/httpd/.htpasswd"',
+    "RequestHeader unset Authorization",
+    "Require valid-user",
+]
+_OIDC_AUTH = ["AuthType openid-connect", "Require valid-user"]
+# Client secret that Open OnDemand falls back to when `client_secret` is not set for Dex.
+_DEX_SECRET_FILE = "/etc/ood/dex/ood.secret"
+_OIDC_STRIP_COOKIES = (
+    "mod_auth_openidc_session mod_auth_openidc_session_chunks "
+    + "mod_auth_openidc_session_0 mod_auth_openidc_session_1"
+)
+
+# Names provided by the view of an `OODPortalConfig` object.
+_NAMES = (
+    "listen_addr_port",
+    "servername",
+    "server_aliases",
+    "proxy_server",
+    "port",
+    "protocol",
+    "ssl",
+    "disable_logs",
+    "logroot",
+    "errorlog",
+    "accesslog",
+    "logformat",
+    "use_rewrites",
+    "use_maintenance",
+    "maintenance_ip_allowlist",
+    "security_csp_frame_ancestors",
+    "security_strict_transport",
+    "lua_root",
+    "lua_log_level",
+    "user_map_cmd",
+    "user_map_match",
+    "user_env",
+    "map_fail_uri",
+    "pun_stage_cmd",
+    "auth",
+    "custom_vhost_directives",
+    "custom_location_directives",
+    "root_uri",
+    "analytics",
+    "public_uri",
+    "public_root",
+    "logout_uri",
+    "logout_redirect",
+    "host_regex",
+    "node_uri",
+    "rnode_uri",
+    "nginx_uri",
+    "pun_uri",
+    "pun_socket_root",
+    "pun_max_retries",
+    "pun_pre_hook_root_cmd",
+    "pun_pre_hook_exports",
+    "oidc_uri",
+    "oidc_discover_uri",
+    "oidc_discover_root",
+    "register_uri",
+    "register_root",
+    "oidc_settings",
+    "dex_uri",
+    "dex_url",
+)
+
+_renderer = None
+
+
+def _view(config: OODPortalConfig, dex_secret_file: Union[str, os.PathLike]) -> Dict[str, Any]:
+    """Resolve the value of every option used by the template, applying defaults."""
+    options = config.data
+
+    def get(option: str, default: Any = None) -> Any:
+        value = options.get(option)
+        return default if value is None else value
+
+    view = {name: get(name) for name in _NAMES}
+    ssl = view["ssl"] = get("ssl", [])
+    protocol = view["protocol"] = "https://" if ssl else "http://"
+    port = view["port"] = get("port", 443 if ssl else 80)
+    servername = view["servername"]
+    proxy_server = view["proxy_server"] = get("proxy_server", servername)
+
+    listen = get("listen_addr_port", [])
+    view["listen_addr_port"] = listen if isinstance(listen, list) else [listen]
+    view["server_aliases"] = get("server_aliases", [])
+    view["disable_logs"] = get("disable_logs", False)
+    view["logroot"] = get("logroot", "logs")
+    prefix = f"{servername}_" if servername else ""
+    suffix = "_ssl" if ssl else ""
+    view["errorlog"] = get("errorlog", f"{prefix}error{suffix}.log")
+    view["accesslog"] = get("accesslog", f"{prefix}access{suffix}.log")
+    view["logformat"] = get("logformat", "combined")
+    view["use_rewrites"] = get("use_rewrites", True)
+    view["use_maintenance"] = get("use_maintenance", True)
+    view["maintenance_ip_allowlist"] = get("maintenance_ip_allowlist", [])
+    view["security_csp_frame_ancestors"] = get(
+        "security_csp_frame_ancestors", f"{protocol}{proxy_server}" if proxy_server else None
+    )
+    view["security_strict_transport"] = get("security_strict_transport", bool(ssl))
+    view["lua_root"] = get("lua_root", "/opt/ood/mod_ood_proxy/lib")
+    view["lua_log_level"] = get("lua_log_level", "info")
+    view["user_map_match"] = get("user_map_match", ".*")
+    view["pun_stage_cmd"] = get("pun_stage_cmd", "sudo /opt/ood/nginx_stage/sbin/nginx_stage")
+    view["custom_vhost_directives"] = get("custom_vhost_directives", [])
+    view["custom_location_directives"] = get("custom_location_directives", [])
+    view["root_uri"] = get("root_uri", "/pun/sys/dashboard")
+    view["public_uri"] = get("public_uri", "/public")
+    view["public_root"] = get("public_root", "/var/www/ood/public")
+    view["logout_uri"] = get("logout_uri", "/logout")
+    view["logout_redirect"] = get("logout_redirect", "/pun/sys/dashboard/logout")
+    view["host_regex"] = get("host_regex", "[^/]+")
+    view["nginx_uri"] = get("nginx_uri", "/nginx")
+    view["pun_uri"] = get("pun_uri", "/pun")
+    view["pun_socket_root"] = get("pun_socket_root", "/var/run/ondemand-nginx")
+    view["pun_max_retries"] = get("pun_max_retries", 5)
+
+    # Dex is enabled by a `dex` mapping, even an empty one.
+    dex = options.get("dex")
+    dex_uri = get("dex_uri", "/dex") if isinstance(dex, dict) else False
+    view["dex_uri"] = dex_uri or None
+    # OpenID Connect redirects back to this virtual host, so it needs a host name.
+    host = proxy_server or "localhost"
+    oidc_provider_metadata_url = get("oidc_provider_metadata_url")
+    oidc_client_id = get("oidc_client_id")
+    oidc_client_secret = get("oidc_client_secret")
+    if isinstance(dex, dict):
+        dex_ssl = dex.get("ssl", bool(ssl))
+        dex_port = dex.get("https_port", 5554) if dex_ssl else dex.get("http_port", 5556)
+        dex_protocol = "https://" if dex_ssl else "http://"
+        view["dex_url"] = f"{dex_protocol}localhost:{dex_port}{dex_uri or ''}"
+        oidc_provider_metadata_url = oidc_provider_metadata_url or (
+            f"{protocol}{host}:{port}{dex_uri or ''}/.well-known/openid-configuration"
+        )
+        oidc_client_id = oidc_client_id or dex.get("client_id", host)
+        oidc_client_secret = (
+            oidc_client_secret or dex.get("client_secret") or _read_secret(dex_secret_file)
+        )
+
+    oidc = oidc_provider_metadata_url is not None
+    oidc_uri = view["oidc_uri"] = get("oidc_uri", "/oidc" if oidc else None)
+    view["auth"] = get("auth", _OIDC_AUTH if oidc else _DEFAULT_AUTH)
+    if oidc_uri:
+        if not oidc_client_secret:
+            raise ValueError(
+                "OpenID Connect is enabled but no client secret is set. "
+                + "Set `oidc_client_secret`, or `client_secret` in the `dex` configuration, "
+                + f"or write the Dex client secret to {dex_secret_file}."
+            )
+
+        view["oidc_settings"] = _oidc_settings(
+            get,
+            {
+                "OIDCProviderMetadataURL": oidc_provider_metadata_url,
+                "OIDCClientID": _quote(oidc_client_id),
+                "OIDCClientSecret": _quote(oidc_client_secret),
+                "OIDCRedirectURI": _quote(f"{protocol}{host}{oidc_uri}"),
+                "OIDCCryptoPassphrase": _quote(
+                    hashlib.sha1(oidc_client_secret.encode()).hexdigest()
+                ),
+            },
+        )
+
+    return view
+
+
+def _read_secret(file: Union[str, os.PathLike]) -> Optional[str]:
+    """Read a client secret from a file, or None if the file does not exist."""
+    try:
+        return Path(file).read_text().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def _quote(value: Any) -> Optional[str]:
+    """Quote the value of an Apache directive, leaving None as is."""
+    return None if value is None else f'"{value}"'
+
+
+def _oidc_settings(get: Callable[..., Any], directives: Dict[str, Any]) -> Dict[str, Any]:
+    """Resolve the OpenID Connect directives of the virtual host.
+
+    Directives set by `oidc_settings` replace the default directive of the same name,
+    which Apache matches regardless of case, and directives without a value are
+    left out.
+
+    Args:
+        get: Get the value of a configuration option, or a default if it is not set.
+        directives: Directives resolved from other configuration options.
+    """
+    same_site = get("oidc_cookie_same_site", "On")
+    if isinstance(same_site, bool):
+        same_site = "On" if same_site else "Off"
+
+    defaults = {
+        **directives,
+        "OIDCRemoteUserClaim": _quote(get("oidc_remote_user_claim", "preferred_username")),
+        "OIDCScope": _quote(get("oidc_scope", "openid profile email")),
+        "OIDCSessionInactivityTimeout": get("oidc_session_inactivity_timeout", 28800),
+        "OIDCSessionMaxDuration": get("oidc_session_max_duration", 28800),
+        "OIDCStateMaxNumberOfCookies": get("oidc_state_max_number_of_cookies", "10 true"),
+        "OIDCCookieSameSite": same_site,
+        "OIDCPassIDTokenAs": "serialized",
+        "OIDCPassRefreshToken": "On",
+        "OIDCPassClaimsAs": "environment",
+        "OIDCStripCookies": _OIDC_STRIP_COOKIES,
+    }
+    overrides = {key.lower(): (key, value) for key, value in get("oidc_settings", {}).items()}
+    settings = {}
+    for key, value in defaults.items():
+        key, value = overrides.pop(key.lower(), (key, value))
+        if value is not None:
+            settings[key] = value
+
+    for key, value in overrides.values():
+        if value is not None:
+            settings[key] = value
+
+    return settings
+
+
+def render(
+    config: OODPortalConfig, *, dex_secret_file: Union[str, os.PathLike] = _DEX_SECRET_FILE
+) -> str:
+    """Render the Apache `ood_portal.conf` virtual host of an `OODPortalConfig` object.
+
+    Args:
+        config: `OODPortalConfig` object to render.
+        dex_secret_file: File holding the Dex client secret. Like Open OnDemand, the
+            secret is read from this file if Dex is enabled without a `client_secret`.
+
+    Raises:
+        ValueError: Raised if OpenID Connect or Dex is enabled without a client secret.
+    """
+    global _renderer
+
+    if _renderer is None:
+        _renderer = compile_template(_TEMPLATE, _NAMES, "<ood_portal.conf>")
+
+    return _renderer(_view(config, dex_secret_file))
+
+
+def dump(
+    config: OODPortalConfig,
+    file: Union[str, os.PathLike],
+    *,
+    atomic: bool = False,
+    fsync_dir: bool = True,
+    dex_secret_file: Union[str, os.PathLike] = _DEX_SECRET_FILE,
+) -> None:
+    """Render an `OODPortalConfig` object into an `ood_portal.conf` file.
+
+    Args:
+        config: `OODPortalConfig` object to render.
+        file: File to render the Apache virtual host into.
+        atomic: Atomically replace `file` rather than overwriting it in place.
+        fsync_dir: Flush the parent directory of `file` to disk after an atomic write.
+        dex_secret_file: File holding the Dex client secret. See `render`.
+    """
+    rendered = render(config, dex_secret_file=dex_secret_file)
+    _write_text(Path(file), rendered, atomic=atomic, fsync_dir=fsync_dir)
@@ -0,0 +1,407 @@
+# Copyright 2024 Canonical Ltd.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License version 3 as published by the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Render per-user NGINX (PUN) configuration from a `NginxStageConfig` object.
+
+The rendered configuration follows the template that Open OnDemand's `nginx_stage pun`
+command writes for each user, and applies the same defaults to options that are not
+set. Path templates such as `pun_config_path` are expanded for each user by
+substituting `%{user}`. Templates are compiled once per configuration, so `stage` can
+render and write the configuration of thousands of users in a fraction of a second.
+As with `nginx_stage`, user names must match `user_regex`, and configuration is only
+staged for users whose id is at least `min_uid`.
+"""
+
+__all__ = ["PunPaths", "StageReport", "paths", "render", "stage"]
+
+import grp
+import logging
+import pwd
+import re
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Mapping, NamedTuple, Optional
+
+from ondemandutils._files import _write_text
+from ondemandutils._pun_paths import MIN_UID, PATH_DEFAULTS, USER_REGEX, PathTemplate
+from ondemandutils.models import NginxStageConfig
+
+from ._template import compile_template
+
+_logger = logging.getLogger(__name__)
+
+_TEMPLATE = r"""#
+# Per-user NGINX (PUN) configuration
+#
+# Generated from `nginx_stage.yml` by ondemandutils.
+# Do not edit this file directly. Changes are lost when it is generated again.
+#
+
+user {{ user }} {{ group }};
+error_log {{ paths.error_log }};
+pid {{ paths.pid }};
+% for name in env_declarations:
+env {{ name }};
+% end
+% for name, value in custom_env:
+env "{{ name }}={{ value }}";
+% end
+
+events {
+  worker_connections 1024;
+}
+
+http {
+  include {{ mime_types_path }};
+  default_type application/octet-stream;
+  log_format main '{{ log_format }}';
+  access_log {{ paths.access_log }} main;
+  sendfile on;
+  keepalive_timeout 65;
+  gzip on;
+  gzip_proxied any;
+
+  client_body_temp_path {{ paths.tmp_root }}/client_body;
+  proxy_temp_path {{ paths.tmp_root }}/proxy_temp;
+  fastcgi_temp_path {{ paths.tmp_root }}/fastcgi_temp;
+  uwsgi_temp_path {{ paths.tmp_root }}/uwsgi_temp;
+  scgi_temp_path {{ paths.tmp_root }}/scgi_temp;
+  client_max_body_size {{ file_upload_max }};
+
+  passenger_root {{ passenger_root }};
+  passenger_ruby {{ passenger_ruby }};
+% if passenger_nodejs:
+  passenger_nodejs {{ passenger_nodejs }};
+% end
+% if passenger_python:
+  passenger_python {{ passenger_python }};
+% end
+  passenger_pool_idle_time {{ passenger_pool_idle_time }};
+% if passenger_log_file:
+  passenger_log_file {{ passenger_log_file }};
+% end
+  passenger_user_switching off;
+  passenger_default_user {{ user }};
+  passenger_load_shell_envvars off;
+% for name, value in passenger_options:
+  {{ name }} {{ value }};
+% end
+
+  server {
+    listen unix:{{ paths.socket }};
+    server_name localhost;
+
+    location {{ sendfile_uri }} {
+      internal;
+      alias {{ sendfile_root }};
+    }
+
+    # Configuration of the apps served by this PUN.
+% for pattern in app_configs:
+    include {{ pattern }};
+% end
+  }
+}"""
+
+_NAMES = (
+    "user",
+    "group",
+    "paths",
+    "env_declarations",
+    "custom_env",
+    "mime_types_path",
+    "log_format",
+    "file_upload_max",
+    "passenger_root",
+    "passenger_ruby",
+    "passenger_nodejs",
+    "passenger_python",
+    "passenger_pool_idle_time",
+    "passenger_log_file",
+    "passenger_options",
+    "sendfile_uri",
+    "sendfile_root",
+    "app_configs",
+)
+
+# Defaults applied by `nginx_stage` to options that are not set.
+_APP_CONFIGS = [
+    {"env": "dev", "owner": "%{user}", "name": "*"},
+    {"env": "usr", "owner": "*", "name": "*"},
+    {"env": "sys", "owner": "", "name": "*"},
+]
+_APP_CONFIG_PATH = {
+    "dev": "/var/lib/ondemand-nginx/config/apps/dev/%{owner}/%{name}.conf",
+    "usr": "/var/lib/ondemand-nginx/config/apps/usr/%{owner}/%{name}.conf",
+    "sys": "/var/lib/ondemand-nginx/config/apps/sys/%{name}.conf",
+}
+_MIME_TYPES_PATH = "/opt/ood/ondemand/root/etc/nginx/mime.types"
+_PASSENGER_ROOT = (
+    "/opt/ood/ondemand/root/usr/share/ruby/vendor_ruby/phusion_passenger/locations.ini"
+)
+_LOG_FORMAT = (
+    '$remote_addr - $remote_user [$time_local] "$request" $status $body_bytes_sent '
+    + '"$http_referer" "$http_user_agent" "$gzip_ratio"'
+)
+
+_renderer = None
+
+
+class PunPaths(NamedTuple):
+    """Paths of a user's per-user NGINX (PUN), expanded from the templates in `nginx_stage.yml`.
+
+    Attributes:
+        user: Name of the user.
+        config: Path of the PUN's configuration file.
+        socket: Path of the PUN's Unix socket.
+        pid: Path of the PUN's pid file.
+        tmp_root: Directory holding the PUN's temporary files.
+        access_log: Path of the PUN's access log.
+        error_log: Path of the PUN's error log.
+        secret_key_base: Path of the file holding the secret key base of the user's apps.
+    """
+
+    user: str
+    config: str
+    socket: str
+    pid: str
+    tmp_root: str
+    access_log: str
+    error_log: str
+    secret_key_base: str
+
+
+class StageReport(NamedTuple):
+    """PUN configuration files written by `stage`.
+
+    Attributes:
+        written: Configuration files that were created or changed.
+        unchanged: Configuration files that already had the rendered content.
+        errors: Errors raised while staging a user's configuration keyed by user name.
+    """
+
+    written: List[Path]
+    unchanged: List[Path]
+    errors: Dict[str, Exception]
+
+
+@lru_cache(maxsize=None)
+def _group_name(gid: int) -> str:
+    """Look up the name of a group. Cached as most users share a few primary groups."""
+    return grp.getgrgid(gid).gr_name
+
+
+def _group(user: str) -> str:
+    """Look up the name of the primary group of a user."""
+    return _group_name(pwd.getpwnam(user).pw_gid)
+
+
+class _Pun:
+    """Per-user NGINX configuration compiled from a `NginxStageConfig` object."""
+
+    __slots__ = ("_paths", "_user_regex", "_min_uid", "_view")
+
+    def __init__(self, config: NginxStageConfig) -> None:
+        options = config.data
+
+        def get(option: str, default: Any = None) -> Any:
+            value = options.get(option)
+            return default if value is None else value
+
+        self._paths = [
+            PathTemplate(get(option, default)) for option, default in PATH_DEFAULTS.items()
+        ]
+        self._user_regex = re.compile(get("user_regex", USER_REGEX))
+        self._min_uid = get("min_uid", MIN_UID)
+        app_config_path = get("app_config_path", _APP_CONFIG_PATH)
+        app_configs = []
+        for app in get("pun_app_configs", _APP_CONFIGS):
+            template = app_config_path.get(app.get("env"))
+            if template is None:
+                _logger.debug("Ignoring app configuration of unknown environment %s", app)
+                continue
+
+            owner = PathTemplate(str(app.get("owner", "")))
+            app_configs.append((PathTemplate(template), owner, str(app.get("name", "*"))))
+
+        self._view = {
+            "env_declarations": get("pun_custom_env_declarations", []),
+            "custom_env": list(get("pun_custom_env", {}).items()),
+            "mime_types_path": get("mime_types_path", _MIME_TYPES_PATH),
+            "log_format": get("pun_log_format", _LOG_FORMAT),
+            "file_upload_max": get("nginx_file_upload_max", 10737420000),
+            "passenger_root": get("passenger_root", _PASSENGER_ROOT),
+            "passenger_ruby": get("passenger_ruby", "/opt/ood/ondemand/root/usr/bin/ruby"),
+            "passenger_nodejs": get("passenger_nodejs"),
+            "passenger_python": get("passenger_python"),
+            "passenger_pool_idle_time": get("passenger_pool_idle_time", 300),
+            "passenger_log_file": get("passenger_log_file"),
+            "passenger_options": list(get("passenger_options", {}).items()),
+            "sendfile_uri": get("pun_sendfile_uri", "/sendfile"),
+            "sendfile_root": get("pun_sendfile_root", "/"),
+            "app_configs": app_configs,
+        }
+
+    def paths(self, user: str) -> PunPaths:
+        """Expand the path templates for a user.
+
+        Raises:
+            ValueError: Raised if the user name does not match `user_regex`, or would
+                escape the directories of the path templates.
+        """
+        if self._user_regex.fullmatch(user) is None:
+            raise ValueError(
+                f"Invalid user name {user!r}. User names must match {self._user_regex.pattern}."
+            )
+        if user in (".", ".."):
+            raise ValueError(f"Invalid user name {user!r}.")
+
+        return PunPaths(user, *[t.expand(user=user) for t in self._paths])
+
+    def render(self, paths: PunPaths, group: str) -> str:
+        """Render the configuration of a user's PUN."""
+        global _renderer
+
+        if _renderer is None:
+            _renderer = compile_template(_TEMPLATE, _NAMES, "<pun.conf>")
+
+        user = paths.user
+        view = self._view.copy()
+        view["user"] = user
+        view["group"] = group
+        view["paths"] = paths
+        view["app_configs"] = [
+            path.expand(owner=owner.expand(user=user), name=name)
+            for path, owner, name in self._view["app_configs"]
+        ]
+        return _renderer(view)
+
+    def stage(
+        self,
+        paths: PunPaths,
+        uid: Optional[int],
+        group: Optional[str],
+        atomic: bool,
+        fsync_dir: bool,
+    ) -> bool:
+        """Write the configuration of a user's PUN, returning whether it was written."""
+        if uid is None or not group:
+            account = pwd.getpwnam(paths.user)
+            uid = account.pw_uid if uid is None else uid
+            group = group or _group_name(account.pw_gid)
+
+        if uid < self._min_uid:
+            raise ValueError(
+                f"User {paths.user} is a system user: uid {uid} is less than {self._min_uid}."
+            )
+
+        content = self.render(paths, group)
+        file = Path(paths.config)
+        try:
+            if file.read_text(encoding="ascii") == content:
+                return False
+        except FileNotFoundError:
+            file.parent.mkdir(parents=True, exist_ok=True)
+
+        _write_text(file, content, atomic=atomic, fsync_dir=fsync_dir)
+        return True
+
+
+def paths(config: NginxStageConfig, user: str) -> PunPaths:
+    """Get the paths of a user's per-user NGINX (PUN).
+
+    Args:
+        config: `NginxStageConfig` object with the path templates of PUNs.
+        user: Name of the user.
+
+    Raises:
+        ValueError: Raised if the user name does not match `user_regex`.
+    """
+    return _Pun(config).paths(user)
+
+
+def render(config: NginxStageConfig, user: str, group: Optional[str] = None) -> str:
+    """Render the configuration of a user's per-user NGINX (PUN).
+
+    Args:
+        config: `NginxStageConfig` object to render.
+        user: Name of the user.
+        group: Name of the primary group of the user. Looked up if not set.
+
+    Raises:
+        ValueError: Raised if the user name does not match `user_regex`.
+    """
+    pun = _Pun(config)
+    return pun.render(pun.paths(user), group or _group(user))
+
+
+def stage(
+    config: NginxStageConfig,
+    users: Iterable[str],
+    *,
+    groups: Optional[Mapping[str, str]] = None,
+    uids: Optional[Mapping[str, int]] = None,
+    workers: int = 8,
+    atomic: bool = False,
+    fsync_dir: bool = True,
+) -> StageReport:
+    """Render and write the per-user NGINX (PUN) configuration of many users.
+
+    The configuration is compiled once and rendered for each user, and files are
+    written by a pool of threads. Files that already have the rendered content are
+    not written again. Errors are reported per user rather than raised, including
+    user names that do not match `user_regex` and users whose id is less than `min_uid`.
+
+    Args:
+        config: `NginxStageConfig` object to render.
+        users: Names of the users to stage PUN configuration for.
+        groups: Names of the primary groups of users keyed by user name. The primary
+            group of users that are not listed is looked up.
+        uids: Ids of users keyed by user name. The id of users that are not listed
+            is looked up.
+        workers: Number of threads used to write configuration files.
+        atomic: Atomically replace each configuration file rather than overwriting it in place.
+        fsync_dir: Flush the parent directory of each file to disk after an atomic write.
+    """
+    pun = _Pun(config)
+    groups = groups or {}
+    uids = uids or {}
+    report = StageReport([], [], {})
+    with ThreadPoolExecutor(workers) as pool:
+        futures = []
+        for user in users:
+            try:
+                paths = pun.paths(user)
+            except ValueError as e:
+                _logger.debug("Not staging PUN configuration of %r: %s", user, e)
+                report.errors[user] = e
+                continue
+
+            future = pool.submit(
+                pun.stage, paths, uids.get(user), groups.get(user), atomic, fsync_dir
+            )
+            futures.append((paths, future))
+
+        for paths, future in futures:
+            try:
+                written = future.result()
+            except Exception as e:
+                _logger.debug("Failed to stage PUN configuration of %s: %s", paths.user, e)
+                report.errors[paths.user] = e
+                continue
+
+            (report.written if written else report.unchanged).append(Path(paths.config))
+
+    return report
@@ -0,0 +1,145 @@
+# Copyright 2024 Canonical Ltd.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License version 3 as published by the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Benchmark cases for Open OnDemand configuration file editors.
+
+Configuration files are written to the benchmarks' temporary directory. See `workdir`.
+"""
+
+import atexit
+import itertools
+import sys
+from pathlib import Path
+
+import _configs
+from _harness import SIZES, case, workdir
+
+from ondemandutils.editors import history, nginx_stage, ood_portal, watch
+from ondemandutils.models import NginxStageConfig, OODPortalConfig
+
+_editors = {
+    "ood_portal": (ood_portal, OODPortalConfig, "servername"),
+    "nginx_stage": (nginx_stage, NginxStageConfig, "ondemand_title"),
+}
+
+
+def _file(kind: str, size: str) -> Path:
+    """Write a configuration file for an editor at a size."""
+    editor, model, _ = _editors[kind]
+    file = workdir() / f"{size}-{kind}.yml"
+    editor.dump(model(getattr(_configs, kind)(**SIZES[size][kind])), file)
+    return file
+
+
+for kind, (editor, _, option) in _editors.items():
+
+    @case(f"editor.load.{kind}")
+    def _(size, kind=kind, editor=editor):
+        file = _file(kind, size)
+        return lambda: editor.load(file)
+
+    @case(f"editor.dumps.{kind}")
+    def _(size, kind=kind, editor=editor):
+        config = editor.load(_file(kind, size))
+        return lambda: editor.dumps(config)
+
+    @case(f"editor.edit.{kind}")
+    def _(size, kind=kind, editor=editor, option=option):
+        file = _file(kind, size)
+        # Alternate between values so that every edit writes the file.
+        values = itertools.cycle(["ondemand-1", "ondemand-2"])
+
+        def edit():
+            with editor.edit(file) as config:
+                config[option] = next(values)
+
+        return edit
+
+
+def _watched(size: str):
+    """Write the `ood_portal.yml` configuration files of many sites."""
+    files = []
+    for i in range(SIZES[size]["watch"]["files"]):
+        site = workdir() / f"{size}-watch" / f"site-{i}"
+        site.mkdir(parents=True, exist_ok=True)
+        files.append(site / "ood_portal.yml")
+        ood_portal.dump(OODPortalConfig(_configs.ood_portal(aliases=10)), files[-1])
+
+    return files
+
+
+@case("watch.parse_all")
+def _(size):
+    """Detect changes by parsing every watched file again."""
+    files = _watched(size)
+    return lambda: [ood_portal.load(file) for file in files]
+
+
+for backend in ["poll"] + (["inotify"] if sys.platform.startswith("linux") else []):
+
+    @case(f"watch.{backend}")
+    def _(size, backend=backend):
+        """Change one watched file and detect the change."""
+        files = _watched(size)
+        watcher = watch.Watcher(files, debounce=0, poll_interval=0.001, backend=backend)
+        atexit.register(watcher.close)
+        ports = itertools.cycle([8443, 443])
+
+        def detect():
+            with ood_portal.edit(files[-1]) as config:
+                config.port = next(ports)
+
+            return watcher.poll()
+
+        return detect
+
+
+def _versions(size: str):
+    """Get a history store, and configurations that differ in their port."""
+    store = history.Store(workdir() / f"{size}-history")
+    options = _configs.ood_portal(**SIZES[size]["ood_portal"])
+    return store, [OODPortalConfig(options, port=8000 + i) for i in range(100)]
+
+
+@case("history.dump")
+def _(size):
+    file = workdir() / f"{size}-history-untracked.yml"
+    configs = itertools.cycle(_versions(size)[1])
+    return lambda: ood_portal.dump(next(configs), file, canonical=True)
+
+
+@case("history.record")
+def _(size):
+    """Dump configurations while recording every version."""
+    file = workdir() / f"{size}-history.yml"
+    store, configs = _versions(size)
+    configs = itertools.cycle(configs)
+
+    def record():
+        with store.track():
+            ood_portal.dump(next(configs), file, canonical=True)
+
+    return record
+
+
+@case("history.rollback")
+def _(size):
+    file = workdir() / f"{size}-history-rollback.yml"
+    store, configs = _versions(size)
+    with store.track():
+        for config in configs[:2]:
+            ood_portal.dump(config, file, canonical=True)
+
+    versions = itertools.cycle([1, 2])
+    return lambda: store.rollback(file, next(versions))
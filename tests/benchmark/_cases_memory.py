@@ -0,0 +1,74 @@
+# Copyright 2024 Canonical Ltd.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License version 3 as published by the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Memory benchmark cases for holding and streaming a fleet of configurations.
+
+Each site's configuration is parsed from its own YAML document, as when loading
+a fleet from disk. Compact data models should use less memory than full data models,
+and streaming every configuration from one inventory file should use less memory
+than loading them all at once.
+"""
+
+from collections import deque
+from typing import Dict, List
+
+import _configs
+from _harness import SIZES, case, workdir
+
+from ondemandutils.editors import ood_portal
+from ondemandutils.models import NginxStageConfig, OODPortalConfig, _serializer
+
+
+def _fleet(size: str) -> Dict[str, List[str]]:
+    """Generate `ood_portal.yml` and `nginx_stage.yml` documents for a fleet of sites."""
+    sites = SIZES[size]["fleet"]["clusters"] * SIZES[size]["fleet"]["sites"]
+    portals, stages = [], []
+    for i in range(sites):
+        portal = _configs.ood_portal(aliases=4, connectors=1)
+        portal["servername"] = f"ondemand.site-{i}.example.com"
+        portal["server_aliases"] = [f"ood-{j}.site-{i}.example.com" for j in range(4)]
+        portals.append(_serializer.dump(portal))
+        stage = _configs.nginx_stage(env=8, declarations=4)
+        stage["min_uid"] = 1000 + i % 7
+        stages.append(_serializer.dump(stage))
+
+    return {"ood_portal": portals, "nginx_stage": stages}
+
+
+for kind, model in (("ood_portal", OODPortalConfig), ("nginx_stage", NginxStageConfig)):
+    for variant, loader in (("full", model.from_yaml), ("compact", model._compact.from_yaml)):
+
+        @case(f"memory.fleet.{kind}.{variant}", memory=True)
+        def _(size, kind=kind, loader=loader):
+            documents = _fleet(size)[kind]
+            return lambda: [loader(doc) for doc in documents]
+
+
+def _inventory(size: str):
+    """Write every site's `ood_portal.yml` configuration to one inventory file."""
+    inventory = workdir() / f"{size}-inventory.yaml"
+    inventory.write_text("---\n".join(_fleet(size)["ood_portal"]))
+    return inventory
+
+
+@case("memory.inventory.stream", memory=True)
+def _(size):
+    inventory = _inventory(size)
+    return lambda: deque(ood_portal.iter_load(inventory), maxlen=0)
+
+
+@case("memory.inventory.load_all", memory=True)
+def _(size):
+    inventory = _inventory(size)
+    return lambda: list(ood_portal.iter_load(inventory))
@@ -0,0 +1,219 @@
+# Copyright 2024 Canonical Ltd.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License version 3 as published by the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Benchmark cases for Open OnDemand data models."""
+
+import itertools
+
+import _configs
+from _harness import SIZES, case
+
+from ondemandutils.models import Composer, Layer, Merge, NginxStageConfig, OODPortalConfig
+
+
+def _portal(size: str) -> OODPortalConfig:
+    return OODPortalConfig(_configs.ood_portal(**SIZES[size]["ood_portal"]))
+
+
+def _base_descriptors(option: str):
+    """Closure-based descriptors that data models previously used."""
+
+    def getter(self):
+        return self.get(option, None)
+
+    def setter(self, value):
+        self[option] = value
+
+    def deleter(self):
+        del self[option]
+
+    return getter, setter, deleter
+
+
+class _ClosureConfig(OODPortalConfig):
+    """`OODPortalConfig` with closure-based descriptors, to compare generated accessors with."""
+
+
+for option in OODPortalConfig.schema.keys - {"dex"}:
+    setattr(_ClosureConfig, option, property(*_base_descriptors(option)))
+
+
+@case("model.init.ood_portal")
+def _(size):
+    data = _configs.ood_portal(**SIZES[size]["ood_portal"])
+    return lambda: OODPortalConfig(data)
+
+
+@case("model.init.nginx_stage")
+def _(size):
+    data = _configs.nginx_stage(**SIZES[size]["nginx_stage"])
+    return lambda: NginxStageConfig(data)
+
+
+@case("model.from_yaml")
+def _(size):
+    doc = _portal(size).yaml()
+    return lambda: OODPortalConfig.from_yaml(doc)
+
+
+@case("model.from_json")
+def _(size):
+    doc = _portal(size).json()
+    return lambda: OODPortalConfig.from_json(doc)
+
+
+@case("model.yaml")
+def _(size):
+    return _portal(size).yaml
+
+
+@case("model.json")
+def _(size):
+    return _portal(size).json
+
+
+@case("model.dict")
+def _(size):
+    return _portal(size).dict
+
+
+@case("model.or")
+def _(size):
+    config = _portal(size)
+    other = OODPortalConfig(servername="ondemand.example.org", lua_log_level="debug")
+    return lambda: config | other
+
+
+@case("model.ior")
+def _(size):
+    config = _portal(size)
+    other = _portal(size)
+
+    def ior():
+        nonlocal config
+        config |= other
+
+    return ior
+
+
+for suffix, model in (("", OODPortalConfig), (".closure", _ClosureConfig)):
+
+    @case(f"model.get{suffix}")
+    def _(size, model=model):
+        config = model(_configs.ood_portal(**SIZES[size]["ood_portal"]))
+        return lambda: config.servername
+
+    @case(f"model.get.list{suffix}")
+    def _(size, model=model):
+        config = model(_configs.ood_portal(**SIZES[size]["ood_portal"]))
+        return lambda: config.server_aliases
+
+    @case(f"model.get.missing{suffix}")
+    def _(size, model=model):
+        config = model(_configs.ood_portal(**SIZES[size]["ood_portal"]))
+        return lambda: config.proxy_server
+
+    @case(f"model.set{suffix}")
+    def _(size, model=model):
+        config = model(_configs.ood_portal(**SIZES[size]["ood_portal"]))
+
+        def setter():
+            config.servername = "ondemand.example.org"
+
+        return setter
+
+
+@case("model.get.fresh")
+def _(size):
+    """Read list options of a new data model, which warm instances hide the cost of.
+
+    Compare with `model.init.ood_portal` for the cost of the first reads alone.
+    """
+    data = _configs.ood_portal(**SIZES[size]["ood_portal"])
+
+    def get():
+        config = OODPortalConfig(data)
+        return config.server_aliases, config.dex.connectors
+
+    return get
+
+
+def _fleet(size: str):
+    """Build stacks of global, cluster, and site layers for a fleet of sites."""
+    clusters, sites = SIZES[size]["fleet"]["clusters"], SIZES[size]["fleet"]["sites"]
+    defaults = Layer("global", OODPortalConfig(_configs.ood_portal(aliases=50, connectors=4)))
+    layers = [
+        Layer(f"cluster-{c}", OODPortalConfig(dex={"client_name": f"Cluster {c}"}))
+        for c in range(clusters)
+    ]
+    stacks = [
+        (defaults, cluster, Layer(f"site-{c}-{s}", OODPortalConfig(servername=f"s{s}.c{c}")))
+        for c, cluster in enumerate(layers)
+        for s in range(sites)
+    ]
+    return stacks, Composer(OODPortalConfig, {"server_aliases": Merge.UNIQUE})
+
+
+@case("compose.cold")
+def _(size):
+    stacks, composer = _fleet(size)
+
+    def compose():
+        composer.cache_clear()
+        for stack in stacks:
+            composer.compose(*stack, frozen=True)
+
+    return compose
+
+
+@case("compose.unchanged")
+def _(size):
+    stacks, composer = _fleet(size)
+
+    def compose():
+        for stack in stacks:
+            composer.compose(*stack, frozen=True)
+
+    return compose
+
+
+for name, index, option, values in (
+    ("compose.site_changed", 2, "port", (8443, 443)),
+    ("compose.cluster_changed", 1, "lua_log_level", ("debug", "info")),
+):
+
+    @case(name)
+    def _(size, index=index, option=option, values=values):
+        stacks, composer = _fleet(size)
+        values = itertools.cycle(values)
+
+        def compose():
+            with stacks[0][index].edit() as config:
+                config[option] = next(values)
+
+            for stack in stacks:
+                composer.compose(*stack, frozen=True)
+
+        return compose
+
+
+@case("compose.copy")
+def _(size):
+    stacks, composer = _fleet(size)
+
+    def compose():
+        for stack in stacks:
+            composer.compose(*stack)
+
+    return compose
@@ -0,0 +1,107 @@
+# Copyright 2024 Canonical Ltd.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License version 3 as published by the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Benchmark cases for staging and scanning the per-user NGINX (PUN) state of a node.
+
+PUN files are written to the benchmarks' temporary directory. See `workdir`.
+"""
+
+import glob
+import itertools
+import os
+from pathlib import Path
+
+import _configs
+from _harness import SIZES, case, workdir
+
+from ondemandutils import puns
+from ondemandutils.models import NginxStageConfig
+from ondemandutils.renderers import pun
+
+
+def _users(size: str):
+    """Get the users of a node, with their primary groups and ids."""
+    users = [f"user{i:05}" for i in range(SIZES[size]["node"]["users"])]
+    return users, dict.fromkeys(users, "users"), dict.fromkeys(users, 10000)
+
+
+def _stage_config(size: str, **options) -> NginxStageConfig:
+    root = workdir() / f"{size}-stage"
+    return NginxStageConfig(
+        _configs.nginx_stage(), pun_config_path=f"{root}/puns/%{{user}}.conf", **options
+    )
+
+
+@case("puns.stage.unchanged")
+def _(size):
+    users, groups, uids = _users(size)
+    config = _stage_config(size)
+    pun.stage(config, users, groups=groups, uids=uids)
+    return lambda: pun.stage(config, users, groups=groups, uids=uids)
+
+
+@case("puns.stage.changed")
+def _(size):
+    users, groups, uids = _users(size)
+    # Alternate between configurations so that every call writes every file.
+    configs = itertools.cycle(
+        [_stage_config(size, passenger_pool_idle_time=t) for t in (300, 600)]
+    )
+    return lambda: pun.stage(next(configs), users, groups=groups, uids=uids)
+
+
+def _node(size: str) -> NginxStageConfig:
+    """Create the PUN files of every user of a node."""
+    root = workdir() / f"{size}-node"
+    (root / "config" / "puns").mkdir(parents=True, exist_ok=True)
+    for i, user in enumerate(_users(size)[0]):
+        run = root / "run" / user
+        run.mkdir(parents=True, exist_ok=True)
+        (root / "config" / "puns" / f"{user}.conf").touch()
+        (run / "passenger.pid").write_text(f"{4000000 + i}\n")
+        (run / "passenger.sock").touch()
+
+    return NginxStageConfig(
+        pun_config_path=f"{root}/config/puns/%{{user}}.conf",
+        pun_pid_path=f"{root}/run/%{{user}}/passenger.pid",
+        pun_socket_path=f"{root}/run/%{{user}}/passenger.sock",
+    )
+
+
+@case("puns.scan")
+def _(size):
+    config = _node(size)
+    return lambda: puns.scan(config)
+
+
+@case("puns.scan.glob")
+def _(size):
+    """Find PUNs the way a shell cleanup script does, with a glob per user and file."""
+    root = Path(_node(size).pun_config_path).parents[2]
+
+    def scan() -> int:
+        found = 0
+        for config in glob.glob(f"{root}/config/puns/*.conf"):
+            user = Path(config).name[: -len(".conf")]
+            for pid_file in glob.glob(f"{root}/run/{user}/passenger.pid"):
+                try:
+                    os.kill(int(Path(pid_file).read_text()), 0)
+                except ProcessLookupError:
+                    pass
+
+            found += len(glob.glob(f"{root}/run/{user}/passenger.sock"))
+
+        return found
+
+    return scan
@@ -0,0 +1,35 @@
+# Copyright 2024 Canonical Ltd.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License version 3 as published by the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Benchmark cases for rendering Open OnDemand configuration."""
+
+import _configs
+from _harness import SIZES, case
+
+from ondemandutils.models import NginxStageConfig, OODPortalConfig
+from ondemandutils.renderers import ood_portal, pun
+
+
+@case("render.ood_portal")
+def _(size):
+    options = _configs.ood_portal(**SIZES[size]["ood_portal"])
+    options["dex"]["client_secret"] = "secret"
+    config = OODPortalConfig(options)
+    return lambda: ood_portal.render(config)
+
+
+@case("render.pun")
+def _(size):
+    config = NginxStageConfig(_configs.nginx_stage(**SIZES[size]["nginx_stage"]))
+    return lambda: pun.render(config, "user00000", "users")
@@ -0,0 +1,134 @@
+# Copyright 2024 Canonical Ltd.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License version 3 as published by the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Synthetic Open OnDemand configurations for benchmarks."""
+
+from typing import Any, Dict
+
+
+def ood_portal(aliases: int = 2, connectors: int = 1, settings: int = 0) -> Dict[str, Any]:
+    """Generate an `ood_portal.yml` configuration.
+
+    Args:
+        aliases: Number of entries to generate for `server_aliases`.
+        connectors: Number of Dex connectors to generate.
+        settings: Number of entries to generate for `oidc_settings`.
+    """
+    return {
+        "listen_addr_port": 443,
+        "servername": "ondemand.example.com",
+        "server_aliases": [f"ondemand-{i}.example.com" for i in range(aliases)],
+        "port": 443,
+        "ssl": [
+            'SSLCertificateFile "/etc/ssl/certs/ondemand.crt"',
+            'SSLCertificateKeyFile "/etc/ssl/private/ondemand.key"',
+        ],
+        "logroot": "/var/log/ondemand",
+        "use_rewrites": True,
+        "lua_root": "/opt/ood/mod_ood_proxy/lib",
+        "lua_log_level": "info",
+        "user_map_match": ".*",
+        "pun_stage_cmd": "sudo /opt/ood/nginx_stage/sbin/nginx_stage",
+        "auth": ["AuthType openid-connect", "Require valid-user"],
+        "root_uri": "/pun/sys/dashboard",
+        "public_uri": "/public",
+        "public_root": "/var/www/ood/public",
+        "node_uri": "/node",
+        "rnode_uri": "/rnode",
+        "pun_uri": "/pun",
+        "pun_socket_root": "/var/run/ondemand-nginx",
+        "oidc_remote_user_claim": "preferred_username",
+        "oidc_scope": "openid profile email",
+        "oidc_settings": {f"OIDCSetting{i}": f"value-{i}" for i in range(settings)},
+        "dex_uri": "/dex",
+        "dex": {
+            "ssl": False,
+            "http_port": 5556,
+            "storage_file": "/etc/ood/dex/dex.db",
+            "client_name": "OnDemand",
+            "connectors": [
+                {
+                    "type": "ldap",
+                    "id": f"ldap-{i}",
+                    "name": f"LDAP {i}",
+                    "config": {
+                        "host": f"ldap-{i}.example.com:636",
+                        "bindDN": "cn=admin,dc=example,dc=org",
+                        "userSearch": {
+                            "baseDN": "ou=People,dc=example,dc=org",
+                            "filter": "(objectClass=posixAccount)",
+                            "username": "uid",
+                        },
+                    },
+                }
+                for i in range(connectors)
+            ],
+        },
+    }
+
+
+def nginx_stage(env: int = 3, declarations: int = 5) -> Dict[str, Any]:
+    """Generate an `nginx_stage.yml` configuration.
+
+    Args:
+        env: Number of entries to generate for `pun_custom_env`.
+        declarations: Number of entries to generate for `pun_custom_env_declarations`.
+    """
+    return {
+        "ondemand_version_path": "/opt/ood/VERSION",
+        "pun_custom_env": {f"OOD_VAR_{i}": f"value-{i}" for i in range(env)},
+        "pun_custom_env_declarations": [f"VAR_{i}" for i in range(declarations)],
+        "template_root": "/opt/ood/nginx_stage/templates",
+        "proxy_user": "apache",
+        "nginx_bin": "/opt/ood/ondemand/root/usr/sbin/nginx",
+        "nginx_signals": ["stop", "quit", "reopen", "reload"],
+        "mime_types_path": "/opt/ood/ondemand/root/etc/nginx/mime.types",
+        "passenger_root": "/opt/ood/ondemand/root/usr/share/ruby/vendor_ruby/phusion_passenger/locations.ini",
+        "passenger_ruby": "/opt/ood/nginx_stage/bin/ruby",
+        "passenger_nodejs": "/opt/ood/nginx_stage/bin/node",
+        "passenger_python": "/opt/ood/nginx_stage/bin/python",
+        "passenger_pool_idle_time": 300,
+        "passenger_options": {},
+        "nginx_file_upload_max": "10737420000",
+        "pun_config_path": "/var/lib/ondemand-nginx/config/puns/%{user}.conf",
+        "pun_tmp_root": "/var/tmp/ondemand-nginx/%{user}",
+        "pun_access_log_path": "/var/log/ondemand-nginx/%{user}/access.log",
+        "pun_error_log_path": "/var/log/ondemand-nginx/%{user}/error.log",
+        "pun_secret_key_base_path": "/var/lib/ondemand-nginx/config/puns/%{user}.secret_key_base.txt",
+        "pun_log_format": '$remote_addr - $remote_user [$time_local] "$request" $status',
+        "pun_pid_path": "/var/run/ondemand-nginx/%{user}/passenger.pid",
+        "pun_socket_path": "/var/run/ondemand-nginx/%{user}/passenger.sock",
+        "pun_sendfile_root": "/",
+        "pun_sendfile_uri": "/sendfile",
+        "user_regex": "[\\w@\\.\\-]+",
+        "min_uid": 1000,
+        "disabled_shell": "/access/denied",
+        "disable_bundle_user_config": True,
+    }
+
+
+def wide(options, types) -> Dict[str, Any]:
+    """Generate a configuration that sets every supported option.
+
+    Args:
+        options: Enum of supported configuration options.
+        types: Expected value types of configuration options.
+    """
+    samples = {int: 1, str: "value", bool: True, list: ["value"], dict: {"key": "value"}}
+    config = {}
+    for e in options:
+        expected = types.get(e, (str,))
+        config[e.name.lower()] = samples[expected[0]] if isinstance(expected, tuple) else {}
+
+    return config
@@ -0,0 +1,264 @@
+# Copyright 2024 Canonical Ltd.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License version 3 as published by the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Register, time, and compare benchmark cases against JSON baselines.
+
+Benchmark cases are registered with the `case` decorator. Each case is a setup
+function that receives a size name and returns the callable to measure, so that
+setup cost is never measured. Every case is run at every size in `SIZES`. Cases
+measure the time per call, or, for memory cases, the peak memory allocated by a call.
+
+Results are stored as JSON baselines. When comparing against a baseline, a case
+regresses if its best result is worse than the baseline by more than the given
+threshold.
+"""
+
+import argparse
+import atexit
+import fnmatch
+import gc
+import json
+import os
+import platform
+import statistics
+import tempfile
+import timeit
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from ondemandutils.models import yaml_backend
+
+# Keyword arguments passed to the `_configs` generators at each size.
+SIZES = {
+    "realistic": {
+        "ood_portal": {"aliases": 2, "connectors": 1},
+        "nginx_stage": {"env": 3, "declarations": 5},
+        # Sites in a layered fleet, users on a login node, and watched files.
+        "fleet": {"clusters": 2, "sites": 50},
+        "node": {"users": 100},
+        "watch": {"files": 20},
+    },
+    "large": {
+        "ood_portal": {"aliases": 5000, "connectors": 500, "settings": 500},
+        "nginx_stage": {"env": 2000, "declarations": 2000},
+        "fleet": {"clusters": 10, "sites": 200},
+        "node": {"users": 10000},
+        "watch": {"files": 200},
+    },
+}
+
+_cases: Dict[str, Tuple[Callable[[str], Callable[[], object]], bool]] = {}
+_tmp: Optional[tempfile.TemporaryDirectory] = None
+
+
+def case(name: str, *, memory: bool = False):
+    """Register a benchmark case.
+
+    Args:
+        name: Name of the benchmark case, e.g. `model.from_yaml`.
+        memory: Measure the peak memory allocated by a call instead of its time.
+    """
+
+    def decorator(setup: Callable[[str], Callable[[], object]]):
+        if name in _cases:
+            raise ValueError(f"Benchmark case {name} is already registered.")
+
+        _cases[name] = (setup, memory)
+        return setup
+
+    return decorator
+
+
+def workdir() -> Path:
+    """Get a temporary directory for files used by benchmark cases.
+
+    The directory is created in the directory set by the `BENCH_DIR` environment
+    variable if it is set, and is removed when the benchmarks exit.
+    """
+    global _tmp
+    if _tmp is None:
+        _tmp = tempfile.TemporaryDirectory(dir=os.getenv("BENCH_DIR"))
+        atexit.register(_tmp.cleanup)
+
+    return Path(_tmp.name)
+
+
+class Result(NamedTuple):
+    """Result of a benchmark case.
+
+    Results are in seconds per call, or in bytes for memory cases.
+    """
+
+    best: float
+    median: float
+    number: int
+    unit: str = "s"
+
+
+class Regression(NamedTuple):
+    """Benchmark case that is slower, or uses more memory, than its baseline."""
+
+    name: str
+    baseline: float
+    current: float
+
+    @property
+    def ratio(self) -> float:
+        """Get the current result as a multiple of the baseline result."""
+        return self.current / self.baseline
+
+
+def measure(func: Callable[[], object], repeat: int = 5, budget: float = 0.2) -> Result:
+    """Time a callable.
+
+    The number of calls per repetition is chosen so that each repetition
+    takes at least `budget` seconds.
+    """
+    timer = timeit.Timer(func)
+    number, elapsed = timer.autorange()
+    if elapsed < budget:
+        number = max(number, int(number * budget / max(elapsed, 1e-9)))
+
+    times = [t / number for t in timer.repeat(repeat=repeat, number=number)]
+    return Result(min(times), statistics.median(times), number)
+
+
+def measure_memory(func: Callable[[], object], repeat: int = 5, **kwargs) -> Result:
+    """Measure the peak memory allocated while calling a callable.
+
+    The callable is called once first so that lazy imports and caches are not measured.
+    """
+    func()
+    sizes = []
+    for _ in range(repeat):
+        gc.collect()
+        tracemalloc.start()
+        try:
+            func()
+            _, size = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        sizes.append(size)
+
+    return Result(min(sizes), statistics.median(sizes), 1, "B")
+
+
+def run(patterns: Optional[List[str]] = None, sizes: Optional[List[str]] = None, **kwargs):
+    """Run registered benchmark cases.
+
+    Args:
+        patterns: Only run cases whose name matches one of these glob patterns.
+        sizes: Only run cases at these sizes.
+        kwargs: Keyword arguments for `measure` or `measure_memory`.
+
+    Yields:
+        Name of each case, suffixed with its size, and its result.
+    """
+    for size in sizes or SIZES:
+        for name, (setup, memory) in _cases.items():
+            if patterns and not any(fnmatch.fnmatch(name, p) for p in patterns):
+                continue
+
+            func = setup(size)
+            yield f"{name}[{size}]", (measure_memory if memory else measure)(func, **kwargs)
+
+
+def save(results: Dict[str, Result], file: Path) -> None:
+    """Save benchmark results as a JSON baseline."""
+    baseline = {
+        "meta": {
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "machine": platform.machine(),
+            "yaml_backend": yaml_backend(),
+        },
+        "results": {name: result._asdict() for name, result in results.items()},
+    }
+    file.write_text(json.dumps(baseline, indent=2, sort_keys=True) + "\n")
+
+
+def load(file: Path) -> Dict[str, Result]:
+    """Load benchmark results from a JSON baseline."""
+    baseline = json.loads(file.read_text())
+    return {name: Result(**result) for name, result in baseline["results"].items()}
+
+
+def compare(
+    baseline: Dict[str, Result], results: Dict[str, Result], threshold: float
+) -> List[Regression]:
+    """Get benchmark cases that are slower, or use more memory, than their baseline.
+
+    Args:
+        baseline: Baseline results.
+        results: Current results.
+        threshold: Allowed regression as a fraction of the baseline, e.g. 0.1 for 10%.
+    """
+    return [
+        Regression(name, baseline[name].best, result.best)
+        for name, result in results.items()
+        if name in baseline and result.best > baseline[name].best * (1 + threshold)
+    ]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Run benchmark cases from the command line."""
+
+    def fmt(value: float, unit: str) -> str:
+        if unit == "B":
+            return f"{value / 1024:.1f} KiB"
+
+        return f"{value * 1000:.4f} ms" if value >= 1e-3 else f"{value * 1e6:.4f} us"
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("patterns", nargs="*", help="Only run cases matching these globs.")
+    parser.add_argument("--size", action="append", choices=list(SIZES), dest="sizes")
+    parser.add_argument("--repeat", type=int, default=5, help="Repetitions per case.")
+    parser.add_argument("--save", type=Path, metavar="FILE", help="Save results as a baseline.")
+    parser.add_argument("--compare", type=Path, metavar="FILE", help="Compare with a baseline.")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.1,
+        help="Allowed regression before a case is flagged (default: 0.1).",
+    )
+    args = parser.parse_args(argv)
+
+    baseline = load(args.compare) if args.compare else {}
+    results = {}
+    print(f"{'case':<48}{'best':>16}{'median':>16}{'baseline':>16}{'change':>9}")
+    for name, result in run(args.patterns, args.sizes, repeat=args.repeat):
+        results[name] = result
+        line = (
+            f"{name:<48}{fmt(result.best, result.unit):>16}{fmt(result.median, result.unit):>16}"
+        )
+        if name in baseline:
+            change = result.best / baseline[name].best - 1
+            flag = "  !" if change > args.threshold else ""
+            line += f"{fmt(baseline[name].best, result.unit):>16}{change:>+9.1%}{flag}"
+
+        print(line, flush=True)
+
+    if args.save:
+        save(results, args.save)
+
+    if regressions := compare(baseline, results, args.threshold):
+        print(f"\n{len(regressions)} case(s) regressed by more than {args.threshold:.0%}:")
+        for regression in regressions:
+            print(f"  {regression.name}: {regression.ratio:.2f}x the baseline")
+
+        return 1
+
+    return 0
@@ -0,0 +1,75 @@
+# Copyright 2024 Canonical Ltd.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License version 3 as published by the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Measure the cost of atomic, durable configuration file writes.
+
+The benchmark writes into a temporary directory created under `BENCH_DIR`, or
+the current working directory if `BENCH_DIR` is not set. Point `BENCH_DIR`
+at the filesystem you care about; fsync is free on tmpfs.
+
+Run from the root of the repository:
+
+    $ PYTHONPATH=. python3 tests/benchmark/bench_atomic_write.py
+"""
+
+import os
+import tempfile
+import time
+from pathlib import Path
+
+import _configs
+
+from ondemandutils.editors import ood_portal, write_batch
+from ondemandutils.models import OODPortalConfig
+
+FILES = 50
+
+
+def run(root: Path, **kwargs) -> float:
+    """Write `FILES` configuration files and return the mean time per file."""
+    config = OODPortalConfig(_configs.ood_portal(aliases=50, connectors=5))
+    start = time.perf_counter()
+    for i in range(FILES):
+        ood_portal.dump(config, root / f"ood_portal-{i}.yml", **kwargs)
+
+    return (time.perf_counter() - start) / FILES
+
+
+def run_batch(root: Path, **kwargs) -> float:
+    """Write `FILES` configuration files in a single batch."""
+    start = time.perf_counter()
+    with write_batch(**kwargs):
+        run(root)
+
+    return (time.perf_counter() - start) / FILES
+
+
+def main() -> None:
+    """Run benchmarks."""
+    with tempfile.TemporaryDirectory(dir=os.getenv("BENCH_DIR", ".")) as tmp:
+        root = Path(tmp)
+        cases = {
+            "in place": lambda: run(root),
+            "atomic": lambda: run(root, atomic=True, fsync_dir=False),
+            "atomic + dir fsync": lambda: run(root, atomic=True),
+            "batched": lambda: run_batch(root, fsync_dir=False),
+            "batched + dir fsync": lambda: run_batch(root),
+        }
+        print(f"{'mode':<24}{'ms/file':>10}")
+        for name, case in cases.items():
+            print(f"{name:<24}{min(case() for _ in range(3)) * 1000:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+# Copyright 2024 Canonical Ltd.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License version 3 as published by the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Measure repeated access to the nested Dex configuration of a portal config.
+
+Run from the root of the repository:
+
+    $ PYTHONPATH=. python3 tests/benchmark/bench_dex_view.py
+"""
+
+import timeit
+
+import _configs
+
+from ondemandutils.models import DexConfig, OODPortalConfig
+
+
+def main() -> None:
+    """Run benchmarks."""
+    config = OODPortalConfig(_configs.ood_portal(connectors=100))
+    number = 100000
+    cases = {
+        "config.dex": lambda: config.dex,
+        "config.dex.http_port": lambda: config.dex.http_port,
+        # How `config.dex` used to be constructed on every access.
+        "DexConfig(**config.data['dex'])": lambda: DexConfig(**config.data["dex"]),
+    }
+    print(f"{'case':<36}{'us':>10}")
+    for name, case in cases.items():
+        elapsed = min(timeit.repeat(case, number=number)) / number
+        print(f"{name:<36}{elapsed * 1e6:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+# Copyright 2024 Canonical Ltd.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License version 3 as published by the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Compare copied and frozen `BaseModel.dict()` on large portal configs.
+
+Run from the root of the repository:
+
+    $ PYTHONPATH=. python3 tests/benchmark/bench_dict.py
+"""
+
+import timeit
+
+import _configs
+
+from ondemandutils.models import DexConfig, OODPortalConfig
+
+
+def main() -> None:
+    """Run benchmarks."""
+    config = OODPortalConfig(_configs.ood_portal(aliases=1000, connectors=200, settings=200))
+    dex = DexConfig(config["dex"])
+    other = config.dict()
+    number = 50
+
+    def setter() -> None:
+        config.dex = dex
+
+    cases = {
+        "dict()": config.dict,
+        "dict(frozen=True)": lambda: config.dict(frozen=True),
+        "dict() == other": lambda: config.dict() == other,
+        "dict(frozen=True) == other": lambda: config.dict(frozen=True) == other,
+        "dex setter": setter,
+    }
+    print(f"{'case':<30}{'ms':>10}")
+    for name, case in cases.items():
+        elapsed = min(timeit.repeat(case, number=number)) / number
+        print(f"{name:<30}{elapsed * 1000:>10.4f}")
+
+
+if __name__ == "__main__":
+    main()
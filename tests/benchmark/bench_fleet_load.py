@@ -0,0 +1,65 @@
+# Copyright 2024 Canonical Ltd.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License version 3 as published by the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Measure how fleet loading throughput scales with worker count.
+
+Run from the root of the repository:
+
+    $ PYTHONPATH=. python3 tests/benchmark/bench_fleet_load.py
+"""
+
+import os
+import tempfile
+import time
+from pathlib import Path
+
+import _configs
+
+from ondemandutils.editors import fleet, ood_portal
+from ondemandutils.models import OODPortalConfig
+
+SITES = 400
+
+
+def main() -> None:
+    """Run benchmarks."""
+    with tempfile.TemporaryDirectory(dir=os.getenv("BENCH_DIR", ".")) as tmp:
+        files = []
+        config = OODPortalConfig(_configs.ood_portal(aliases=100, connectors=10))
+        for i in range(SITES):
+            file = Path(tmp) / f"site-{i}-ood_portal.yml"
+            ood_portal.dump(config, file)
+            files.append(file)
+
+        print(f"{'io workers':<12}{'parse workers':<15}{'files/s':>10}")
+        for io_workers, parse_workers in [
+            (1, None),
+            (4, None),
+            (16, None),
+            (4, 2),
+            (4, 4),
+            (8, 8),
+        ]:
+            if parse_workers and parse_workers > (os.cpu_count() or 1):
+                continue
+
+            start = time.perf_counter()
+            report = fleet.load_all(files, io_workers=io_workers, parse_workers=parse_workers)
+            elapsed = time.perf_counter() - start
+            assert not report.errors
+            print(f"{io_workers:<12}{str(parse_workers):<15}{SITES / elapsed:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+# Copyright 2024 Canonical Ltd.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License version 3 as published by the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Measure how long `ondemandutils` takes to import using `python -X importtime`.
+
+Each statement is run in a fresh interpreter several times, and the cumulative
+time spent on the imports it triggers, excluding interpreter startup, is recorded. Results can be
+saved and compared like the benchmark suite:
+
+    $ PYTHONPATH=. python3 tests/benchmark/bench_import.py --save imports.json
+    $ PYTHONPATH=. python3 tests/benchmark/bench_import.py --compare imports.json
+
+Pass `--top N` to list the slowest modules imported by each statement.
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import _harness
+
+STATEMENTS = {
+    "import.editors": "import ondemandutils.editors",
+    "import.models": "import ondemandutils.models",
+    "import.ood_portal": "from ondemandutils.editors import ood_portal",
+    "import.nginx_stage": "from ondemandutils.editors import nginx_stage",
+    "import.first_load": "from ondemandutils.editors import ood_portal; ood_portal.loads('{}')",
+}
+
+
+def importtime(statement: str) -> List[Tuple[str, int, int]]:
+    """Run a statement in a fresh interpreter and parse its `-X importtime` report.
+
+    Returns:
+        Module name, self time, and cumulative time in microseconds of each import.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        capture_output=True,
+        check=True,
+        env={**os.environ, "PYTHONDONTWRITEBYTECODE": "1"},
+        text=True,
+    )
+    imports = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        # Nested imports are indented below the module that imported them.
+        name = name[1:].rstrip()
+        if name == "site":
+            # Everything before `site` finishes is imported at interpreter startup.
+            imports.clear()
+            continue
+
+        imports.append((name, int(self_us), int(cumulative_us)))
+
+    return imports
+
+
+def total(imports: List[Tuple[str, int, int]]) -> int:
+    """Get the cumulative time spent importing top-level modules, in microseconds."""
+    return sum(c for n, _, c in imports if not n.startswith(" "))
+
+
+def main() -> int:
+    """Run benchmarks."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=15, help="Interpreters per statement.")
+    parser.add_argument("--top", type=int, default=0, help="List the N slowest imports.")
+    parser.add_argument("--save", type=Path, metavar="FILE", help="Save results as a baseline.")
+    parser.add_argument("--compare", type=Path, metavar="FILE", help="Compare with a baseline.")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Allowed slowdown.")
+    args = parser.parse_args()
+
+    baseline = _harness.load(args.compare) if args.compare else {}
+    results: Dict[str, _harness.Result] = {}
+    print(f"{'statement':<24}{'best (ms)':>12}{'median (ms)':>13}{'baseline':>12}{'change':>9}")
+    for name, statement in STATEMENTS.items():
+        runs = [importtime(statement) for _ in range(args.repeat)]
+        times = [total(imports) / 1e6 for imports in runs]
+        result = results[name] = _harness.Result(min(times), statistics.median(times), 1)
+        line = f"{name:<24}{result.best * 1000:>12.2f}{result.median * 1000:>13.2f}"
+        if name in baseline:
+            change = result.best / baseline[name].best - 1
+            flag = "  !" if change > args.threshold else ""
+            line += f"{baseline[name].best * 1000:>12.2f}{change:>+9.1%}{flag}"
+
+        print(line)
+        if args.top:
+            # Use the fastest run so that the listing is not skewed by noise.
+            fastest = min(runs, key=total)
+            for module, self_us, _ in sorted(fastest, key=lambda i: -i[1])[: args.top]:
+                print(f"    {module.strip():<40}{self_us / 1000:>8.2f}")
+
+    if args.save:
+        _harness.save(results, args.save)
+
+    if regressions := _harness.compare(baseline, results, args.threshold):
+        print(f"\n{len(regressions)} statement(s) regressed by more than {args.threshold:.0%}:")
+        for regression in regressions:
+            print(f"  {regression.name}: {regression.ratio:.2f}x slower")
+
+        return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,41 @@
+# Copyright 2024 Canonical Ltd.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License version 3 as published by the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Run the model and editor benchmark suite, optionally against a JSON baseline.
+
+Run from the root of the repository:
+
+    $ PYTHONPATH=. python3 tests/benchmark/bench_suite.py --save baseline.json
+    $ PYTHONPATH=. python3 tests/benchmark/bench_suite.py --compare baseline.json
+
+Only run some cases at some sizes:
+
+    $ PYTHONPATH=. python3 tests/benchmark/bench_suite.py 'model.*' --size large
+
+Memory cases, named `memory.*`, report the peak memory allocated by a call rather
+than its time. Exits with a non-zero status if any case is slower, or uses more
+memory, than the baseline by more than `--threshold`.
+"""
+
+import sys
+
+import _cases_editors  # noqa: F401
+import _cases_memory  # noqa: F401
+import _cases_models  # noqa: F401
+import _cases_puns  # noqa: F401
+import _cases_renderers  # noqa: F401
+import _harness
+
+if __name__ == "__main__":
+    sys.exit(_harness.main())
@@ -0,0 +1,72 @@
+# Copyright 2024 Canonical Ltd.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License version 3 as published by the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Measure validation of wide configurations that set every supported option.
+
+The compiled schema is compared against the previous validation strategy, which
+rebuilt a dictionary of options and called `hasattr` on the option enum for
+every key without checking value types.
+
+Run from the root of the repository:
+
+    $ PYTHONPATH=. python3 tests/benchmark/bench_validation.py
+"""
+
+import timeit
+
+import _configs
+
+from ondemandutils.models import DexConfig, NginxStageConfig, OODPortalConfig
+from ondemandutils.models._options import (
+    DEX_OPTION_TYPES,
+    NGINX_STAGE_OPTION_TYPES,
+    OOD_PORTAL_OPTION_TYPES,
+    DexOptions,
+    NginxStageOptions,
+    OODPortalOptions,
+)
+
+
+def legacy_validate(obj, validator, **kwargs) -> None:
+    """Validate options the way `BaseModel.__init__` used to."""
+    obj = obj or {}
+    for k, v in {**obj, **kwargs}.items():
+        if not hasattr(validator, k.upper()):
+            raise AttributeError(f"Unrecognised configuration option {k}={v}.")
+
+
+def main() -> None:
+    """Run benchmarks."""
+    dex = _configs.wide(DexOptions, DEX_OPTION_TYPES)
+    nginx_stage = _configs.wide(NginxStageOptions, NGINX_STAGE_OPTION_TYPES)
+    ood_portal = _configs.wide(OODPortalOptions, OOD_PORTAL_OPTION_TYPES)
+    ood_portal["dex"] = dex
+    cases = [
+        (DexConfig, DexOptions, dex),
+        (NginxStageConfig, NginxStageOptions, nginx_stage),
+        (OODPortalConfig, OODPortalOptions, ood_portal),
+    ]
+    number = 20000
+    print(f"{'model':<20}{'options':>8}{'legacy (us)':>14}{'schema (us)':>14}")
+    for model, options, config in cases:
+        legacy = min(timeit.repeat(lambda: legacy_validate(config, options), number=number))
+        schema = min(timeit.repeat(lambda: model.schema.validate(config), number=number))
+        print(
+            f"{model.__name__:<20}{len(config):>8}"
+            + f"{legacy / number * 1e6:>14.2f}{schema / number * 1e6:>14.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
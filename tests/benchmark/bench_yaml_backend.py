@@ -0,0 +1,52 @@
+# Copyright 2024 Canonical Ltd.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License version 3 as published by the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Compare the libyaml and pure-Python YAML backends on large portal configs.
+
+Run from the root of the repository:
+
+    $ PYTHONPATH=. python3 tests/benchmark/bench_yaml_backend.py
+"""
+
+import timeit
+
+import _configs
+
+from ondemandutils.models import OODPortalConfig, _serializer
+
+SIZES = {
+    "small": {"aliases": 2, "connectors": 1},
+    "large": {"aliases": 1000, "connectors": 100, "settings": 100},
+    "huge": {"aliases": 5000, "connectors": 500, "settings": 500},
+}
+
+
+def main() -> None:
+    """Run benchmarks."""
+    print(f"{'size':<8}{'backend':<10}{'from_yaml (ms)':>16}{'yaml (ms)':>12}")
+    for size, kwargs in SIZES.items():
+        doc = OODPortalConfig(_configs.ood_portal(**kwargs)).yaml()
+        for backend in _serializer.backends():
+            _serializer.set_backend(backend)
+            config = OODPortalConfig.from_yaml(doc)
+            number = 3 if size == "huge" else 10
+            load = min(timeit.repeat(lambda: OODPortalConfig.from_yaml(doc), number=number))
+            dump = min(timeit.repeat(config.yaml, number=number))
+            print(
+                f"{size:<8}{backend:<10}{load / number * 1000:>16.3f}{dump / number * 1000:>12.3f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+# Copyright 2024 Canonical Ltd.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License version 3 as published by the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Unit tests for the asyncio configuration editor methods."""
+
+import asyncio
+import tempfile
+import unittest
+from pathlib import Path
+
+from ondemandutils.editors import nginx_stage, ood_portal, set_async_workers, write_batch
+from ondemandutils.models import NginxStageConfig, OODPortalConfig
+
+
+class TestAsyncEditors(unittest.IsolatedAsyncioTestCase):
+    """Unit tests for `aload`, `aloads`, `adump`, and `aedit`."""
+
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+
+    async def test_adump_aload(self) -> None:
+        """Test dumping and loading configuration files asynchronously."""
+        file = self.root / "ood_portal.yml"
+        await ood_portal.adump(OODPortalConfig(servername="commander-1"), file)
+        config = await ood_portal.aload(file)
+        self.assertEqual(config.servername, "commander-1")
+
+        config = await nginx_stage.aloads("min_uid: 1000\n")
+        self.assertIsInstance(config, NginxStageConfig)
+        self.assertEqual(config.min_uid, 1000)
+
+    async def test_aedit(self) -> None:
+        """Test editing many configuration files concurrently."""
+        set_async_workers(2)
+
+        async def reconcile(site: int) -> bool:
+            editor = nginx_stage.aedit(self.root / f"site-{site}-nginx_stage.yml")
+            async with editor as config:
+                config.min_uid = 1000 + site
+
+            return editor.written
+
+        self.assertTrue(all(await asyncio.gather(*(reconcile(i) for i in range(10)))))
+        for i in range(10):
+            config = nginx_stage.load(self.root / f"site-{i}-nginx_stage.yml")
+            self.assertEqual(config.min_uid, 1000 + i)
+
+        # Second pass does not change anything, so nothing should be written.
+        self.assertFalse(any(await asyncio.gather(*(reconcile(i) for i in range(10)))))
+
+    async def test_aedit_error(self) -> None:
+        """Test that `aedit` does not write if an error occurs."""
+        file = self.root / "ood_portal.yml"
+        editor = ood_portal.aedit(file)
+        with self.assertRaises(RuntimeError):
+            async with editor as config:
+                config.servername = "commander-1"
+                raise RuntimeError("awjeezrick")
+
+        self.assertFalse(editor.written)
+        self.assertFalse(file.exists())
+
+    async def test_write_batch(self) -> None:
+        """Test that asynchronous writes join an active `write_batch`."""
+        file = self.root / "ood_portal.yml"
+        with write_batch():
+            await ood_portal.adump(OODPortalConfig(servername="commander-1"), file)
+            self.assertFalse(file.exists())
+
+        self.assertTrue(file.exists())
+
+    def tearDown(self) -> None:
+        set_async_workers(8)
+        self.tmp.cleanup()
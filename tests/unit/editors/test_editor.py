@@ -0,0 +1,186 @@
+# Copyright 2024 Canonical Ltd.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License version 3 as published by the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Unit tests for the base methods shared by configuration editors."""
+
+import os
+import stat
+import tempfile
+import unittest
+from pathlib import Path
+
+from ondemandutils.editors import (
+    cache_clear,
+    cache_info,
+    nginx_stage,
+    ood_portal,
+    set_cache_size,
+    write_batch,
+)
+from ondemandutils.models import NginxStageConfig, OODPortalConfig
+
+
+class TestAtomicWrites(unittest.TestCase):
+    """Unit tests for atomic configuration file writes."""
+
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+
+    def test_atomic_dump(self) -> None:
+        """Test atomically replacing a configuration file."""
+        file = self.root / "ood_portal.yml"
+        file.write_text("servername: awjeezrick\n")
+        file.chmod(0o640)
+        inode = file.stat().st_ino
+
+        ood_portal.dump(OODPortalConfig(servername="commander-1"), file, atomic=True)
+        self.assertEqual(ood_portal.load(file).servername, "commander-1")
+        self.assertEqual(stat.S_IMODE(file.stat().st_mode), 0o640)
+        self.assertNotEqual(file.stat().st_ino, inode)
+        self.assertListEqual([p.name for p in self.root.iterdir()], ["ood_portal.yml"])
+
+    def test_atomic_dump_symlink(self) -> None:
+        """Test that atomic writes replace the target of a symbolic link."""
+        file = self.root / "nginx_stage.yml"
+        link = self.root / "link.yml"
+        file.write_text("min_uid: 1000\n")
+        link.symlink_to(file)
+
+        nginx_stage.dump(NginxStageConfig(min_uid=500), link, atomic=True)
+        self.assertTrue(link.is_symlink())
+        self.assertEqual(nginx_stage.load(file).min_uid, 500)
+
+    def test_atomic_edit(self) -> None:
+        """Test atomically writing a configuration file with `edit`."""
+        file = self.root / "ood_portal.yml"
+        with ood_portal.edit(file, atomic=True) as config:
+            config.servername = "commander-1"
+
+        self.assertEqual(ood_portal.load(file).servername, "commander-1")
+
+    def test_write_batch(self) -> None:
+        """Test grouping several atomic writes together."""
+        portal = self.root / "ood_portal.yml"
+        stage = self.root / "nginx_stage.yml"
+        with write_batch():
+            ood_portal.dump(OODPortalConfig(servername="commander-1"), portal)
+            nginx_stage.dump(NginxStageConfig(min_uid=500), stage)
+            # Files are not visible until the batch is committed.
+            self.assertFalse(portal.exists())
+            self.assertFalse(stage.exists())
+
+        self.assertEqual(ood_portal.load(portal).servername, "commander-1")
+        self.assertEqual(nginx_stage.load(stage).min_uid, 500)
+        self.assertEqual(len(list(self.root.iterdir())), 2)
+
+    def test_write_batch_error(self) -> None:
+        """Test that nothing is written if an error occurs inside a batch."""
+        portal = self.root / "ood_portal.yml"
+        with self.assertRaises(RuntimeError):
+            with write_batch():
+                ood_portal.dump(OODPortalConfig(servername="commander-1"), portal)
+                raise RuntimeError("awjeezrick")
+
+        self.assertListEqual(list(self.root.iterdir()), [])
+
+    def test_write_batch_large(self) -> None:
+        """Test that pending writes do not hold file descriptors open."""
+        fds = len(os.listdir("/proc/self/fd"))
+        with write_batch():
+            for i in range(100):
+                ood_portal.dump(OODPortalConfig(port=i), self.root / f"{i}_ood_portal.yml")
+
+            self.assertLessEqual(len(os.listdir("/proc/self/fd")), fds)
+
+        self.assertEqual(ood_portal.load(self.root / "99_ood_portal.yml").port, 99)
+
+    def test_write_batch_replace_error(self) -> None:
+        """Test that temporary files are removed if a batch cannot be committed."""
+        portal = self.root / "ood_portal.yml"
+        stage = self.root / "nginx_stage.yml"
+        stage.mkdir()
+        with self.assertRaises(OSError):
+            with write_batch():
+                ood_portal.dump(OODPortalConfig(servername="commander-1"), portal)
+                nginx_stage.dump(NginxStageConfig(min_uid=500), stage)
+                nginx_stage.dump(NginxStageConfig(min_uid=500), self.root / "nginx_stage2.yml")
+
+        # Files replaced before the error are kept, and the rest are removed.
+        self.assertEqual(ood_portal.load(portal).servername, "commander-1")
+        self.assertListEqual(
+            sorted(p.name for p in self.root.iterdir()), [stage.name, portal.name]
+        )
+
+    def tearDown(self) -> None:
+        self.tmp.cleanup()
+
+
+class TestLoadCache(unittest.TestCase):
+    """Unit tests for the parsed configuration cache."""
+
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        self.portal = self.root / "ood_portal.yml"
+        self.portal.write_text("servername: commander-1\nserver_aliases: [www.example.com]\n")
+        cache_clear()
+
+    def test_cache_hit(self) -> None:
+        """Test that unchanged files are only parsed once."""
+        config_1 = ood_portal.load(self.portal, cache=True)
+        config_2 = ood_portal.load(self.portal, cache=True)
+        self.assertEqual(cache_info().hits, 1)
+        self.assertEqual(cache_info().misses, 1)
+        self.assertDictEqual(config_1.dict(), config_2.dict())
+
+        # Cached configurations must be independent copies.
+        config_2.server_aliases.append("www.awjeezrick.com")
+        config_3 = ood_portal.load(self.portal, cache=True)
+        self.assertListEqual(config_3.server_aliases, ["www.example.com"])
+
+    def test_cache_invalidation(self) -> None:
+        """Test that rewritten files are parsed again."""
+        ood_portal.load(self.portal, cache=True)
+        with ood_portal.edit(self.portal) as config:
+            config.servername = "awjeezrick"
+
+        self.assertEqual(ood_portal.load(self.portal, cache=True).servername, "awjeezrick")
+        self.assertEqual(cache_info().misses, 2)
+
+    def test_cache_parser(self) -> None:
+        """Test that entries are not shared between editors."""
+        stage = self.root / "nginx_stage.yml"
+        stage.write_text("min_uid: 1000\n")
+        ood_portal.load(self.portal, cache=True)
+        nginx_stage.load(stage, cache=True)
+        with self.assertRaises(AttributeError):
+            # An `ood_portal.yml` file is not a valid `nginx_stage.yml` file.
+            nginx_stage.load(self.portal, cache=True)
+
+    def test_cache_eviction(self) -> None:
+        """Test that least recently used entries are evicted."""
+        set_cache_size(1)
+        stage = self.root / "nginx_stage.yml"
+        stage.write_text("min_uid: 1000\n")
+        ood_portal.load(self.portal, cache=True)
+        nginx_stage.load(stage, cache=True)
+        ood_portal.load(self.portal, cache=True)
+        info = cache_info()
+        self.assertEqual((info.hits, info.misses, info.currsize), (0, 3, 1))
+
+    def tearDown(self) -> None:
+        set_cache_size(128)
+        cache_clear()
+        self.tmp.cleanup()
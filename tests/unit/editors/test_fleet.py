@@ -0,0 +1,97 @@
+# Copyright 2024 Canonical Ltd.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License version 3 as published by the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Unit tests for loading many configuration files concurrently."""
+
+import tempfile
+import unittest
+from pathlib import Path
+
+from ondemandutils.editors import fleet
+from ondemandutils.models import (
+    CompactNginxStageConfig,
+    CompactOODPortalConfig,
+    NginxStageConfig,
+    OODPortalConfig,
+)
+
+
+class TestFleet(unittest.TestCase):
+    """Unit tests for the `fleet` module."""
+
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        self.files = []
+        for i in range(10):
+            site = self.root / f"site-{i}"
+            site.mkdir()
+            (site / "ood_portal.yml").write_text(f"servername: site-{i}\n")
+            (site / "nginx_stage.yml").write_text(f"min_uid: {1000 + i}\n")
+            self.files += [site / "ood_portal.yml", site / "nginx_stage.yml"]
+
+        self.bad = self.root / "site-0" / "bad_ood_portal.yml"
+        self.bad.write_text("spill_secrets: SHREK!\n")
+        self.missing = self.root / "site-0" / "missing_nginx_stage.yml"
+        self.unknown = self.root / "site-0" / "awjeezrick.yml"
+        self.unknown.write_text("{}\n")
+
+    def _check(self, report: fleet.LoadReport, compact: bool = False) -> None:
+        self.assertEqual(len(report.configs), 20)
+        self.assertSetEqual(set(report.errors), {self.bad, self.missing, self.unknown})
+        self.assertIsInstance(report.errors[self.bad], AttributeError)
+        self.assertIsInstance(report.errors[self.missing], FileNotFoundError)
+        self.assertIsInstance(report.errors[self.unknown], ValueError)
+        for i in range(10):
+            portal = report.configs[self.root / f"site-{i}" / "ood_portal.yml"]
+            stage = report.configs[self.root / f"site-{i}" / "nginx_stage.yml"]
+            if compact:
+                self.assertIsInstance(portal, CompactOODPortalConfig)
+                self.assertIsInstance(stage, CompactNginxStageConfig)
+            else:
+                self.assertIsInstance(portal, OODPortalConfig)
+                self.assertIsInstance(stage, NginxStageConfig)
+
+            self.assertEqual(portal.servername, f"site-{i}")
+            self.assertEqual(stage.min_uid, 1000 + i)
+
+    def test_load_all(self) -> None:
+        """Test loading configuration files with a thread pool."""
+        files = self.files + [self.bad, self.missing, self.unknown]
+        self._check(fleet.load_all(files, io_workers=4))
+
+    def test_load_all_processes(self) -> None:
+        """Test parsing configuration files with a process pool."""
+        files = self.files + [self.bad, self.missing, self.unknown]
+        self._check(fleet.load_all(files, io_workers=4, parse_workers=2))
+
+    def test_load_all_compact(self) -> None:
+        """Test loading configuration files as compact data models."""
+        files = self.files + [self.bad, self.missing, self.unknown]
+        self._check(fleet.load_all(files, compact=True), compact=True)
+        self._check(fleet.load_all(files, parse_workers=2, compact=True), compact=True)
+
+    def test_iter_load_kind(self) -> None:
+        """Test loading configuration files with an explicit type."""
+        results = list(fleet.iter_load([self.unknown], kind="nginx_stage"))
+        self.assertEqual(len(results), 1)
+        self.assertIsNone(results[0].error)
+        self.assertIsInstance(results[0].config, NginxStageConfig)
+
+        # Invalid types are reported when called rather than when first iterated.
+        with self.assertRaises(ValueError):
+            fleet.iter_load(self.files, kind="awjeezrick")
+
+    def tearDown(self) -> None:
+        self.tmp.cleanup()
@@ -0,0 +1,114 @@
+# Copyright 2024 Canonical Ltd.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License version 3 as published by the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Unit tests for the history of configuration files."""
+
+import tempfile
+import unittest
+from pathlib import Path
+
+from ondemandutils.editors import history, nginx_stage, ood_portal, write_batch
+from ondemandutils.models import Impact, NginxStageConfig, OODPortalConfig
+
+
+class TestStore(unittest.TestCase):
+    """Unit tests for the `Store` class."""
+
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        self.portal = self.root / "ood_portal.yml"
+        self.stage = self.root / "nginx_stage.yml"
+        self.store = history.Store(self.root / "history")
+
+    def tearDown(self) -> None:
+        self.tmp.cleanup()
+
+    def test_track(self) -> None:
+        """Test that files written by the editors are recorded."""
+        ood_portal.dump(OODPortalConfig(port=80), self.portal)
+        self.assertEqual(self.store.versions(self.portal), [])
+
+        with self.store.track():
+            ood_portal.dump(OODPortalConfig(port=80), self.portal, canonical=True)
+            with ood_portal.edit(self.portal, canonical=True) as config:
+                config.port = 8080
+            with ood_portal.edit(self.portal, canonical=True) as config:
+                config.port = 8080
+            nginx_stage.dump(NginxStageConfig(), self.stage, canonical=True)
+
+        versions = self.store.versions(self.portal)
+        self.assertEqual([v.number for v in versions], [1, 2])
+        self.assertEqual(versions[-1].path, self.portal.absolute())
+        self.assertEqual(self.store.read(self.portal, -1), self.portal.read_text())
+        self.assertEqual(self.store.load(self.portal, 1).port, 80)
+        self.assertEqual(len(self.store.versions(self.stage)), 1)
+
+        # Versions are read back from the index by a new store.
+        store = history.Store(self.root / "history")
+        self.assertEqual(store.versions(self.portal), versions)
+
+    def test_deduplicate(self) -> None:
+        """Test that identical content is stored once."""
+        first = self.store.record(self.portal, "port: 80\n")
+        self.store.record(self.portal, "port: 8080\n")
+        third = self.store.record(self.portal, "port: 80\n")
+        self.assertEqual(third.number, 3)
+        self.assertEqual(third.digest, first.digest)
+        self.assertIs(self.store.record(self.portal, "port: 80\n"), third)
+        objects = [p for p in (self.root / "history" / "objects").rglob("*") if p.is_file()]
+        self.assertEqual(len(objects), 2)
+
+    def test_write_batch(self) -> None:
+        """Test that files written in a batch are recorded once the batch is committed."""
+        with self.store.track():
+            with write_batch():
+                ood_portal.dump(OODPortalConfig(port=80), self.portal)
+                self.assertEqual(self.store.versions(self.portal), [])
+
+            self.assertEqual(len(self.store.versions(self.portal)), 1)
+
+            with self.assertRaises(RuntimeError), write_batch():
+                ood_portal.dump(OODPortalConfig(port=8080), self.portal)
+                raise RuntimeError
+
+            self.assertEqual(len(self.store.versions(self.portal)), 1)
+
+    def test_diff(self) -> None:
+        """Test comparing two versions."""
+        with self.store.track():
+            ood_portal.dump(OODPortalConfig(port=80), self.portal)
+            ood_portal.dump(OODPortalConfig(port=8080), self.portal)
+
+        changes = self.store.diff(self.portal, 1, 2)
+        self.assertEqual([(c.option, c.old, c.new) for c in changes.changed], [("port", 80, 8080)])
+        self.assertIn(Impact.APACHE_RELOAD, changes.impact)
+        self.assertFalse(self.store.diff(self.portal, -1, 2))
+
+    def test_rollback(self) -> None:
+        """Test rolling back to a previous version."""
+        with self.store.track():
+            ood_portal.dump(OODPortalConfig(port=80), self.portal)
+            before = self.portal.read_text()
+            ood_portal.dump(OODPortalConfig(port=8080), self.portal)
+
+        version = self.store.rollback(self.portal, 1)
+        self.assertEqual(self.portal.read_text(), before)
+        self.assertEqual(version.number, 3)
+        self.assertEqual(version.digest, self.store.version(self.portal, 1).digest)
+        self.assertEqual(ood_portal.load(self.portal).port, 80)
+
+        for number in (0, 4, -4):
+            with self.assertRaises(KeyError):
+                self.store.rollback(self.portal, number)
@@ -0,0 +1,62 @@
+# Copyright 2024 Canonical Ltd.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License version 3 as published by the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Unit tests for lazily importing editors, data models, and their dependencies."""
+
+import ast
+import subprocess
+import sys
+import unittest
+
+# Modules that are slow to import and must only be imported when first used.
+DEFERRED = ["asyncio", "inspect", "json", "multiprocessing", "yaml"]
+
+
+def _imported(code: str) -> list:
+    """Get which deferred modules are imported after running code in a fresh interpreter."""
+    script = f"import sys\n{code}\nprint(sorted(set({DEFERRED!r}) & sys.modules.keys()))"
+    result = subprocess.run(
+        [sys.executable, "-c", script], capture_output=True, check=True, text=True
+    )
+    return ast.literal_eval(result.stdout)
+
+
+class TestImports(unittest.TestCase):
+    """Unit tests for lazy imports."""
+
+    def test_editors(self) -> None:
+        """Test that importing editors does not import slow dependencies."""
+        self.assertListEqual(_imported("import ondemandutils.editors"), [])
+        self.assertListEqual(
+            _imported("from ondemandutils.editors import nginx_stage, ood_portal"), []
+        )
+        self.assertListEqual(_imported("from ondemandutils.models import OODPortalConfig"), [])
+
+    def test_first_use(self) -> None:
+        """Test that dependencies are imported on first use."""
+        self.assertListEqual(
+            _imported("from ondemandutils.editors import ood_portal\nood_portal.loads('{}')"),
+            ["yaml"],
+        )
+
+    def test_lazy_attributes(self) -> None:
+        """Test that lazily imported names resolve to the same objects."""
+        from ondemandutils import _files, editors, models
+        from ondemandutils.models import ood_portal
+
+        self.assertIs(models.OODPortalConfig, ood_portal.OODPortalConfig)
+        self.assertIs(editors.write_batch, _files.write_batch)
+        self.assertIn("OODPortalConfig", dir(models))
+        with self.assertRaises(AttributeError):
+            models.awjeezrick
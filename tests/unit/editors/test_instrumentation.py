@@ -0,0 +1,95 @@
+# Copyright 2024 Canonical Ltd.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License version 3 as published by the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Unit tests for instrumentation of editors and data models."""
+
+import tempfile
+import unittest
+from pathlib import Path
+
+from ondemandutils import instrumentation
+from ondemandutils.editors import fleet, nginx_stage, ood_portal
+from ondemandutils.models import OODPortalConfig
+
+
+class TestInstrumentation(unittest.TestCase):
+    """Unit tests for the `ondemandutils.instrumentation` module."""
+
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.file = Path(self.tmp.name) / "ood_portal.yml"
+        ood_portal.dump(OODPortalConfig(servername="ondemand.example.com"), self.file)
+
+    def test_edit(self) -> None:
+        """Test that editing a file reports every stage."""
+        with instrumentation.collect() as collector:
+            with ood_portal.edit(self.file) as config:
+                config.port = 443
+
+        stages = [e.stage for e in collector.events]
+        self.assertListEqual(stages, ["read", "parse", "validate", "marshal", "write"])
+        for event in collector.events:
+            self.assertEqual(event.file, str(self.file))
+            self.assertGreaterEqual(event.duration, 0)
+            self.assertGreater(event.size, 0)
+
+        self.assertTrue(all(e.model == "OODPortalConfig" for e in collector.events[1:4]))
+        self.assertSetEqual(set(collector.totals()), set(stages))
+        self.assertListEqual(list(collector.totals(by="file")), [str(self.file)])
+
+    def test_fleet(self) -> None:
+        """Test that loading many files reports every stage of each file."""
+        with instrumentation.collect() as collector:
+            report = fleet.load_all([self.file])
+
+        self.assertListEqual(list(report.configs), [self.file])
+        self.assertListEqual(
+            [(e.stage, e.file) for e in collector.events],
+            [("read", str(self.file)), ("parse", str(self.file)), ("validate", str(self.file))],
+        )
+
+    def test_models(self) -> None:
+        """Test that data models report events without a file."""
+        with instrumentation.collect() as collector:
+            nginx_stage.loads("min_uid: 1000\n")
+
+        self.assertListEqual(
+            [(e.stage, e.file, e.model) for e in collector.events],
+            [("parse", None, "NginxStageConfig"), ("validate", None, "NginxStageConfig")],
+        )
+
+    def test_register(self) -> None:
+        """Test registering and unregistering callbacks."""
+        events = []
+
+        def broken(event) -> None:
+            raise RuntimeError("awjeezrick")
+
+        instrumentation.register(events.append)
+        instrumentation.register(broken)
+        try:
+            with self.assertLogs("ondemandutils.instrumentation", level="WARNING"):
+                ood_portal.load(self.file)
+        finally:
+            instrumentation.unregister(events.append)
+            instrumentation.unregister(broken)
+
+        self.assertEqual(len(events), 3)
+        ood_portal.load(self.file)
+        self.assertEqual(len(events), 3)
+        with self.assertRaises(ValueError):
+            instrumentation.unregister(broken)
+
+    def tearDown(self) -> None:
+        self.tmp.cleanup()
@@ -157,6 +157,23 @@ class TestNginxStageEditor(unittest.TestCase):
             ["PATH", "LD_LIBRARY_PATH", "MANPATH", "SCLS", "X_SCLS", "CPATH"],
         )
 
+    def test_edit_unchanged(self) -> None:
+        """Test that `edit` skips writing `nginx_stage.yml` if nothing changed."""
+        editor = nginx_stage.edit("nginx_stage.yaml")
+        with editor as config:
+            config.min_uid = 1000
+
+        self.assertFalse(editor.written)
+        self.assertEqual(Path("nginx_stage.yaml").read_text(), example_nginx_stage_yml)
+
+        editor = nginx_stage.edit("nginx_stage.yaml")
+        with editor as config:
+            config.pun_custom_env["OOD_DASHBOARD_TITLE"] = "Charmed HPC"
+
+        self.assertTrue(editor.written)
+        config = nginx_stage.load("nginx_stage.yaml")
+        self.assertEqual(config.pun_custom_env["OOD_DASHBOARD_TITLE"], "Charmed HPC")
+
     def test_empty_config(self) -> None:
         """Test `edit` context manager when there is no pre-existing configuration."""
         tmp = tempfile.TemporaryDirectory()
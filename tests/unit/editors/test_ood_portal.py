@@ -149,6 +149,63 @@ class TestDexConfigEditor(unittest.TestCase):
         # Ensure that empty `DexConfig` object is returned by getter.
         self.assertDictEqual(portal_config.dex.dict(), DexConfig().dict())
 
+    def test_dex_write_through(self) -> None:
+        """Test that changes to the nested Dex configuration are written through."""
+        with ood_portal.edit("ood_portal.yaml") as portal_config:
+            self.assertIs(portal_config.dex, portal_config.dex)
+            portal_config.dex.connectors = [{"type": "github", "id": "github", "name": "GitHub"}]
+            portal_config.dex.client_redirect_uris.append("https://ondemand.example.com")
+            del portal_config.dex.expiry
+
+        portal_config = ood_portal.load("ood_portal.yaml")
+        self.assertListEqual(
+            portal_config.dex.connectors, [{"type": "github", "id": "github", "name": "GitHub"}]
+        )
+        self.assertListEqual(
+            portal_config.dex.client_redirect_uris, ["https://ondemand.example.com"]
+        )
+        self.assertNotIn("expiry", portal_config.dex)
+
+        # Replacing the Dex configuration rebinds the cached view.
+        view = portal_config.dex
+        portal_config.dex = DexConfig(http_port=5556)
+        self.assertIsNot(portal_config.dex, view)
+        self.assertEqual(portal_config.dex.http_port, 5556)
+        self.assertIsNone(portal_config.dex.connectors)
+
+    def test_dex_unset(self) -> None:
+        """Test changing Dex configuration that is not set yet."""
+        with tempfile.TemporaryDirectory() as tmp:
+            file = Path(tmp, "ood_portal.yml")
+            ood_portal.dump(OODPortalConfig(servername="ondemand", dex=None), file)
+            with ood_portal.edit(file) as portal_config:
+                # Reading the view alone does not enable Dex.
+                self.assertIs(portal_config.dex, portal_config.dex)
+                self.assertIsNone(portal_config["dex"].http_port)
+                self.assertFalse(portal_config.dirty)
+                portal_config.dex.client_name = "HPC"
+                self.assertSetEqual(set(portal_config.changed), {"dex"})
+
+            self.assertEqual(ood_portal.load(file).dex.client_name, "HPC")
+
+        portal_config = OODPortalConfig()
+        portal_config.dex.http_port = 5556
+        self.assertDictEqual(portal_config.dict(), {"dex": {"http_port": 5556}})
+
+    def test_dex_copy(self) -> None:
+        """Test that copies and merges do not share Dex configuration."""
+        portal_config = OODPortalConfig(dex={"http_port": 5556})
+        view = portal_config.dex
+        copied = portal_config.copy()
+        copied.dex.http_port = 1234
+        merged = portal_config | OODPortalConfig(servername="ondemand")
+        merged.dex.client_name = "HPC"
+        self.assertIsNot(copied.dex, view)
+        self.assertDictEqual(portal_config.dict(), {"dex": {"http_port": 5556}})
+        self.assertFalse(portal_config.dirty)
+        self.assertEqual(copied.dex.http_port, 1234)
+        self.assertEqual(merged.dex.client_name, "HPC")
+
     def test_bad_dex_config(self) -> None:
         """Test setting a bad Dex service configuration in `ood_portal.yml`."""
         # Attempt setting a bad Dex configuration on `OODPortalConfig`.
@@ -186,6 +243,21 @@ class TestOODPortalEditor(unittest.TestCase):
         # timestamps in the header will be different.
         self.assertNotEqual(ood_portal.dumps(config), example_ood_portal_yml)
 
+    def test_dumps_canonical(self) -> None:
+        """Test that canonical dumps of equal configurations are identical."""
+        config = ood_portal.loads(example_ood_portal_yml)
+        canonical = ood_portal.dumps(config, canonical=True)
+        self.assertTrue(canonical.startswith("#\n# `ood_portal.yml` generated by ondemandutils."))
+        self.assertEqual(ood_portal.dumps(ood_portal.loads(canonical), canonical=True), canonical)
+        self.assertEqual(ood_portal.loads(canonical).fingerprint(), config.fingerprint())
+
+        with ood_portal.edit("ood_portal.yaml", canonical=True) as config:
+            config.port = 443
+
+        self.assertEqual(
+            Path("ood_portal.yaml").read_text(), ood_portal.dumps(config, canonical=True)
+        )
+
     def test_edit(self) -> None:
         """Test `edit` context manager of the ood_portal module."""
         with ood_portal.edit("ood_portal.yaml") as config:
@@ -205,6 +277,39 @@ class TestOODPortalEditor(unittest.TestCase):
             config.pun_stage_cmd, "sudo /snap/ondemand/current/nginx_stage/sbin/nginx_stage"
         )
 
+    def test_edit_unchanged(self) -> None:
+        """Test that `edit` skips writing `ood_portal.yml` if nothing changed."""
+        editor = ood_portal.edit("ood_portal.yaml")
+        with editor as config:
+            config.servername = config.servername
+
+        self.assertFalse(editor.written)
+        self.assertEqual(Path("ood_portal.yaml").read_text(), example_ood_portal_yml)
+
+        editor = ood_portal.edit("ood_portal.yaml")
+        with editor as config:
+            config.server_aliases.append("www.example.org")
+
+        self.assertTrue(editor.written)
+        self.assertNotEqual(Path("ood_portal.yaml").read_text(), example_ood_portal_yml)
+
+        editor = ood_portal.edit("ood_portal.yaml", force=True)
+        with editor:
+            pass
+
+        self.assertTrue(editor.written)
+
+    def test_edit_error(self) -> None:
+        """Test that `edit` does not write `ood_portal.yml` if an error occurs."""
+        editor = ood_portal.edit("ood_portal.yaml")
+        with self.assertRaises(RuntimeError):
+            with editor as config:
+                config.servername = "commander-1"
+                raise RuntimeError("awjeezrick")
+
+        self.assertFalse(editor.written)
+        self.assertEqual(Path("ood_portal.yaml").read_text(), example_ood_portal_yml)
+
     def test_empty_config(self) -> None:
         tmp = tempfile.TemporaryDirectory()
         tmp_file = tmp.name + "/ood_portal.yaml"
@@ -218,5 +323,29 @@ class TestOODPortalEditor(unittest.TestCase):
 
         tmp.cleanup()
 
+    def test_iter_load(self) -> None:
+        """Test `iter_load` function of the ood_portal module."""
+        with tempfile.TemporaryDirectory() as tmp:
+            inventory = Path(tmp) / "inventory.yaml"
+            inventory.write_text(
+                "".join(f"servername: site-{i}\n---\n" for i in range(3)) + example_ood_portal_yml
+            )
+            configs = list(ood_portal.iter_load(inventory))
+            self.assertListEqual(
+                [c.servername for c in configs], ["site-0", "site-1", "site-2", "10.69.205.59"]
+            )
+            self.assertEqual(configs[-1], ood_portal.loads(example_ood_portal_yml))
+
+            inventory = Path(tmp) / "inventory.jsonl"
+            inventory.write_text("".join(c.json() + "\n" for c in configs))
+            self.assertListEqual(list(ood_portal.iter_load(inventory)), configs)
+            with inventory.open() as fin:
+                self.assertListEqual(list(ood_portal.iter_load(fin, format="jsonl")), configs)
+
+            with self.assertRaises(ValueError):
+                ood_portal.iter_load(inventory, format="toml")
+            with self.assertRaises(FileNotFoundError):
+                ood_portal.iter_load(Path(tmp) / "awjeezrick.yaml")
+
     def tearDown(self) -> None:
         Path("ood_portal.yaml").unlink()
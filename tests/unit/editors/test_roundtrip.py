@@ -0,0 +1,119 @@
+# Copyright 2024 Canonical Ltd.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License version 3 as published by the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Unit tests for round-trip editing of configuration files."""
+
+import tempfile
+import unittest
+from pathlib import Path
+
+from ondemandutils.editors import nginx_stage, ood_portal
+
+example_ood_portal_yml = """\
+# Managed by hand. Please keep the comments!
+servername: ondemand.example.com  # public name
+port: 443
+
+# Aliases served by the portal.
+server_aliases:
+  - www.example.com
+  - www.awjeezrick.com
+
+auth:
+  - 'AuthType openid-connect'
+  - 'Require valid-user'
+dex:
+  # Dex listens on plain HTTP behind Apache.
+  http_port: 5556
+  client_redirect_uris: []
+  frontend:
+    theme: ondemand
+    dir: /usr/share/ondemand-dex/web
+# Trailing comment.
+"""
+
+
+class TestRoundTrip(unittest.TestCase):
+    """Unit tests for `edit(..., roundtrip=True)`."""
+
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.file = Path(self.tmp.name) / "ood_portal.yml"
+        self.file.write_text(example_ood_portal_yml)
+
+    def test_replace(self) -> None:
+        """Test that only the lines of changed options are rewritten."""
+        editor = ood_portal.edit(self.file, roundtrip=True)
+        with editor as config:
+            config.port = 8443
+            config.server_aliases.append("www.example.org")
+
+        self.assertTrue(editor.written)
+        self.assertEqual(
+            self.file.read_text(),
+            example_ood_portal_yml.replace("port: 443", "port: 8443").replace(
+                "  - www.example.com\n  - www.awjeezrick.com\n",
+                "- www.example.com\n- www.awjeezrick.com\n- www.example.org\n",
+            ),
+        )
+
+    def test_nested(self) -> None:
+        """Test that changes to nested Dex options keep the rest of the Dex block."""
+        with ood_portal.edit(self.file, roundtrip=True) as config:
+            config.dex.http_port = 5551
+            config.dex.tls_cert = "/etc/ood/dex/tls.crt"
+
+        text = self.file.read_text()
+        self.assertIn("  # Dex listens on plain HTTP behind Apache.\n  http_port: 5551\n", text)
+        self.assertIn("  tls_cert: /etc/ood/dex/tls.crt\n# Trailing comment.\n", text)
+        config = ood_portal.load(self.file)
+        self.assertEqual(config.dex.frontend["theme"], "ondemand")
+
+    def test_insert_delete(self) -> None:
+        """Test adding and removing configuration options."""
+        with ood_portal.edit(self.file, roundtrip=True) as config:
+            del config.server_aliases
+            config.ssl = ["SSLCertificateFile /etc/ssl/ood.crt"]
+
+        text = self.file.read_text()
+        self.assertNotIn("www.example.com", text)
+        self.assertIn("# Aliases served by the portal.\n", text)
+        self.assertTrue(text.startswith("# Managed by hand. Please keep the comments!\n"))
+        self.assertEqual(ood_portal.load(self.file).ssl, ["SSLCertificateFile /etc/ssl/ood.crt"])
+
+    def test_fallback(self) -> None:
+        """Test that documents which cannot be patched are rewritten in full."""
+        self.file.write_text("{servername: ondemand.example.com, port: 443}\n")
+        with ood_portal.edit(self.file, roundtrip=True) as config:
+            config.port = 8443
+
+        config = ood_portal.load(self.file)
+        self.assertEqual(config.servername, "ondemand.example.com")
+        self.assertEqual(config.port, 8443)
+
+    def test_unchanged(self) -> None:
+        """Test that unchanged configuration files are not written."""
+        editor = nginx_stage.edit(self.file.with_name("nginx_stage.yml"), roundtrip=True)
+        with editor as config:
+            config.min_uid = 1000
+
+        self.assertTrue(editor.written)
+        editor = nginx_stage.edit(self.file.with_name("nginx_stage.yml"), roundtrip=True)
+        with editor as config:
+            config.min_uid = 1000
+
+        self.assertFalse(editor.written)
+
+    def tearDown(self) -> None:
+        self.tmp.cleanup()
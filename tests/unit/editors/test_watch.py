@@ -0,0 +1,128 @@
+# Copyright 2024 Canonical Ltd.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License version 3 as published by the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Unit tests for watching configuration files for changes."""
+
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+from ondemandutils.editors import nginx_stage, ood_portal, watch
+from ondemandutils.models import DexConfig, Impact, OODPortalConfig
+
+BACKENDS = ["poll"] + (["inotify"] if sys.platform.startswith("linux") else [])
+
+
+class TestWatcher(unittest.TestCase):
+    """Unit tests for the `Watcher` class."""
+
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        self.portal = self.root / "ood_portal.yml"
+        self.stage = self.root / "nginx_stage.yml"
+        self.portal.write_text("servername: ondemand\nport: 80\n")
+
+    def tearDown(self) -> None:
+        self.tmp.cleanup()
+
+    def _watcher(self, backend: str) -> watch.Watcher:
+        return watch.Watcher(
+            [self.portal, self.stage], debounce=0.05, poll_interval=0.01, backend=backend
+        )
+
+    def test_changes(self) -> None:
+        """Test that changed files are reloaded and compared."""
+        for backend in BACKENDS:
+            with self.subTest(backend), self._watcher(backend) as watcher:
+                self.assertEqual(watcher.backend, backend)
+                self.assertEqual(watcher.config(self.portal).servername, "ondemand")
+                self.assertIsNone(watcher.config(self.stage))
+                self.assertEqual(watcher.poll(timeout=0.1), [])
+
+                # Several writes in a burst are debounced into one event.
+                with ood_portal.edit(self.portal, atomic=True) as config:
+                    config.port = 8080
+                with ood_portal.edit(self.portal) as config:
+                    config.dex = DexConfig(http_port=5556)
+
+                (event,) = watcher.poll(timeout=5)
+                self.assertEqual(event.path, self.portal)
+                self.assertEqual(event.old.port, 80)
+                self.assertEqual(event.new.port, 8080)
+                self.assertIn(Impact.DEX_RESTART, event.diff.impact)
+                self.assertIs(watcher.config(self.portal), event.new)
+
+                nginx_stage.dump(nginx_stage.loads("min_uid: 1000"), self.stage)
+                (event,) = watcher.poll(timeout=5)
+                self.assertEqual((event.path, event.old, event.diff), (self.stage, None, None))
+                self.assertEqual(event.new.min_uid, 1000)
+
+                # Rewriting a file with the same configuration is not a change.
+                ood_portal.dump(watcher.config(self.portal), self.portal)
+                self.assertEqual(watcher.poll(timeout=0.3), [])
+
+                self.portal.write_text("servername: [")
+                (event,) = watcher.poll(timeout=5)
+                self.assertIsNotNone(event.error)
+                self.assertEqual(watcher.config(self.portal).port, 8080)
+
+                self.portal.unlink()
+                self.stage.unlink()
+                events = watcher.poll(timeout=5)
+                self.assertEqual([e.path for e in events], [self.stage, self.portal])
+                self.assertEqual([e.new for e in events], [None, None])
+
+                self.portal.write_text("servername: ondemand\nport: 80\n")
+                self.stage.unlink(missing_ok=True)
+
+    @unittest.skipUnless("inotify" in BACKENDS, "inotify is only available on Linux")
+    def test_many_open_files(self) -> None:
+        """Test waiting for changes when the inotify descriptor is above `FD_SETSIZE`."""
+        import resource
+
+        if resource.getrlimit(resource.RLIMIT_NOFILE)[0] < 2048:
+            self.skipTest("Not enough file descriptors available")
+
+        devnull = os.open(os.devnull, os.O_RDONLY)
+        fds = [os.dup(devnull) for _ in range(1024)]
+        try:
+            with self._watcher("inotify") as watcher:
+                self.assertEqual(watcher.poll(timeout=0.1), [])
+                self.portal.write_text("servername: ondemand\nport: 8080\n")
+                (event,) = watcher.poll(timeout=5)
+                self.assertEqual(event.new.port, 8080)
+        finally:
+            for fd in fds + [devnull]:
+                os.close(fd)
+
+    def test_add_remove(self) -> None:
+        """Test watching and unwatching files."""
+        with watch.Watcher(backend="poll", poll_interval=0.01, debounce=0.01) as watcher:
+            watcher.add(self.root / "site.yml", loader=ood_portal.load)
+            with self.assertRaises(ValueError):
+                watcher.add(self.root / "site.yml")
+
+            ood_portal.dump(OODPortalConfig(servername="site"), self.root / "site.yml")
+            (event,) = watcher.poll(timeout=5)
+            self.assertEqual(event.new.servername, "site")
+
+            watcher.remove(self.root / "site.yml")
+            with self.assertRaises(KeyError):
+                watcher.config(self.root / "site.yml")
+
+        with self.assertRaises(ValueError):
+            watch.Watcher(backend="fanotify")
@@ -14,9 +14,19 @@
 
 """Unit tests for the `BaseModel` class that all data models inherit from."""
 
+import copy
+import io
+import types
 import unittest
 
-from ondemandutils.models import NginxStageConfig, OODPortalConfig
+from ondemandutils.models import (
+    CompactNginxStageConfig,
+    DexConfig,
+    FrozenMapping,
+    NginxStageConfig,
+    OODPortalConfig,
+    ValidationError,
+)
 
 
 class TestBaseModel(unittest.TestCase):
@@ -67,3 +77,211 @@ class TestBaseModel(unittest.TestCase):
             _ = portal_conf | nginx_stage_conf
             _ = nginx_stage_conf | portal_conf
             portal_conf |= nginx_stage_conf
+
+    def test_validation(self) -> None:
+        """Test that every invalid option is reported in a single exception."""
+        with self.assertRaises(ValidationError) as cm:
+            OODPortalConfig(
+                {"port": "8080", "spill_secrets": "SHREK!"},
+                server_aliases="www.example.com",
+                dex={"http_port": True, "awjeez": "rick"},
+            )
+
+        errors = cm.exception.errors
+        self.assertEqual(len(errors), 5)
+        for option in ["port", "spill_secrets", "server_aliases", "dex.http_port", "dex.awjeez"]:
+            self.assertTrue(any(f" {option}" in e for e in errors), option)
+
+        # `ValidationError` is both an `AttributeError` and a `TypeError`.
+        self.assertIsInstance(cm.exception, AttributeError)
+        self.assertIsInstance(cm.exception, TypeError)
+        with self.assertRaises(TypeError):
+            NginxStageConfig(min_uid="1000")
+
+    def test_validation_valid(self) -> None:
+        """Test that valid options pass validation."""
+        config = NginxStageConfig(
+            min_uid=1000,
+            nginx_file_upload_max="10737420000",
+            pun_custom_env={"OOD_DASHBOARD_TITLE": "Open OnDemand"},
+            passenger_python=None,
+        )
+        self.assertEqual(config.min_uid, 1000)
+        config = OODPortalConfig(port=443, oidc_cookie_same_site=True, dex={"http_port": 5556})
+        self.assertEqual(config.dex.http_port, 5556)
+
+    def test_frozen_dict(self) -> None:
+        """Test getting a read-only view of a model's internal register."""
+        config = OODPortalConfig(
+            servername="commander-1",
+            server_aliases=["www.example.com"],
+            dex={"connectors": [{"id": "ldap", "config": {"host": "ldap.example.com"}}]},
+        )
+        view = config.dict(frozen=True)
+        self.assertIsInstance(view, FrozenMapping)
+        self.assertEqual(view, config.dict())
+        self.assertEqual(view["server_aliases"], ["www.example.com"])
+        self.assertEqual(view["dex"]["connectors"][0]["config"]["host"], "ldap.example.com")
+
+        with self.assertRaises(TypeError):
+            view["servername"] = "awjeezrick"
+        with self.assertRaises(AttributeError):
+            view["server_aliases"].append("www.awjeezrick.com")
+        with self.assertRaises(TypeError):
+            view["dex"]["connectors"][0]["id"] = "awjeezrick"
+
+        # Views are not copies, so they reflect later changes to the model.
+        config.servername = "awjeezrick"
+        self.assertEqual(view["servername"], "awjeezrick")
+
+        # Deep copies of views are mutable.
+        mutable = copy.deepcopy(view)
+        mutable["server_aliases"].append("www.awjeezrick.com")
+        self.assertListEqual(config.server_aliases, ["www.example.com"])
+
+    def test_dex_setter_copies(self) -> None:
+        """Test that assigned Dex configurations are not shared with the portal."""
+        dex = DexConfig(connectors=[{"id": "ldap"}])
+        config = OODPortalConfig()
+        config.dex = dex
+        dex.connectors.append({"id": "github"})
+        self.assertEqual(len(config["dex"]["connectors"]), 1)
+
+    def test_constructor_copies(self) -> None:
+        """Test that nested configuration is not shared with the constructor's arguments."""
+        dex = {"http_port": 5556, "connectors": [{"id": "ldap"}]}
+        config = OODPortalConfig(dex=dex)
+        other = OODPortalConfig({"dex": dex})
+        config.dex.http_port = 5557
+        config.dex.connectors.append({"id": "github"})
+        self.assertDictEqual(dex, {"http_port": 5556, "connectors": [{"id": "ldap"}]})
+        self.assertEqual(other.dex.http_port, 5556)
+        self.assertFalse(other.dirty)
+
+        # Parsed configuration is not shared with anything else, so it is not copied.
+        parsed = {"dex": {"http_port": 5556, "connectors": [{"id": "ldap"}]}}
+        self.assertIs(OODPortalConfig._parsed(parsed).data["dex"], parsed["dex"])
+        with self.assertRaises(ValidationError):
+            OODPortalConfig.from_json('{"dex": {"http_port": true}}')
+        with self.assertRaises(TypeError):
+            OODPortalConfig.from_yaml("- servername")
+
+    def test_changed(self) -> None:
+        """Test tracking which configuration options were changed."""
+        config = OODPortalConfig(
+            servername="commander-1",
+            server_aliases=["www.example.com"],
+            logroot="/var/log",
+            dex={"http_port": 5556, "connectors": []},
+        )
+        self.assertFalse(config.dirty)
+        self.assertEqual(config.changed, frozenset())
+
+        # Lists and dictionaries changed in place are only tracked once snapshotted.
+        config.server_aliases.append("www.awjeezrick.com")
+        self.assertFalse(config.dirty)
+        config.server_aliases.pop()
+        config.snapshot()
+
+        config.servername = "awjeezrick"
+        config["port"] = 443
+        del config.logroot
+        config.server_aliases.append("www.awjeezrick.com")
+        config.dex.connectors.append({"id": "ldap"})
+        self.assertTrue(config.dirty)
+        self.assertSetEqual(
+            set(config.changed),
+            {"servername", "port", "logroot", "server_aliases", "dex", "dex.connectors"},
+        )
+        self.assertSetEqual(set(config.dex.changed), {"connectors"})
+
+        # Options set back to their original value are not changed.
+        config.servername = "commander-1"
+        self.assertNotIn("servername", config.changed)
+
+        config.mark_clean()
+        self.assertFalse(config.dirty)
+        config.dex.http_port = 5557
+        self.assertSetEqual(set(config.changed), {"dex", "dex.http_port"})
+
+    def test_changed_reads(self) -> None:
+        """Test that reading options does not copy them to track changes."""
+        config = OODPortalConfig(
+            server_aliases=["www.example.com"], dex={"http_port": 5556, "connectors": []}
+        )
+        self.assertIs(config.server_aliases, config.data["server_aliases"])
+        self.assertIs(config["server_aliases"], config.data["server_aliases"])
+        self.assertIs(config.dex.connectors, config.data["dex"]["connectors"])
+        self.assertFalse(config.dirty)
+
+        # Changes made through the Dex configuration view are tracked by the portal.
+        config.dex.client_name = "HPC"
+        self.assertSetEqual(set(config.changed), {"dex", "dex.client_name"})
+
+    def test_descriptors(self) -> None:
+        """Test the generated descriptors of configuration options."""
+        self.assertIsInstance(OODPortalConfig.servername, property)
+        self.assertEqual(OODPortalConfig.servername.__doc__, "`servername` configuration option.")
+
+        config = OODPortalConfig(user_env={"OOD_USER": "awjeezrick"})
+        self.assertIsNone(config.servername)
+        config.snapshot()
+        config.user_env["OOD_USER"] = "commander-1"
+        self.assertSetEqual(set(config.changed), {"user_env"})
+
+        with self.assertRaises(KeyError):
+            del config.servername
+
+        self.assertSetEqual(set(config.changed), {"user_env"})
+
+    def test_changed_merge(self) -> None:
+        """Test tracking changes made by the `|=` operator."""
+        config = NginxStageConfig(min_uid=1000, passenger_ruby="/usr/bin/ruby")
+        config |= NginxStageConfig(min_uid=1000, passenger_nodejs="/usr/bin/node")
+        self.assertSetEqual(set(config.changed), {"passenger_nodejs"})
+
+        # Copies track changes independently.
+        copied = config.copy()
+        copied.mark_clean()
+        self.assertTrue(config.dirty)
+        self.assertFalse(copied.dirty)
+
+    def test_iter_from_yaml(self) -> None:
+        """Test constructing data models from each document in a YAML stream."""
+        stream = io.StringIO("servername: site-0\n---\nservername: site-1\nport: 443\n---\n")
+        configs = OODPortalConfig.iter_from_yaml(stream)
+        self.assertIsInstance(configs, types.GeneratorType)
+        self.assertEqual(next(configs).servername, "site-0")
+        self.assertEqual(next(configs).port, 443)
+        # The empty document at the end of the stream is skipped.
+        self.assertListEqual(list(configs), [])
+
+        configs = NginxStageConfig.iter_from_yaml("min_uid: 1000\n---\nspill_secrets: SHREK!\n")
+        self.assertEqual(next(configs).min_uid, 1000)
+        with self.assertRaises(ValidationError):
+            next(configs)
+
+    def test_iter_from_jsonl(self) -> None:
+        """Test constructing data models from each line of a JSON lines stream."""
+        stream = io.StringIO('{"servername": "site-0"}\n\n{"dex": {"http_port": 5556}}\n')
+        configs = list(OODPortalConfig.iter_from_jsonl(stream))
+        self.assertEqual(len(configs), 2)
+        self.assertEqual(configs[0].servername, "site-0")
+        self.assertEqual(configs[1].dex.http_port, 5556)
+        compact = list(CompactNginxStageConfig.iter_from_jsonl(['{"min_uid": 1000}']))
+        self.assertEqual(compact[0].min_uid, 1000)
+
+    def test_fingerprint(self) -> None:
+        """Test that fingerprints only depend on the semantic content of configuration."""
+        config = OODPortalConfig(servername="ondemand", dex={"http_port": 5556, "ssl": None})
+        same = OODPortalConfig(dex={"http_port": 5556}, port=None, servername="ondemand")
+        self.assertEqual(config.fingerprint(), same.fingerprint())
+        self.assertEqual(config.fingerprint(), config.compact().fingerprint())
+        self.assertRegex(config.fingerprint(), r"^[0-9a-f]{64}$")
+
+        same.dex.http_port = 5554
+        self.assertNotEqual(config.fingerprint(), same.fingerprint())
+        self.assertNotEqual(
+            OODPortalConfig(server_aliases=["a", "b"]).fingerprint(),
+            OODPortalConfig(server_aliases=["b", "a"]).fingerprint(),
+        )
@@ -0,0 +1,199 @@
+# Copyright 2024 Canonical Ltd.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License version 3 as published by the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Unit tests for compact data models."""
+
+import copy
+import json
+import pickle
+import unittest
+
+from ondemandutils.models import (
+    CompactDexConfig,
+    CompactModel,
+    CompactNginxStageConfig,
+    CompactOODPortalConfig,
+    DexConfig,
+    NginxStageConfig,
+    OODPortalConfig,
+    ValidationError,
+    diff,
+)
+
+PORTAL = {
+    "servername": "ondemand.example.com",
+    "port": 443,
+    "server_aliases": ["ondemand-0.example.com"],
+    "dex": {"http_port": 5556, "connectors": [{"type": "ldap", "id": "ldap"}]},
+}
+
+
+class TestCompactModel(unittest.TestCase):
+    """Unit tests for the `CompactModel` parent class."""
+
+    def test_convert(self) -> None:
+        """Test converting between full and compact data models."""
+        full = OODPortalConfig(copy.deepcopy(PORTAL))
+        config = full.compact()
+        self.assertIsInstance(config, CompactOODPortalConfig)
+        self.assertIsInstance(config.dex, CompactDexConfig)
+        self.assertEqual(config, full)
+        self.assertEqual(full, config)
+        self.assertDictEqual(config.dict(), full.dict())
+        self.assertEqual(config.yaml(), full.yaml())
+        self.assertEqual(json.loads(config.json()), json.loads(full.json()))
+        self.assertIsInstance(config.expand(), OODPortalConfig)
+        self.assertEqual(config.expand(), full)
+        self.assertEqual(CompactOODPortalConfig.from_yaml(full.yaml()), full)
+        self.assertEqual(CompactOODPortalConfig.from_json(full.json()), full)
+        self.assertEqual(NginxStageConfig(min_uid=1000).compact(), {"min_uid": 1000})
+        # Values are copied rather than shared with the full data model.
+        config.server_aliases.append("ondemand-1.example.com")
+        self.assertListEqual(full.server_aliases, ["ondemand-0.example.com"])
+
+    def test_layout(self) -> None:
+        """Test that compact data models store options in a fixed-layout value array."""
+        config = CompactOODPortalConfig(PORTAL)
+        self.assertFalse(hasattr(config, "__dict__"))
+        self.assertEqual(len(config._values), len(OODPortalConfig.schema.keys))
+        self.assertEqual(len(config), 4)
+        self.assertListEqual(list(config), ["servername", "server_aliases", "port", "dex"])
+        # Equal strings loaded from different documents are stored once.
+        other = CompactOODPortalConfig.from_yaml("servername: ondemand.example.com\n")
+        self.assertIs(other.servername, config.servername)
+
+        with self.assertRaises(TypeError):
+
+            class Config(CompactModel, model=NginxStageConfig):
+                pass
+
+    def test_options(self) -> None:
+        """Test retrieving, setting, and deleting configuration options."""
+        config = CompactOODPortalConfig(PORTAL)
+        self.assertEqual(config.servername, "ondemand.example.com")
+        self.assertEqual(config["port"], 443)
+        self.assertIsNone(config.proxy_server)
+        self.assertNotIn("proxy_server", config)
+        with self.assertRaises(KeyError):
+            config["proxy_server"]
+
+        config.proxy_server = "proxy.example.com"
+        config["lua_log_level"] = "debug"
+        del config.port
+        self.assertEqual(config.get("proxy_server"), "proxy.example.com")
+        self.assertEqual(config.lua_log_level, "debug")
+        self.assertNotIn("port", config)
+        self.assertEqual(config.pop("lua_log_level"), "debug")
+        with self.assertRaises(KeyError):
+            del config["port"]
+
+        # Unknown options cannot be stored in the value array.
+        with self.assertRaises(ValidationError):
+            config["spill_secrets"] = "SHREK!"
+        with self.assertRaises(AttributeError):
+            config.spill_secrets = "SHREK!"
+        with self.assertRaises(ValidationError):
+            CompactNginxStageConfig(spill_secrets="SHREK!")
+
+    def test_dex(self) -> None:
+        """Test nested Dex configuration."""
+        config = CompactOODPortalConfig(PORTAL)
+        config.dex.client_name = "HPC"
+        self.assertEqual(config.dict()["dex"]["client_name"], "HPC")
+
+        config.dex = DexConfig(http_port=5554)
+        self.assertIsInstance(config.dex, CompactDexConfig)
+        self.assertEqual(config.dex.http_port, 5554)
+        config["dex"] = {"ssl": False}
+        self.assertFalse(config.dex.ssl)
+        with self.assertRaises(TypeError):
+            config.dex = {"ssl": False}
+        with self.assertRaises(TypeError):
+            config["dex"] = {"spill_secrets": "SHREK!"}
+
+        del config.dex
+        self.assertEqual(config.dex, {})
+        self.assertEqual(CompactOODPortalConfig(dex=None).dex, {})
+
+    def test_dex_unset(self) -> None:
+        """Test that Dex configuration is installed once it is changed, like full data models."""
+        for options in ({"dex": None}, {}):
+            full = OODPortalConfig(options)
+            config = full.compact()
+            self.assertEqual(config["dex"], {})
+            self.assertEqual(config.dex, {})
+            self.assertIsNone(config.dict().get("dex"))
+            self.assertFalse(config.dirty)
+
+            for model in (full, config):
+                dex = model.dex
+                other = model.dex
+                dex.client_name = "HPC"
+                other.http_port = 5554
+
+            self.assertEqual(config.dict(), full.dict())
+            self.assertDictEqual(config.dict()["dex"], {"client_name": "HPC", "http_port": 5554})
+            self.assertSetEqual(config.changed, full.changed)
+            self.assertSetEqual(config.changed, {"dex"})
+
+    def test_changed(self) -> None:
+        """Test that compact data models track changed options like full data models."""
+        full = OODPortalConfig(copy.deepcopy(PORTAL))
+        config = full.compact()
+        for model in (full, config):
+            model.snapshot()
+            model.port = 80
+            model.server_aliases.append("ondemand-1.example.com")
+            model.dex.http_port = 5554
+            model.servername = "ondemand.example.com"
+
+        self.assertSetEqual(config.changed, {"port", "server_aliases", "dex", "dex.http_port"})
+        self.assertSetEqual(config.changed, full.changed)
+        self.assertTrue(config.dirty)
+        config.mark_clean()
+        self.assertFalse(config.dirty)
+        self.assertSetEqual(config.changed, set())
+
+        config.dex = DexConfig(http_port=5554, client_name="HPC")
+        self.assertSetEqual(config.changed, {"dex", "dex.client_name", "dex.connectors"})
+        self.assertIn("dex.client_name", [c.option for c in diff(full, config.expand()).changes])
+
+    def test_copy(self) -> None:
+        """Test copying, merging, and pickling compact data models."""
+        config = CompactOODPortalConfig(PORTAL)
+        config.port = 80
+        clone = config.copy()
+        clone.dex.http_port = 5554
+        self.assertEqual(config.dex.http_port, 5556)
+        self.assertSetEqual(clone.changed, {"port", "dex", "dex.http_port"})
+        self.assertEqual(copy.deepcopy(config), config)
+        self.assertEqual(pickle.loads(pickle.dumps(config)), config)
+        self.assertEqual(pickle.loads(pickle.dumps(config)).proxy_server, None)
+
+        merged = config | CompactOODPortalConfig(lua_log_level="debug")
+        self.assertEqual(merged.lua_log_level, "debug")
+        self.assertEqual(merged.servername, config.servername)
+        config |= CompactOODPortalConfig(port=8080)
+        self.assertEqual(config.port, 8080)
+        with self.assertRaises(TypeError):
+            config | OODPortalConfig()
+        with self.assertRaises(TypeError):
+            config |= CompactNginxStageConfig()
+
+    def test_frozen(self) -> None:
+        """Test that frozen views of compact data models are read-only."""
+        view = CompactOODPortalConfig(PORTAL).dict(frozen=True)
+        self.assertEqual(view["dex"]["http_port"], 5556)
+        with self.assertRaises(TypeError):
+            view["dex"]["http_port"] = 5554
@@ -0,0 +1,171 @@
+# Copyright 2024 Canonical Ltd.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License version 3 as published by the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Unit tests for composing configurations from layers."""
+
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from ondemandutils.models import (
+    Composer,
+    Layer,
+    Merge,
+    NginxStageConfig,
+    OODPortalConfig,
+)
+
+
+class TestCompose(unittest.TestCase):
+    """Unit tests for the `Composer` and `Layer` classes."""
+
+    def setUp(self) -> None:
+        self.defaults = Layer(
+            "global",
+            OODPortalConfig(
+                port=443,
+                server_aliases=["ondemand.example.com"],
+                auth=["AuthType openid-connect", "Require valid-user"],
+                dex={"http_port": 5556, "connectors": [{"type": "ldap", "id": "ldap"}]},
+            ),
+        )
+        self.cluster = Layer(
+            "cluster-a",
+            OODPortalConfig(
+                server_aliases=["ondemand.example.com", "cluster-a.example.com"],
+                dex={"client_name": "Cluster A", "connectors": [{"type": "oidc", "id": "oidc"}]},
+            ),
+        )
+        self.sites = [
+            Layer(f"site-{i}", OODPortalConfig(servername=f"site-{i}.example.com"))
+            for i in range(3)
+        ]
+
+    def test_deep_merge(self) -> None:
+        """Test that nested configuration is merged option by option."""
+        composer = Composer(OODPortalConfig)
+        config = composer.compose(self.defaults, self.cluster, self.sites[0])
+        self.assertIsInstance(config, OODPortalConfig)
+        self.assertEqual(config.servername, "site-0.example.com")
+        self.assertEqual(config.port, 443)
+        self.assertEqual(config.dex.http_port, 5556)
+        self.assertEqual(config.dex.client_name, "Cluster A")
+        # Lists are replaced by default.
+        self.assertListEqual(config.dex.connectors, [{"type": "oidc", "id": "oidc"}])
+        self.assertFalse(config.dirty)
+
+        # Composed configurations are independent of the layers and the composer.
+        config.dex.http_port = 5554
+        config = composer.compose(self.defaults, self.cluster, self.sites[0])
+        self.assertEqual(config.dex.http_port, 5556)
+        self.assertEqual(self.defaults.data["dex"]["http_port"], 5556)
+
+    def test_strategies(self) -> None:
+        """Test merging lists with each strategy."""
+        composer = Composer(
+            OODPortalConfig,
+            {"server_aliases": Merge.UNIQUE, "dex.connectors": Merge.APPEND},
+        )
+        config = composer.compose(self.defaults, self.cluster)
+        self.assertListEqual(
+            config.server_aliases, ["ondemand.example.com", "cluster-a.example.com"]
+        )
+        self.assertListEqual(
+            config.dex.connectors,
+            [{"type": "ldap", "id": "ldap"}, {"type": "oidc", "id": "oidc"}],
+        )
+        composer = Composer(OODPortalConfig, {"dex.connectors": Merge.UNIQUE})
+        self.assertEqual(len(composer.compose(self.defaults, self.defaults).dex.connectors), 1)
+
+        with self.assertRaises(ValueError):
+            Composer(OODPortalConfig, {"dex.awjeezrick": Merge.APPEND})
+        with self.assertRaises(ValueError):
+            Composer(OODPortalConfig, {"servername.awjeezrick": Merge.APPEND})
+        with self.assertRaises(TypeError):
+            Composer(OODPortalConfig, {"server_aliases": "append"})
+
+    def test_memoize(self) -> None:
+        """Test that only stacks including a changed layer are merged again."""
+        composer = Composer(OODPortalConfig)
+        for site in self.sites:
+            composer.compose(self.defaults, self.cluster, site)
+
+        # The global and cluster layers are merged once for every site.
+        self.assertEqual(composer.cache_info().merges, 2 + len(self.sites))
+        for site in self.sites:
+            composer.compose(self.defaults, self.cluster, site, frozen=True)
+
+        self.assertEqual(composer.cache_info().hits, len(self.sites))
+
+        with self.sites[1].edit() as config:
+            config.port = 8443
+
+        composer.cache_clear()
+        for site in self.sites:
+            composer.compose(self.defaults, self.cluster, site)
+
+        with self.sites[1].edit() as config:
+            config.port = 80
+
+        configs = [composer.compose(self.defaults, self.cluster, s) for s in self.sites]
+        self.assertEqual(configs[1].port, 80)
+        info = composer.cache_info()
+        self.assertEqual(info.misses, 4)
+        self.assertEqual(info.merges, 2 + len(self.sites) + 1)
+
+        # Changing the cluster layer merges every site again.
+        self.assertTrue(self.cluster.update(OODPortalConfig(port=8080)))
+        self.assertFalse(self.cluster.update(OODPortalConfig(port=8080)))
+        configs = [composer.compose(self.defaults, self.cluster, s) for s in self.sites]
+        self.assertListEqual([c.port for c in configs], [8080, 80, 8080])
+        self.assertEqual(composer.cache_info().merges, 2 + len(self.sites) + 1 + 4)
+
+    def test_concurrent(self) -> None:
+        """Test that statistics count every composition made from many threads."""
+        composer = Composer(OODPortalConfig)
+        with ThreadPoolExecutor(8) as pool:
+            for site in self.sites * 200:
+                pool.submit(composer.compose, self.defaults, self.cluster, site, frozen=True)
+
+        info = composer.cache_info()
+        self.assertEqual(info.hits + info.misses, len(self.sites) * 200)
+        self.assertEqual(info.currsize, 2 + len(self.sites))
+
+    def test_layers(self) -> None:
+        """Test that layers are versioned copies of their configuration."""
+        config = NginxStageConfig(min_uid=1000)
+        layer = Layer("global", config)
+        config.min_uid = 500
+        self.assertEqual(layer.data["min_uid"], 1000)
+        self.assertEqual(layer.version, 0)
+
+        with layer.edit() as config:
+            config.min_uid = 1000
+
+        self.assertEqual(layer.version, 0)
+        with layer.edit() as config:
+            config.min_uid = 2000
+
+        self.assertEqual(layer.version, 1)
+        with self.assertRaises(RuntimeError):
+            with layer.edit() as config:
+                config.min_uid = 3000
+                raise RuntimeError("awjeezrick")
+
+        self.assertEqual(layer.config.min_uid, 2000)
+        with self.assertRaises(TypeError):
+            layer.update(OODPortalConfig())
+        with self.assertRaises(TypeError):
+            Composer(OODPortalConfig).compose(self.defaults, layer)
+        with self.assertRaises(TypeError):
+            Layer("global", {"min_uid": 1000})
@@ -0,0 +1,76 @@
+# Copyright 2024 Canonical Ltd.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License version 3 as published by the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Unit tests for comparing data models."""
+
+import unittest
+
+from ondemandutils.models import (
+    DexConfig,
+    Impact,
+    NginxStageConfig,
+    OODPortalConfig,
+    diff,
+)
+
+
+class TestDiff(unittest.TestCase):
+    """Unit tests for the `diff` function."""
+
+    def test_ood_portal(self) -> None:
+        """Test comparing `ood_portal.yml` configurations."""
+        old = OODPortalConfig(servername="ondemand.example.com", lua_log_level="info", port=443)
+        new = OODPortalConfig(servername="ondemand.example.com", lua_log_level="debug", ssl=None)
+        new.auth = ["AuthType openid-connect"]
+
+        result = diff(old, new)
+        self.assertListEqual([c.option for c in result.added], ["auth"])
+        self.assertListEqual([c.option for c in result.removed], ["port"])
+        self.assertListEqual([c.option for c in result.changed], ["lua_log_level"])
+        self.assertEqual(result.changed[0].old, "info")
+        self.assertEqual(result.changed[0].new, "debug")
+        self.assertEqual(result.impact, Impact.APACHE_RELOAD | Impact.DEX_RESTART)
+        self.assertListEqual([c.option for c in result.changes], ["auth", "lua_log_level", "port"])
+        self.assertFalse(diff(new, new.copy()))
+
+    def test_dex(self) -> None:
+        """Test that changes to the nested Dex configuration are reported per option."""
+        old = OODPortalConfig(dex=DexConfig(http_port=5556, client_name="OnDemand"))
+        new = OODPortalConfig(dex=DexConfig(http_port=5556, client_name="HPC"))
+
+        result = diff(old, new)
+        self.assertListEqual([c.option for c in result.changes], ["dex.client_name"])
+        self.assertEqual(result.impact, Impact.DEX_RESTART)
+
+        new.dex.http_port = 5554
+        self.assertIn(Impact.APACHE_RELOAD, diff(old, new).impact)
+
+        # Enabling or disabling Dex is a single change.
+        result = diff(OODPortalConfig(), new)
+        self.assertListEqual([c.option for c in result.added], ["dex"])
+        self.assertEqual(result.impact, Impact.APACHE_RELOAD | Impact.DEX_RESTART)
+
+    def test_nginx_stage(self) -> None:
+        """Test comparing `nginx_stage.yml` configurations."""
+        old = NginxStageConfig(min_uid=1000, passenger_ruby="/usr/bin/ruby")
+        new = NginxStageConfig(min_uid=500, passenger_ruby="/usr/bin/ruby")
+        self.assertEqual(diff(old, new).impact, Impact.NONE)
+
+        new.pun_custom_env = {"OOD_DASHBOARD_TITLE": "HPC"}
+        self.assertEqual(diff(old, new).impact, Impact.PUN_REBUILD)
+
+    def test_type_mismatch(self) -> None:
+        """Test that configurations of different kinds cannot be compared."""
+        with self.assertRaises(TypeError):
+            diff(OODPortalConfig(), NginxStageConfig())
@@ -0,0 +1,122 @@
+# Copyright 2024 Canonical Ltd.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License version 3 as published by the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Unit tests for the YAML serializer backends used by data models."""
+
+import unittest
+
+import yaml
+
+from ondemandutils.models import OODPortalConfig, _serializer, yaml_backend
+
+example_ood_portal_yml = r"""
+servername: 10.69.205.59
+server_aliases: ['www.example.com', 'www.awjeezrick.com']
+port: 8080
+logformat: Apache combine format
+auth:
+  - 'AuthType openid-connect'
+  - 'Require valid-user'
+oidc_state_max_number_of_cookies: "10 true"
+oidc_cookie_same_site: 'On'
+oidc_settings: {}
+dex:
+  ssl: false
+  http_port: 5551
+  client_name: OnDemand
+  connectors:
+    - type: ldap
+      id: ldap
+      config:
+        bindDN: cn=admin,dc=example,dc=org
+        userSearch:
+          filter: "(objectClass=posixAccount)"
+"""
+
+
+class TestSerializer(unittest.TestCase):
+    """Unit tests for the YAML serializer backends."""
+
+    def setUp(self) -> None:
+        self._backend = yaml_backend()
+
+    def test_backend(self) -> None:
+        """Test that the fastest available backend is selected by default."""
+        expected = "libyaml" if yaml.__with_libyaml__ else "python"
+        self.assertEqual(yaml_backend(), expected)
+
+    def test_backends_equivalent(self) -> None:
+        """Test that every available backend produces the same output."""
+        outputs = {}
+        for backend in _serializer.backends():
+            _serializer.set_backend(backend)
+            self.assertEqual(yaml_backend(), backend)
+            outputs[backend] = OODPortalConfig.from_yaml(example_ood_portal_yml).yaml()
+
+        self.assertEqual(len(set(outputs.values())), 1)
+        config = OODPortalConfig.from_yaml(outputs[_serializer.PYTHON])
+        self.assertEqual(config.oidc_cookie_same_site, "On")
+        self.assertEqual(config["dex"]["connectors"][0]["id"], "ldap")
+
+    def test_backends_equivalent_scalars(self) -> None:
+        """Test that every backend dumps long, escaped, and multi-line scalars the same."""
+        scalars = [
+            "x" * 200,
+            " ".join(["word"] * 60),
+            "tab\tseparated\tvalues " * 10,
+            "line one\nline two\n\nline four\r\n",
+            "café € 😀 " * 20,
+            "\x07 bell \x85 next line \u2028 separator " * 5,
+            " leading and trailing spaces ",
+            "'single' and \"double\" quotes: # not a comment " * 5,
+        ]
+        for scalar in scalars:
+            data = {"servername": scalar, "server_aliases": [scalar], "dex": {"id": scalar}}
+            outputs = set()
+            for backend in _serializer.backends():
+                _serializer.set_backend(backend)
+                outputs.add(_serializer.dump(data))
+
+            with self.subTest(scalar[:20]):
+                self.assertEqual(len(outputs), 1)
+                self.assertEqual(_serializer.load(outputs.pop()), data)
+
+    def test_canonical(self) -> None:
+        """Test that canonical output does not depend on the backend, key order, or nulls."""
+        config = OODPortalConfig.from_yaml(example_ood_portal_yml)
+        reordered = OODPortalConfig(dict(reversed(list(config.items()))), proxy_server=None)
+        reordered["dex"] = dict(reversed(list(config["dex"].items())))
+        reordered.servername = "x" * 200
+        config.servername = "x" * 200
+
+        outputs = set()
+        for backend in _serializer.backends():
+            _serializer.set_backend(backend)
+            for c in (config, reordered):
+                outputs.add(c.yaml(canonical=True))
+
+        self.assertEqual(len(outputs), 1)
+        self.assertNotIn("proxy_server", outputs.pop())
+        self.assertEqual(config.json(canonical=True), reordered.json(canonical=True))
+        self.assertNotEqual(config.json(), reordered.json())
+
+    def test_bad_backend(self) -> None:
+        """Test setting a backend that does not exist."""
+        with self.assertRaises(ValueError):
+            _serializer.set_backend("awjeezrick")
+
+        self.assertEqual(yaml_backend(), self._backend)
+
+    def tearDown(self) -> None:
+        _serializer.set_backend(self._backend)
@@ -0,0 +1,158 @@
+# Copyright 2024 Canonical Ltd.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License version 3 as published by the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Unit tests for rendering `ood_portal.conf` from `OODPortalConfig` objects.
+
+Rendered configurations are compared with golden files. After an intended change
+to the renderer, regenerate the golden files and review their diff:
+
+    $ UPDATE_GOLDEN=1 python3 -m pytest tests/unit/renderers
+"""
+
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+from ondemandutils.models import OODPortalConfig
+from ondemandutils.renderers import ood_portal
+from ondemandutils.renderers._template import TemplateError, compile_template
+
+GOLDEN = Path(__file__).parent / "golden"
+
+CONFIGS = {
+    "default": {},
+    "ssl": {
+        "listen_addr_port": [443, 80],
+        "servername": "ondemand.example.com",
+        "server_aliases": ["ood.example.com"],
+        "port": 443,
+        "ssl": [
+            'SSLCertificateFile "/etc/ssl/certs/ondemand.crt"',
+            'SSLCertificateKeyFile "/etc/ssl/private/ondemand.key"',
+        ],
+        "logroot": "/var/log/ondemand",
+        "maintenance_ip_allowlist": ["10.0.0.1"],
+        "user_map_cmd": "/opt/ood/ood_auth_map/bin/ood_auth_map.regex",
+        "node_uri": "/node",
+        "rnode_uri": "/rnode",
+        "analytics": {"url": "https://analytics.example.com", "id": "UA-1"},
+    },
+    "oidc": {
+        "listen_addr_port": "8080",
+        "servername": "ondemand.example.com",
+        "port": 8080,
+        "proxy_server": "proxy.example.com",
+        "disable_logs": True,
+        "use_maintenance": False,
+        "auth": ["AuthType openid-connect", "Require valid-user"],
+        "custom_location_directives": ["Header set X-Site ondemand"],
+        "oidc_uri": "/oidc",
+        "oidc_provider_metadata_url": "https://idp.example.com/.well-known/openid-configuration",
+        "oidc_client_id": "ondemand",
+        "oidc_client_secret": "awjeezrick",
+        "oidc_cookie_same_site": False,
+        "oidc_settings": {"OIDCPassUserInfoAs": "json", "OIDCPassClaimsAs": "both"},
+        "oidc_discover_uri": "/discover",
+        "oidc_discover_root": "/var/www/ood/discover",
+    },
+    "dex": {
+        "servername": "ondemand.example.com",
+        "ssl": ['SSLCertificateFile "/etc/ssl/certs/ondemand.crt"'],
+        "dex": {"client_secret": "awjeezrick", "connectors": [{"type": "ldap", "id": "ldap"}]},
+    },
+    "dex_no_servername": {"dex": {"ssl": False, "client_secret": "awjeezrick"}},
+}
+
+
+class TestOODPortalRenderer(unittest.TestCase):
+    """Unit tests for the `ood_portal` renderer."""
+
+    def test_golden(self) -> None:
+        """Test that rendered configurations match the golden files."""
+        for name, options in CONFIGS.items():
+            with self.subTest(name):
+                rendered = ood_portal.render(OODPortalConfig(options))
+                golden = GOLDEN / f"{name}.conf"
+                if os.getenv("UPDATE_GOLDEN"):
+                    golden.write_text(rendered)
+
+                self.assertEqual(rendered, golden.read_text())
+
+    def test_dex(self) -> None:
+        """Test that Dex and OpenID Connect need a client secret."""
+        with tempfile.TemporaryDirectory() as tmp:
+            secret = Path(tmp) / "ood.secret"
+            with self.assertRaises(ValueError):
+                ood_portal.render(OODPortalConfig(dex={}), dex_secret_file=secret)
+
+            # Like Open OnDemand, the secret is read from a file if it is not set.
+            secret.write_text("awjeezrick\n")
+            rendered = ood_portal.render(OODPortalConfig(dex={}), dex_secret_file=secret)
+            self.assertIn('OIDCClientSecret "awjeezrick"', rendered)
+            rendered = ood_portal.render(
+                OODPortalConfig(dex={"client_secret": "SHREK!"}), dex_secret_file=secret
+            )
+            self.assertIn('OIDCClientSecret "SHREK!"', rendered)
+
+        dex = {"ssl": False, "http_port": 5555, "client_secret": "awjeezrick"}
+        rendered = ood_portal.render(OODPortalConfig(dex=dex))
+        self.assertIn('ProxyPass "http://localhost:5555/dex"', rendered)
+        rendered = ood_portal.render(OODPortalConfig(dex_uri=False, dex=dex))
+        self.assertNotIn('<Location "/dex">', rendered)
+        self.assertNotIn('<Location "/dex">', ood_portal.render(OODPortalConfig()))
+
+    def test_oidc_settings(self) -> None:
+        """Test that unset OpenID Connect directives are left out and can be overridden."""
+        rendered = ood_portal.render(
+            OODPortalConfig(
+                oidc_uri="/oidc",
+                oidc_client_secret="awjeezrick",
+                oidc_settings={"oidcscope": '"openid"', "OIDCPassRefreshToken": None},
+            )
+        )
+        self.assertNotIn('"None"', rendered)
+        self.assertNotIn("OIDCClientID", rendered)
+        self.assertNotIn("OIDCProviderMetadataURL", rendered)
+        self.assertNotIn("OIDCPassRefreshToken", rendered)
+        self.assertIn('OIDCRedirectURI "http://localhost/oidc"', rendered)
+        self.assertEqual(rendered.count("OIDCScope"), 0)
+        self.assertEqual(rendered.count('oidcscope "openid"'), 1)
+
+    def test_dump(self) -> None:
+        """Test rendering into a file."""
+        with tempfile.TemporaryDirectory() as tmp:
+            file = Path(tmp) / "ood_portal.conf"
+            config = OODPortalConfig(CONFIGS["ssl"])
+            ood_portal.dump(config, file, atomic=True)
+            self.assertEqual(file.read_text(), ood_portal.render(config))
+
+
+class TestTemplate(unittest.TestCase):
+    """Unit tests for compiling templates."""
+
+    def test_compile(self) -> None:
+        """Test compiling and rendering a template."""
+        render = compile_template(
+            "% for i in items:\n% if i % 2:\n{{ i }} is odd\n% else:\n{{ i }} is even\n% end\n"
+            + "% end\n{{ {'a': 1}['a'] }} done",
+            ["items"],
+        )
+        self.assertEqual(render({"items": [1, 2]}), "1 is odd\n2 is even\n1 done\n")
+
+    def test_errors(self) -> None:
+        """Test that malformed templates are rejected."""
+        for source in ("% if x:\n", "% end\n", "% else:\n", "% if x y:\n% end\n"):
+            with self.subTest(source), self.assertRaises(TemplateError):
+                compile_template(source, ["x"])
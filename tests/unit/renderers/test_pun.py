@@ -0,0 +1,103 @@
+# Copyright 2024 Canonical Ltd.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License version 3 as published by the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Unit tests for rendering per-user NGINX configuration from `NginxStageConfig` objects."""
+
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+from ondemandutils.models import NginxStageConfig
+from ondemandutils.renderers import pun
+
+GOLDEN = Path(__file__).parent / "golden"
+
+CONFIG = {
+    "pun_custom_env": {"OOD_DASHBOARD_TITLE": "Open OnDemand"},
+    "pun_custom_env_declarations": ["PATH", "LD_LIBRARY_PATH"],
+    "passenger_nodejs": "/opt/ood/ondemand/root/usr/bin/node",
+    "passenger_options": {"passenger_max_pool_size": 4},
+    "pun_app_configs": [
+        {"env": "sys", "owner": "", "name": "*"},
+        {"env": "unknown", "owner": "", "name": "*"},
+    ],
+}
+
+
+class TestPunRenderer(unittest.TestCase):
+    """Unit tests for the `pun` renderer."""
+
+    def test_paths(self) -> None:
+        """Test expanding path templates for a user."""
+        config = NginxStageConfig(pun_socket_path="/run/{nginx}/%{user}/%{unknown}.sock")
+        paths = pun.paths(config, "rick")
+        self.assertEqual(paths.user, "rick")
+        self.assertEqual(paths.socket, "/run/{nginx}/rick/%{unknown}.sock")
+        self.assertEqual(paths.config, "/var/lib/ondemand-nginx/config/puns/rick.conf")
+
+    def test_golden(self) -> None:
+        """Test that the rendered configuration matches the golden file."""
+        rendered = pun.render(NginxStageConfig(CONFIG), "rick", "smith")
+        golden = GOLDEN / "pun.conf"
+        if os.getenv("UPDATE_GOLDEN"):
+            golden.write_text(rendered)
+
+        self.assertEqual(rendered, golden.read_text())
+
+    def test_stage(self) -> None:
+        """Test staging the configuration of many users."""
+        with tempfile.TemporaryDirectory() as tmp:
+            config = NginxStageConfig(CONFIG, pun_config_path=f"{tmp}/puns/%{{user}}.conf")
+            users = [f"user{i}" for i in range(20)]
+            groups = dict.fromkeys(users, "users")
+            uids = dict.fromkeys(users, 1000)
+
+            report = pun.stage(config, users, groups=groups, uids=uids, workers=4)
+            self.assertEqual(report.written, [Path(tmp, "puns", f"{u}.conf") for u in users])
+            self.assertEqual(report.unchanged, [])
+            self.assertEqual(report.errors, {})
+            self.assertEqual(
+                Path(tmp, "puns", "user3.conf").read_text(),
+                pun.render(config, "user3", "users"),
+            )
+
+            groups["user3"] = "staff"
+            report = pun.stage(config, users, groups=groups, uids=uids, atomic=True)
+            self.assertEqual(report.written, [Path(tmp, "puns", "user3.conf")])
+            self.assertEqual(len(report.unchanged), 19)
+
+            report = pun.stage(config, ["ondemandutils-no-such-user"])
+            self.assertIsInstance(report.errors["ondemandutils-no-such-user"], KeyError)
+
+    def test_stage_invalid_users(self) -> None:
+        """Test that invalid and system users are reported rather than staged."""
+        with tempfile.TemporaryDirectory() as tmp:
+            config = NginxStageConfig(pun_config_path=f"{tmp}/puns/%{{user}}/nginx.conf")
+            users = ["../escape", "..", "rick morty", "root", "system", "rick"]
+            groups = dict.fromkeys(users, "users")
+            uids = {"system": 999, "rick": 1000}
+
+            report = pun.stage(config, users, groups=groups, uids=uids)
+            self.assertEqual(report.written, [Path(tmp, "puns", "rick", "nginx.conf")])
+            self.assertEqual(set(report.errors), set(users) - {"rick"})
+            for error in report.errors.values():
+                self.assertIsInstance(error, ValueError)
+            self.assertEqual(list(Path(tmp).rglob("*.conf")), report.written)
+
+            config = NginxStageConfig(config, user_regex="[a-z]+", min_uid=0)
+            report = pun.stage(config, ["root", "user1"], groups=groups)
+            self.assertEqual(list(report.errors), ["user1"])
+            with self.assertRaises(ValueError):
+                pun.paths(config, "user1")
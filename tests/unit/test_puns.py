@@ -0,0 +1,101 @@
+# Copyright 2024 Canonical Ltd.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License version 3 as published by the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Unit tests for scanning the per-user NGINX (PUN) state of a node."""
+
+import os
+import socket
+import subprocess
+import tempfile
+import unittest
+from pathlib import Path
+
+from ondemandutils import puns
+from ondemandutils.models import NginxStageConfig
+
+
+class TestScan(unittest.TestCase):
+    """Unit tests for `puns.scan`."""
+
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        self.config = NginxStageConfig(
+            pun_config_path=f"{self.root}/config/puns/%{{user}}.conf",
+            pun_pid_path=f"{self.root}/run/%{{user}}/passenger.pid",
+            pun_socket_path=f"{self.root}/run/%{{user}}/passenger.sock",
+        )
+        (self.root / "config" / "puns").mkdir(parents=True)
+        self.sockets = []
+
+    def tearDown(self) -> None:
+        for sock in self.sockets:
+            sock.close()
+
+        self.tmp.cleanup()
+
+    def _pun(self, user: str, pid: int = None, config: bool = True, sock: bool = True) -> None:
+        """Create the files of a PUN."""
+        run = self.root / "run" / user
+        run.mkdir(parents=True)
+        if config:
+            (self.root / "config" / "puns" / f"{user}.conf").write_text("")
+            (self.root / "config" / "puns" / f"{user}.secret_key_base.txt").write_text("")
+        if pid is not None:
+            (run / "passenger.pid").write_text(f"{pid}\n")
+        if sock:
+            s = socket.socket(socket.AF_UNIX)
+            s.bind(str(run / "passenger.sock"))
+            self.sockets.append(s)
+
+    def test_scan(self) -> None:
+        """Test finding running, dead, and orphaned PUNs."""
+        dead = subprocess.Popen(["true"])
+        dead.wait()
+        self._pun("rick", pid=os.getpid())
+        self._pun("morty", pid=dead.pid)
+        self._pun("summer", config=False)
+        (self.root / "config" / "puns" / "jerry.conf").write_text("")
+        (self.root / "run" / "not a user").mkdir()
+
+        report = puns.scan(self.config)
+        self.assertEqual(list(report.puns), ["jerry", "morty", "rick", "summer"])
+        rick = report.puns["rick"]
+        self.assertTrue(rick.running)
+        self.assertEqual(rick.pid, os.getpid())
+        self.assertEqual(rick.socket, f"{self.root}/run/rick/passenger.sock")
+        self.assertEqual(report.puns["summer"].config, None)
+        self.assertEqual(
+            report.stale_sockets,
+            [f"{self.root}/run/{u}/passenger.sock" for u in ("morty", "summer")],
+        )
+        self.assertEqual(report.dead_pids, [f"{self.root}/run/morty/passenger.pid"])
+        self.assertEqual(
+            report.orphaned_configs,
+            [f"{self.root}/config/puns/{u}.conf" for u in ("jerry", "morty")],
+        )
+
+        report = puns.scan(self.config, users=["rick", "beth"])
+        self.assertEqual(list(report.puns), ["rick"])
+
+    def test_scan_missing(self) -> None:
+        """Test scanning a node without PUNs or with an invalid template."""
+        config = NginxStageConfig(
+            pun_config_path=f"{self.root}/nothing/%{{user}}.conf",
+            pun_pid_path=f"{self.root}/nothing/%{{user}}/passenger.pid",
+            pun_socket_path=f"{self.root}/config/%{{user}}/passenger.sock",
+        )
+        self.assertEqual(puns.scan(config).puns, {})
+        with self.assertRaises(ValueError):
+            puns.scan(NginxStageConfig(pun_pid_path=f"{self.root}/passenger.pid"))